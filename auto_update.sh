@@ -21,40 +21,28 @@ if [ -f "venv/bin/activate" ]; then
     source venv/bin/activate
 fi
 
-# 1. Aktuelle Daten scrapen
-echo "📥 Scrape neue Daten von der Website..." | tee -a "$LOG_FILE"
-if python scraper.py >> "$LOG_FILE" 2>&1; then
-    echo "✅ Scraping erfolgreich" | tee -a "$LOG_FILE"
-else
-    echo "❌ Scraping fehlgeschlagen" | tee -a "$LOG_FILE"
+# 1. Inkrementeller Ablauf: Scrapen, Cache, Koordinaten, Validierung, Publish-Artefakte
+#    (jeder Schritt läuft nur, wenn sich seine Eingaben seit dem letzten Lauf geändert haben)
+echo "🧭 Starte inkrementellen Update-Ablauf..." | tee -a "$LOG_FILE"
+python pipeline.py >> "$LOG_FILE" 2>&1 && PIPELINE_STATUS=0 || PIPELINE_STATUS=$?
+if [ "$PIPELINE_STATUS" -eq 0 ]; then
+    echo "✅ Ablauf erfolgreich" | tee -a "$LOG_FILE"
+elif [ "$PIPELINE_STATUS" -eq 2 ]; then
+    echo "❌ Scraping oder Validierung fehlgeschlagen - keine Veröffentlichung (siehe Log)" | tee -a "$LOG_FILE"
     exit 1
-fi
-
-# 2. Cache automatisch erweitern
-echo "🗺️  Erweitere Geocode-Cache..." | tee -a "$LOG_FILE"
-if python auto_update_cache.py --max 20 --delay 1.5 >> "$LOG_FILE" 2>&1; then
-    echo "✅ Cache-Update erfolgreich" | tee -a "$LOG_FILE"
 else
-    echo "⚠️  Cache-Update mit Fehlern (fortfahren)" | tee -a "$LOG_FILE"
+    echo "⚠️  Ablauf mit Fehlern (fortfahren)" | tee -a "$LOG_FILE"
 fi
 
-# 3. Koordinaten korrigieren/ergänzen
-echo "📍 Korrigiere fehlende Koordinaten..." | tee -a "$LOG_FILE"
-if python fix_coordinates.py --only-missing --max 10 >> "$LOG_FILE" 2>&1; then
-    echo "✅ Koordinaten-Korrektur erfolgreich" | tee -a "$LOG_FILE"
-else
-    echo "⚠️  Koordinaten-Korrektur mit Fehlern (fortfahren)" | tee -a "$LOG_FILE"
-fi
-
-# 4. Git-Commit (optional - falls Repository automatisch aktualisiert werden soll)
+# 2. Git-Commit (optional - falls Repository automatisch aktualisiert werden soll)
 if command -v git >/dev/null 2>&1 && [ -d ".git" ]; then
     echo "📝 Git-Status prüfen..." | tee -a "$LOG_FILE"
     
-    if git diff --quiet && git diff --cached --quiet; then
+    if git diff --quiet && git diff --cached --quiet && [ -z "$(git status --porcelain data/tiles data/clusters data/search_index.json data/nearest_grid.json data/stations.wvhc data/manifest.json data/versions data/deltas regionen)" ]; then
         echo "ℹ️  Keine Änderungen für Git-Commit" | tee -a "$LOG_FILE"
     else
         echo "💾 Committe Änderungen..." | tee -a "$LOG_FILE"
-        git add data/wildvogelhilfen.json data/geocode_cache.json
+        git add -A data/wildvogelhilfen.json data/geocode_cache.json data/tiles data/clusters data/search_index.json data/nearest_grid.json data/stations.wvhc data/manifest.json data/versions data/deltas regionen
         git commit -m "Automatisches Update: $(date +%Y-%m-%d)"
         echo "✅ Git-Commit erfolgreich" | tee -a "$LOG_FILE"
         
@@ -70,21 +58,12 @@ if command -v git >/dev/null 2>&1 && [ -d ".git" ]; then
     fi
 fi
 
-# 5. Statistiken
+# 3. Statistiken
 echo "" | tee -a "$LOG_FILE"
 echo "📊 FINAL-STATISTIKEN:" | tee -a "$LOG_FILE"
 
-# Anzahl Stationen
-if [ -f "data/wildvogelhilfen.json" ]; then
-    STATION_COUNT=$(python -c "import json; print(len(json.load(open('data/wildvogelhilfen.json'))))")
-    echo "   📍 $STATION_COUNT Wildvogelhilfe-Stationen" | tee -a "$LOG_FILE"
-fi
-
-# Cache-Größe
-if [ -f "data/geocode_cache.json" ]; then
-    CACHE_COUNT=$(python -c "import json; print(len(json.load(open('data/geocode_cache.json'))))")
-    echo "   🗺️  $CACHE_COUNT Geocode-Cache-Einträge" | tee -a "$LOG_FILE"
-fi
+python wvhmap.py stats 2>&1 | tail -n +3 | tee -a "$LOG_FILE"
+echo "   📈 Metriken: logs/metrics/*.prom (node_exporter textfile) und *.json" | tee -a "$LOG_FILE"
 
 echo "🎉 AUTO-UPDATE ABGESCHLOSSEN: $(date)" | tee -a "$LOG_FILE"
 
@@ -7,10 +7,23 @@ Dieses Script sammelt neue Orte aus wildvogelhilfen.json und erweitert den Cache
 import json
 import re
 import time
+import sys
 import argparse
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Set, List, Tuple, Optional
-import requests
+from typing import TYPE_CHECKING, Dict, Set, List, Tuple, Optional
+
+import boundaries
+import geocode_backends
+import geocode_queue
+import geocode_shards
+import metrics
+import profiling
+import provenance
+from station_utils import get_station_coords
+
+if TYPE_CHECKING:
+    import requests
 
 def load_cache() -> Dict:
     """Lädt den bestehenden Geocode-Cache"""
@@ -75,7 +88,10 @@ def extract_plz_city_country(station: Dict) -> Optional[Tuple[str, str, str]]:
         elif plz_prefix == 'schweiz':
             country = "schweiz"
         else:
-            country = "deutschland"  # Fallback
+            # Deutschland hat keine 4-stelligen PLZ: Land aus den (ggf. genäherten) Koordinaten
+            coords = get_station_coords(station)
+            located = boundaries.country_at(*coords) if coords else None
+            country = located.lower() if located else "deutschland"  # Fallback
         
         return plz, city, country
     
@@ -89,54 +105,44 @@ def create_cache_key(plz: str, city: str, country: str) -> str:
     
     return f"{plz}|{city_clean}|{country}"
 
-def geocode_location(plz: str, city: str, country: str, session: requests.Session) -> Optional[Tuple[float, float]]:
+def geocode_location(plz: str, city: str, country: str, session: 'requests.Session') -> Optional[Tuple[float, float]]:
     """Geocodiert einen Ort mit Nominatim"""
     try:
-        # Vollständige Adresse für bessere Ergebnisse
-        search_query = f"{plz} {city}, {country}"
-        
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            'q': search_query,
-            'format': 'json',
-            'limit': 1,
-            'countrycodes': get_country_code(country)
-        }
-        
-        response = session.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        if data and len(data) > 0:
-            result = data[0]
-            lat = float(result['lat'])
-            lon = float(result['lon'])
+        coords = geocode_backends.NominatimBackend(session).search(plz, city, country)
+        if coords:
+            lat, lon = coords
+            if boundaries.wrong_country(lat, lon, country):
+                print(f"  ❌ {plz} {city} -> {lat:.6f}, {lon:.6f} liegt nicht in {country}")
+                metrics.record_nominatim_error('wrong_country')
+                return None
             print(f"  ✅ {plz} {city} -> {lat:.6f}, {lon:.6f}")
             return lat, lon
         else:
             print(f"  ❌ Keine Ergebnisse für: {plz} {city}, {country}")
+            metrics.record_nominatim_error('no_result')
             return None
             
     except Exception as e:
         print(f"  ⚠️  Geocoding-Fehler für {plz} {city}: {e}")
+        metrics.record_nominatim_error(metrics.classify_error(e))
         return None
 
 def get_country_code(country: str) -> str:
     """Konvertiert Ländernamen zu ISO-Codes für Nominatim"""
-    mapping = {
-        'deutschland': 'de',
-        'österreich': 'at',
-        'schweiz': 'ch',
-        'italien': 'it'
-    }
-    return mapping.get(country.lower(), 'de')
+    return geocode_backends.country_code(country)
 
 def find_missing_locations(stations: List[Dict], cache: Dict) -> List[Tuple[str, str, str]]:
-    """Findet Orte, die noch nicht im Cache sind"""
+    """Findet Orte, die noch nicht im Cache sind
+
+    Nur Stationen mit ungenauen Koordinaten (provenance), die ungenauesten und ältesten
+    zuerst. Die Abarbeitungsreihenfolge legt build_geocode_queue fest.
+    """
     missing = []
     seen = set()
     
-    for station in stations:
+    for station in sorted(stations, key=provenance.regeocode_priority):
+        if not provenance.is_low_precision(station):
+            continue
         location_data = extract_plz_city_country(station)
         if not location_data:
             continue
@@ -155,6 +161,25 @@ def find_missing_locations(stations: List[Dict], cache: Dict) -> List[Tuple[str,
     
     return missing
 
+def station_location(station: Dict) -> Optional[Tuple[str, Tuple[str, str, str]]]:
+    """(Cache-Schlüssel, (PLZ, Ort, Land)) einer Station oder None"""
+    location = extract_plz_city_country(station)
+    return (create_cache_key(*location), location) if location else None
+
+def build_geocode_queue(stations: List[Dict], cache: Dict) -> geocode_queue.GeocodeQueue:
+    """Orte ohne/mit ungenauen Koordinaten und fehlgeschlagene Orte, priorisiert (geocode_queue.py)"""
+    return geocode_queue.build_queue(stations, cache, station_location)
+
+def load_regeocode_list(path: Path) -> List[Tuple[str, str, str]]:
+    """Lädt die von qa_coordinates.py erzeugte Liste verdächtiger Orte"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f).get('entries', [])
+    except Exception as e:
+        print(f"❌ Fehler beim Laden von {path}: {e}")
+        return []
+    return [(e['plz'], e['city'], e['country']) for e in entries]
+
 def save_cache(cache: Dict):
     """Speichert den erweiterten Cache"""
     cache_path = Path('data/geocode_cache.json')
@@ -165,17 +190,45 @@ def save_cache(cache: Dict):
     except Exception as e:
         print(f"❌ Fehler beim Speichern: {e}")
 
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description='Automatische Erweiterung des Geocode-Cache')
-    parser.add_argument('--max', type=int, default=50, 
-                       help='Maximale Anzahl neuer Geocode-Anfragen (Standard: 50)')
+    parser.add_argument('--max', type=int, default=None,
+                       help='Maximale Anzahl neuer Geocode-Anfragen (Standard: 50, mit --deadline unbegrenzt)')
+    parser.add_argument('--deadline', type=geocode_queue.parse_deadline, default=None,
+                       help='Bis dahin geocodieren: Dauer (300, 10m, 1h) oder Uhrzeit (06:30)')
     parser.add_argument('--delay', type=float, default=1.0,
-                       help='Pause zwischen Anfragen in Sekunden (Standard: 1.0)')
+                       help='Mindestabstand zwischen Anfrage-Starts in Sekunden (Standard: 1.0)')
     parser.add_argument('--dry-run', action='store_true',
                        help='Nur anzeigen was gemacht würde, nichts ändern')
+    parser.add_argument('--from-list', type=Path, default=None,
+                       help='Orte aus einer QA-Liste (qa_coordinates.py) neu geocodieren, auch wenn im Cache')
+    parser.add_argument('--backend', metavar='BACKEND', default=None,
+                       help='Primäres Backend statt nominatim.openstreetmap.org (Format wie --hedge)')
+    parser.add_argument('--hedge', metavar='BACKEND', default=None,
+                       help='Zweites Backend für langsame Anfragen: photon=URL, nominatim=URL, table=PFAD oder centroid')
+    parser.add_argument('--hedge-after', type=float, default=geocode_backends.HEDGE_AFTER,
+                       help=f'Sekunden bis zur Zusatzanfrage an --hedge (Standard: {geocode_backends.HEDGE_AFTER:g})')
+    parser.add_argument('--budget', type=float, default=geocode_backends.BUDGET,
+                       help=f'Höchstdauer je Ort mit --hedge in Sekunden (Standard: {geocode_backends.BUDGET:g})')
+    parser.add_argument('--shard', type=geocode_shards.parse_shard, default=None, metavar='I/N',
+                       help='Nur Orte des Shards I von N (nach PLZ-Präfix); schreibt eine Shard-Datei statt des Cache')
+    parser.add_argument('--shard-prefix', type=int, default=geocode_shards.PREFIX_LENGTH,
+                       help=f'Ziffern des PLZ-Präfixes für --shard (Standard: {geocode_shards.PREFIX_LENGTH})')
+    parser.add_argument('--shard-file', type=Path, default=None,
+                       help=f'Shard-Datei (Standard: {geocode_shards.SHARD_DIR}/shard-I-of-N.json)')
+    profiling.add_argument(parser)
     
-    args = parser.parse_args()
-    
+    args = parser.parse_args(argv)
+    if args.max is None and args.deadline is None:
+        args.max = 50
+    if args.profile:
+        profiling.enable('cache_fill')
+    metrics.enable('cache_fill')
+    with metrics.stage('cache-fill'):
+        return run(args)
+
+def run(args) -> int:
+    """Eigentlicher Ablauf (von main() mit Zeitmessung aufgerufen); Rückgabe: Exit-Code"""
     print("🗺️  AUTOMATISCHE CACHE-ERWEITERUNG")
     print("=" * 50)
     
@@ -186,70 +239,150 @@ def main():
     
     if not stations:
         print("❌ Keine Stationen gefunden!")
-        return
+        return 1
     
     print(f"✅ {len(cache)} Cache-Einträge geladen")
     print(f"✅ {len(stations)} Stationen geladen")
     
-    # Fehlende Orte finden
-    print("\n🔍 Suche fehlende Orte...")
-    missing = find_missing_locations(stations, cache)
+    deadline = time.monotonic() + args.deadline if args.deadline is not None else None
+    if args.from_list:
+        # Gezielte Neu-Geocodierung verdächtiger Orte (Treffer überschreiben Cache-Einträge)
+        print(f"\n🔍 Lade Neu-Geocodier-Liste {args.from_list}...")
+        queue = geocode_queue.GeocodeQueue()
+        for location in load_regeocode_list(args.from_list):
+            queue.add(create_cache_key(*location), location, geocode_queue.QA_SUSPECT)
+    else:
+        # Fehlende Orte finden
+        print("\n🔍 Suche fehlende Orte...")
+        missing = find_missing_locations(stations, cache)
+        known = len({create_cache_key(*loc) for loc in filter(None, map(extract_plz_city_country, stations))})
+        metrics.record_cache_lookup(True, known - len(missing))
+        metrics.record_cache_lookup(False, len(missing))
+        queue = build_geocode_queue(stations, cache)
     
-    if not missing:
+    shard = None
+    if args.shard:
+        index, count = args.shard
+        try:
+            shard = geocode_shards.ShardFile.open(args.shard_file or geocode_shards.default_path(index, count),
+                                                  index, count, args.shard_prefix)
+        except (OSError, ValueError) as e:
+            print(f"❌ --shard: {e}")
+            return 1
+        total = len(queue)
+        queue = geocode_shards.select(queue, index, count, args.shard_prefix, shard.found_keys())
+        print(f"🧩 Shard {index}/{count}: {len(queue)} von {total} Orten"
+              f" ({len(shard.found_keys())} schon in {shard.path})")
+    
+    if not len(queue):
         print("🎉 Alle Orte sind bereits im Cache!")
-        return
+        return 0
     
-    print(f"📍 {len(missing)} fehlende Orte gefunden")
+    print(f"📍 {len(queue)} Orte in der Warteschlange: "
+          + ', '.join(f"{geocode_queue.PRIORITY_NAMES[p]}: {n}" for p, n in queue.counts().items()))
     
     if args.dry_run:
-        print("\n📝 DRY RUN - würde folgende Orte geocodieren:")
-        for i, (plz, city, country) in enumerate(missing[:args.max]):
-            print(f"  {i+1:3d}. {plz} {city}, {country}")
-        return
+        print("\n📝 DRY RUN - würde in dieser Reihenfolge geocodieren:")
+        for i, task in enumerate(queue.ordered()):
+            if args.max is not None and i >= args.max:
+                break
+            plz, city, country = task.location
+            print(f"  {i+1:3d}. {plz} {city}, {country}  [{geocode_queue.PRIORITY_NAMES[task.priority]}, "
+                  f"{task.stations} Station(en)]")
+        return 0
     
     # Geocoding starten
-    print(f"\n🌍 Starte Geocoding (max {args.max} Anfragen)...")
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'WildvogelhilfeApp/1.0 (Automated Cache Update)'
-    })
+    limits = []
+    if args.max is not None:
+        limits.append(f"max {args.max} Anfragen")
+    if args.deadline is not None:
+        limits.append(f"bis {datetime.now() + timedelta(seconds=args.deadline):%H:%M:%S}")
+    print(f"\n🌍 Starte Geocoding ({', '.join(limits)}, alle {args.delay:g} s)...")
+    import http_client  # erst hier: --dry-run und Statistik brauchen kein requests
+    session = http_client.create_session()
+    hedger = None
+    if args.backend or args.hedge:
+        try:
+            primary = (geocode_backends.create_backend(args.backend, http_client.create_session) if args.backend
+                       else geocode_backends.NominatimBackend(session))
+            # Eigene Session ohne Wiederholungen: das Absichern ersetzt das Warten auf Retries
+            secondary = (geocode_backends.create_backend(args.hedge, lambda: http_client.create_session(retries=0))
+                         if args.hedge else None)
+        except (ValueError, OSError) as e:
+            print(f"❌ --backend/--hedge: {e}")
+            return 1
+        hedger = geocode_backends.HedgedGeocoder(primary, secondary, args.hedge_after, args.budget)
+        if secondary is not None:
+            print(f"🛡️  Absicherung: nach {args.hedge_after:g} s zusätzlich {secondary.name}, "
+                  f"höchstens {args.budget:g} s je Ort")
     
-    new_entries = 0
-    failed_entries = 0
+    unresolved: List[str] = []
     
-    for i, (plz, city, country) in enumerate(missing[:args.max]):
-        print(f"🔍 {i+1:3d}/{min(len(missing), args.max)}: {plz} {city}, {country}")
-        
-        # Geocodierung
-        coords = geocode_location(plz, city, country, session)
-        cache_key = create_cache_key(plz, city, country)
-        
-        if coords:
-            cache[cache_key] = list(coords)  # [lat, lon]
-            new_entries += 1
+    def geocode(task) -> bool:
+        plz, city, country = task.location
+        print(f"🔍 {plz} {city}, {country} [{geocode_queue.PRIORITY_NAMES[task.priority]}]")
+        source = 'nominatim'
+        if hedger is None:
+            coords = geocode_location(plz, city, country, session)
         else:
-            cache[cache_key] = [None, None]  # Fehlgeschlagen markieren
-            failed_entries += 1
-        
-        # Pause zwischen Anfragen
-        if i < len(missing) - 1:  # Nicht nach dem letzten Eintrag warten
-            time.sleep(args.delay)
+            coords, winner = hedger.lookup(plz, city, country)
+            if coords and not winner.cacheable:
+                # Nur eine Näherung: Ort bleibt offen und wird beim nächsten Lauf erneut versucht
+                print(f"  ⏭️  {plz} {city} -> nur {winner.name}-Näherung, nicht im Cache")
+                return False
+            if coords:
+                source = winner.name
+                print(f"  ✅ {plz} {city} -> {coords[0]:.6f}, {coords[1]:.6f} [{winner.name}]")
+            else:
+                print(f"  ❌ Keine gültige Antwort für: {plz} {city}, {country}")
+        if shard is not None:
+            shard.record(task.key, coords, source)
+        else:
+            previous = cache.get(task.key)
+            if coords:
+                cache[task.key] = list(coords)
+            elif previous and previous[0] is not None:
+                # Fehlschlag (auch Netzfehler, falsches Land) überschreibt keinen Treffer
+                print(f"  ↩️  {plz} {city}: bisherige Koordinaten bleiben")
+                unresolved.append(task.key)
+            else:
+                cache[task.key] = [None, None]  # fehlgeschlagen
+        return coords is not None
+    
+    stats = geocode_queue.run_queue(queue, geocode, deadline, args.delay, args.max)
+    new_entries, failed_entries = stats['found'], stats['failed']
+    metrics.record_geocode_queue(stats)
+    if hedger is not None:
+        hedger.close()
     
-    # Cache speichern
-    print(f"\n💾 Speichere erweiterten Cache...")
-    save_cache(cache)
+    # Cache speichern (Shards landen erst mit geocode_shards.py merge im Cache)
+    if shard is not None:
+        shard.save()
+        print(f"\n💾 Shard gespeichert: {shard.path} ({len(shard.entries)} Einträge)")
+    else:
+        print(f"\n💾 Speichere erweiterten Cache...")
+        save_cache(cache)
     
     # Statistiken
     print(f"\n📊 ERGEBNISSE:")
     print(f"   ✅ {new_entries} neue Koordinaten hinzugefügt")
     print(f"   ❌ {failed_entries} Orte nicht gefunden")
+    if unresolved:
+        print(f"   ↩️  {len(unresolved)} davon ungelöst, alte Koordinaten behalten: " + ', '.join(unresolved[:10])
+              + (' …' if len(unresolved) > 10 else ''))
     print(f"   📍 {len(cache)} Gesamt-Einträge im Cache")
+    if stats['remaining']:
+        reason = {'deadline': 'Deadline erreicht', 'max': '--max erreicht'}.get(stats['stopped'], '')
+        print(f"   ⏳ {reason}, offen: " + ', '.join(f"{k}: {v}" for k, v in stats['remaining'].items()))
     print(f"\n🎉 Cache-Update abgeschlossen!")
+    return 0
 
 if __name__ == '__main__':
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt:
         print("\n⏹️  Unterbrochen durch Benutzer")
+        sys.exit(1)
     except Exception as e:
         print(f"\n❌ Unerwarteter Fehler: {e}")
+        sys.exit(1)
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Benchmark-Suite für Scraper, Cache und Koordinaten-Fix
+
+    python3 benchmark.py record                          # Fixtures aufzeichnen (Netz nötig)
+    python3 benchmark.py generate --size 100000 --out /tmp/wvh-100k
+    python3 benchmark.py run [--sizes 1000,10000,100000] [--only find_missing] [--repeat 3]
+    python3 benchmark.py run --only parse_blocks --sizes ''   # 20k-Seite, seriell vs. Prozess-Pool
+    python3 benchmark.py compare benchmarks/results/A.json benchmarks/results/B.json
+
+Gemessen werden scrape_page (die zehn PLZ-Seiten), parse_kml_data (NABU-KML), is_duplicate,
+find_missing_locations, fix_coordinates_in_json sowie Laden/Speichern der Stationsdatei.
+Die Seiten und die KML kommen aus benchmarks/fixtures/ (per `record` aufgezeichnet); fehlen
+sie, werden gleich aufgebaute Ersatzseiten erzeugt. Stationen und Cache für 1k–1M Einträge
+erzeugt der Generator deterministisch.
+
+Ergebnisse landen als JSON mit Commit-Hash in benchmarks/results/, `compare` stellt zwei
+Läufe gegenüber.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import contextlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import profiling
+
+FIXTURES_DIR = Path('benchmarks/fixtures')
+RESULTS_DIR = Path('benchmarks/results')
+DEFAULT_SIZES = [1000, 10000, 100000]
+KML_FIXTURE = FIXTURES_DIR / 'nabu.kml'
+# Ab dieser Abweichung markiert `compare` einen Benchmark
+THRESHOLD = 0.10
+
+CITY_SYLLABLES = ['berg', 'bach', 'dorf', 'hausen', 'feld', 'heim', 'stein', 'wald', 'au', 'burg', 'rode', 'tal']
+SPECIALIZATIONS = ['Alle Wildvogelarten', 'Greifvögel und Eulen', 'Singvögel', 'Mauersegler und Schwalben',
+                   'Wasservögel', 'Rabenvögel, Dohlen']
+
+
+def page_fixture(index: int) -> Path:
+    return FIXTURES_DIR / f"plz_{index}.html"
+
+
+# ---------------------------------------------------------------------------
+# Synthetische Daten
+# ---------------------------------------------------------------------------
+
+def synthetic_city(rng: random.Random) -> str:
+    """Ortsname nur aus Buchstaben (wie die Adress-Regex in auto_update_cache.py erwartet)."""
+    name = ''.join(rng.choice(CITY_SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return name.capitalize()
+
+
+def synthetic_station(rng: random.Random, i: int) -> Dict:
+    roll = rng.random()
+    if roll < 0.05:
+        country, plz, prefix = 'Österreich', f"{rng.randint(1000, 9999)}", 'österreich'
+        lat, lon = rng.uniform(46.5, 48.9), rng.uniform(9.6, 17.0)
+    elif roll < 0.08:
+        country, plz, prefix = 'Schweiz', f"{rng.randint(1000, 9999)}", 'schweiz'
+        lat, lon = rng.uniform(45.9, 47.8), rng.uniform(6.0, 10.4)
+    else:
+        country, plz = 'Deutschland', f"{rng.randint(1067, 99998):05d}"
+        prefix = plz[0]
+        lat, lon = rng.uniform(47.3, 54.9), rng.uniform(6.0, 15.0)
+    station = {
+        'name': f"Wildvogelhilfe {synthetic_city(rng)} {i}",
+        'specialization': rng.choice(SPECIALIZATIONS),
+        'address': f"{synthetic_city(rng)}straße {rng.randint(1, 120)}, {plz} {synthetic_city(rng)}",
+        'phone': f"0{rng.randint(30, 9999)} {rng.randint(10000, 9999999)}",
+        'plz': plz,
+        'plz_prefix': prefix,
+        'region': f"PLZ {plz[0]}" if country == 'Deutschland' else country,
+        'country': country,
+        'status': 'aktiv',
+    }
+    # Wie im echten Bestand: ein Teil hat (noch) keine Koordinaten
+    if rng.random() < 0.9:
+        station['latitude'] = round(lat, 6)
+        station['longitude'] = round(lon, 6)
+    return station
+
+
+def synthetic_dataset(n: int, seed: int = 42, cache_ratio: float = 0.8) -> Tuple[List[Dict], Dict]:
+    """n Stationen plus Geocode-Cache, der cache_ratio der Orte enthält (Rest fehlt)."""
+    from auto_update_cache import extract_plz_city_country, create_cache_key
+
+    rng = random.Random(seed)
+    stations = [synthetic_station(rng, i) for i in range(n)]
+    cache = {}
+    for station in stations:
+        location = extract_plz_city_country(station)
+        if location and rng.random() < cache_ratio:
+            if rng.random() < 0.03:
+                cache[create_cache_key(*location)] = [None, None]
+            else:
+                cache[create_cache_key(*location)] = [station.get('latitude', 51.0), station.get('longitude', 10.0)]
+    return stations, cache
+
+
+def synthetic_page(index: int, count: int = 40, seed: int = 7) -> bytes:
+    """Ersatz für eine PLZ-Seite: WordPress-Rahmen, Stationen als h3/p-Blöcke mit <hr> getrennt."""
+    rng = random.Random(seed + index)
+    blocks = []
+    for i in range(count):
+        plz = f"{index}{rng.randint(1000, 9999)}" if index else f"0{rng.randint(1067, 9999):04d}"
+        lines = [f"<h3>Wildvogelstation {synthetic_city(rng)} {i}</h3>",
+                 f"<p><span class=\"stationsinfo\">{rng.choice(SPECIALIZATIONS)}</span></p>",
+                 f"<p>{synthetic_city(rng)}weg {rng.randint(1, 80)}</p>",
+                 f"<p>{plz} {synthetic_city(rng)}</p>",
+                 f"<p>Tel: 0{rng.randint(30, 9999)} {rng.randint(10000, 999999)} (abends)</p>"]
+        if rng.random() < 0.3:
+            lines.append("<p>(Bitte vorher telefonisch anmelden)</p>")
+        blocks.append('\n'.join(lines) + '\n<hr />')
+    nav = ''.join(f"<li><a href=\"/plz-{j}/\">PLZ {j}</a></li>" for j in range(10))
+    html = (f"<!DOCTYPE html><html lang=\"de\"><head><meta charset=\"utf-8\"><title>Auffangstationen PLZ {index}"
+            f"</title></head><body><header><nav><ul>{nav}</ul></nav></header><main><article>"
+            f"<h1>Auffangstationen PLZ-Gebiet {index}</h1><div class=\"entry-content\">\n"
+            + '\n'.join(blocks) +
+            "\n</div></article></main><footer><p>© Wildvogelhilfe</p></footer></body></html>")
+    return html.encode('utf-8')
+
+
+def synthetic_kml(count: int = 300, seed: int = 11) -> bytes:
+    """Ersatz für den NABU-KML-Export (Placemarks mit mehrzeiliger HTML-Beschreibung)."""
+    rng = random.Random(seed)
+    placemarks = []
+    for i in range(count):
+        plz = f"{rng.randint(1067, 99998):05d}"
+        lat, lon = rng.uniform(47.3, 54.9), rng.uniform(6.0, 15.0)
+        description = '<br>\n'.join([
+            f"Familie {synthetic_city(rng)}",
+            f"{synthetic_city(rng)}straße {rng.randint(1, 90)}",
+            f"{plz} {synthetic_city(rng)}",
+            f"Tel: 0{rng.randint(30, 9999)} {rng.randint(10000, 999999)}",
+            f"station{i}@example.org",
+            f"Aufnahme und Pflege von {rng.choice(SPECIALIZATIONS)}",
+        ])
+        placemarks.append(
+            f"<Placemark><name>NABU Wildvogelstation {synthetic_city(rng)} {i}</name>"
+            f"<description><![CDATA[{description}]]></description>"
+            f"<Point><coordinates>{lon:.6f},{lat:.6f},0</coordinates></Point></Placemark>")
+    kml = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<kml xmlns="http://www.opengis.net/kml/2.2"><Document><name>Wildvogelhilfe NABU</name><Folder>'
+           + '\n'.join(placemarks) + '</Folder></Document></kml>')
+    return kml.encode('utf-8')
+
+
+def load_fixtures() -> Tuple[List[bytes], bytes, str]:
+    """Aufgezeichnete Seiten/KML oder, falls nicht vorhanden, die Ersatzdaten."""
+    recorded = all(page_fixture(i).exists() for i in range(10)) and KML_FIXTURE.exists()
+    if recorded:
+        return [page_fixture(i).read_bytes() for i in range(10)], KML_FIXTURE.read_bytes(), 'recorded'
+    return [synthetic_page(i) for i in range(10)], synthetic_kml(), 'synthetic'
+
+
+# ---------------------------------------------------------------------------
+# Messung
+# ---------------------------------------------------------------------------
+
+class FakeResponse:
+    """Minimaler Ersatz für requests.Response (scrape_page liest nur .content)."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.status_code = 200
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> List[float]:
+    """Führt fn repeat-mal aus (setup jeweils vorher, nicht gemessen), Ausgaben werden verworfen."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: List[float], items: int) -> Dict:
+    best = min(timings)
+    return {
+        'items': items,
+        'runs': len(timings),
+        'min_s': round(best, 6),
+        'median_s': round(statistics.median(timings), 6),
+        'mean_s': round(statistics.fmean(timings), 6),
+        'us_per_item': round(best / items * 1e6, 3) if items else None,
+    }
+
+
+@contextlib.contextmanager
+def working_directory(path: Path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def bench_scrape_page(pages: List[bytes], repeat: int) -> Dict:
+    from scraper_wildvogelhilfe_org import SimpleWildvogelhilfeScraper
+
+    scraper = SimpleWildvogelhilfeScraper()
+    responses = {url: FakeResponse(page) for (_region, url), page in zip(scraper.urls, pages)}
+    scraper._fetch_with_retries = lambda url, *a, **kw: responses[url]
+    found = []
+
+    def run():
+        found.clear()
+        for region, url in scraper.urls[:10]:
+            found.extend(scraper.scrape_page(region, url))
+
+    timings = measure(run, repeat)
+    return summarize(timings, len(found))
+
+
+def bench_parse_blocks(page_size: int, workers: int, repeat: int) -> Dict:
+    """Parsen der Stationsblöcke einer großen Seite (seriell oder im Prozess-Pool)."""
+    from bs4 import BeautifulSoup
+    from scraper_wildvogelhilfe_org import SimpleWildvogelhilfeScraper, split_station_blocks
+
+    soup = BeautifulSoup(synthetic_page(1, count=page_size), 'html.parser')
+    blocks = split_station_blocks(soup.find('div', class_='entry-content'))
+    scraper = SimpleWildvogelhilfeScraper(workers=workers)
+    found = []
+    try:
+        # Erster Aufruf startet den Pool, gemessen wird der eingeschwungene Zustand
+        scraper.parse_blocks(blocks[:1000], 'PLZ 1')
+
+        def run():
+            found[:] = scraper.parse_blocks(blocks, 'PLZ 1')
+
+        timings = measure(run, repeat)
+    finally:
+        scraper.close()
+    return summarize(timings, len(found))
+
+
+def bench_parse_kml(kml: bytes, repeat: int) -> Dict:
+    import xml.etree.ElementTree as ET
+    from scraper_nabu_wvh import NABUGoogleMapsScraper
+
+    scraper = NABUGoogleMapsScraper()
+    root = ET.fromstring(kml)
+
+    def setup():
+        scraper.data = []
+        scraper.existing_data = []
+
+    timings = measure(lambda: scraper.parse_kml_data(root), repeat, setup)
+    return summarize(timings, len(scraper.data))
+
+
+def bench_is_duplicate(stations: List[Dict], repeat: int, queries: int = 10) -> Dict:
+    from scraper_nabu_wvh import NABUGoogleMapsScraper
+
+    scraper = NABUGoogleMapsScraper()
+    scraper.existing_data = stations
+    # Nicht vorhandene Einträge: jeder Aufruf vergleicht gegen den ganzen Bestand
+    probes = [(f"Neue Station {i}", f"Teststraße {i}, 0{i:04d} Nirgendwo") for i in range(queries)]
+
+    def run():
+        for name, address in probes:
+            scraper.is_duplicate(name, address)
+
+    timings = measure(run, repeat)
+    # Pro Eintrag = ein Vergleich Anfrage × Bestand
+    return summarize(timings, queries * len(stations))
+
+
+def bench_find_missing(stations: List[Dict], cache: Dict, repeat: int) -> Dict:
+    from auto_update_cache import find_missing_locations
+
+    timings = measure(lambda: find_missing_locations(stations, cache), repeat)
+    return summarize(timings, len(stations))
+
+
+def bench_fix_coordinates(stations: List[Dict], cache: Dict, repeat: int) -> Dict:
+    import fix_coordinates
+
+    stations_json = json.dumps(stations, ensure_ascii=False, indent=2)
+    cache_json = json.dumps(cache, ensure_ascii=False, indent=2)
+    with tempfile.TemporaryDirectory(prefix='wvh-bench-') as tmp:
+        data_dir = Path(tmp) / 'data'
+        data_dir.mkdir()
+
+        def setup():
+            (data_dir / 'wildvogelhilfen.json').write_text(stations_json, encoding='utf-8')
+            (data_dir / 'geocode_cache.json').write_text(cache_json, encoding='utf-8')
+
+        with working_directory(Path(tmp)):
+            timings = measure(lambda: fix_coordinates.fix_coordinates_in_json(only_missing=True), repeat, setup)
+    return summarize(timings, len(stations))
+
+
+def bench_json_io(stations: List[Dict], repeat: int) -> Tuple[Dict, Dict]:
+    from station_utils import load_stations
+
+    with tempfile.TemporaryDirectory(prefix='wvh-bench-') as tmp:
+        path = Path(tmp) / 'wildvogelhilfen.json'
+
+        def save():
+            # Gleiche Form wie Scraper und fix_coordinates.py
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(stations, f, ensure_ascii=False, indent=2)
+
+        save_timings = measure(save, repeat)
+        load_timings = measure(lambda: load_stations(path), repeat)
+    return summarize(load_timings, len(stations)), summarize(save_timings, len(stations))
+
+
+def bench_wvhc(stations: List[Dict], repeat: int) -> Tuple[Dict, Dict]:
+    """Binär-Export (build_binary.py): alle Stationen dekodieren und eine BBox-Abfrage."""
+    import build_binary
+
+    data = build_binary.encode_stations(stations)
+    decode_timings = measure(lambda: build_binary.decode_stations(data), repeat)
+    bbox_timings = measure(lambda: build_binary.StationFile.from_bytes(data).query_bbox(52.3, 13.0, 52.7, 13.8), repeat)
+    return summarize(decode_timings, len(stations)), summarize(bbox_timings, len(stations))
+
+
+def git_commit() -> str:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10)
+        commit = result.stdout.strip() or 'unbekannt'
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, timeout=10).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except Exception:
+        return 'unbekannt'
+
+
+def run_benchmarks(sizes: List[int], repeat: int, only: Optional[List[str]] = None, page_size: int = 20000) -> Dict:
+    pages, kml, source = load_fixtures()
+    results: Dict[str, Dict] = {}
+
+    def wanted(name: str) -> bool:
+        return not only or any(name.startswith(o) for o in only)
+
+    def record(name: str, result: Dict):
+        results[name] = result
+        print(f"   {name:<34} {result['min_s'] * 1000:>10.2f} ms  "
+              f"(Median {result['median_s'] * 1000:.2f} ms, {result['items']} Einträge)")
+
+    print(f"📄 Fixtures: {'aufgezeichnet' if source == 'recorded' else 'Ersatzdaten (benchmark.py record fehlt)'}")
+    if wanted('scrape_page'):
+        record('scrape_page[10 Seiten]', bench_scrape_page(pages, repeat))
+    if wanted('parse_kml_data'):
+        record('parse_kml_data', bench_parse_kml(kml, repeat))
+    # Große Seite nur auf Anfrage (--only parse_blocks), seriell dauert sie ~20 s je Durchlauf
+    if only and wanted('parse_blocks'):
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            record(f"parse_blocks[{page_size} x{workers}]", bench_parse_blocks(page_size, workers, repeat))
+
+    for size in sizes:
+        stations, cache = synthetic_dataset(size)
+        if wanted('is_duplicate'):
+            record(f"is_duplicate[{size}]", bench_is_duplicate(stations, repeat))
+        if wanted('find_missing'):
+            record(f"find_missing_locations[{size}]", bench_find_missing(stations, cache, repeat))
+        if wanted('fix_coordinates'):
+            record(f"fix_coordinates_in_json[{size}]", bench_fix_coordinates(stations, cache, repeat))
+        if wanted('json'):
+            load_result, save_result = bench_json_io(stations, repeat)
+            record(f"json_load[{size}]", load_result)
+            record(f"json_save[{size}]", save_result)
+        if wanted('wvhc'):
+            decode_result, bbox_result = bench_wvhc(stations, repeat)
+            record(f"wvhc_decode[{size}]", decode_result)
+            record(f"wvhc_bbox[{size}]", bbox_result)
+
+    return {
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}",
+        'fixtures': source,
+        'repeat': repeat,
+        'sizes': sizes,
+        'benchmarks': results,
+    }
+
+
+def compare(old: Dict, new: Dict, threshold: float = THRESHOLD) -> int:
+    """Stellt zwei Ergebnisdateien gegenüber; Rückgabe = Anzahl Verschlechterungen."""
+    print(f"   {'Benchmark':<34} {old['commit']:>12} {new['commit']:>12}   Faktor")
+    if old.get('fixtures') != new.get('fixtures'):
+        print(f"⚠️  Unterschiedliche Fixtures ({old.get('fixtures')} / {new.get('fixtures')})")
+    regressions = 0
+    for name, result in new['benchmarks'].items():
+        before = old['benchmarks'].get(name)
+        if not before:
+            print(f"   {name:<34} {'–':>12} {result['min_s'] * 1000:>10.2f}ms")
+            continue
+        ratio = result['min_s'] / before['min_s'] if before['min_s'] else float('inf')
+        marker = ''
+        if ratio > 1 + threshold:
+            marker = ' 🔴'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            marker = ' 🟢'
+        print(f"   {name:<34} {before['min_s'] * 1000:>10.2f}ms {result['min_s'] * 1000:>10.2f}ms   "
+              f"{ratio:5.2f}x{marker}")
+    return regressions
+
+
+def cmd_record(args) -> int:
+    """Lädt die zehn PLZ-Seiten und den NABU-KML-Export als Fixtures herunter."""
+    from scraper_wildvogelhilfe_org import SimpleWildvogelhilfeScraper
+    from scraper_nabu_wvh import NABUGoogleMapsScraper
+
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    scraper = SimpleWildvogelhilfeScraper()
+    for index, (region, url) in enumerate(scraper.urls[:10]):
+        response = scraper._fetch_with_retries(url)
+        if response is None:
+            print(f"❌ {region} nicht erreichbar")
+            return 1
+        page_fixture(index).write_bytes(response.content)
+        print(f"💾 {page_fixture(index)} ({len(response.content) / 1024:.0f} KB)")
+    nabu = NABUGoogleMapsScraper()
+    try:
+        response = nabu.session.get(nabu.kml_url)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"❌ KML nicht erreichbar: {e}")
+        return 1
+    KML_FIXTURE.write_bytes(response.content)
+    print(f"💾 {KML_FIXTURE} ({len(response.content) / 1024:.0f} KB)")
+    return 0
+
+
+def cmd_generate(args) -> int:
+    stations, cache = synthetic_dataset(args.size, args.seed)
+    out = Path(args.out)
+    (out / 'data').mkdir(parents=True, exist_ok=True)
+    with open(out / 'data' / 'wildvogelhilfen.json', 'w', encoding='utf-8') as f:
+        json.dump(stations, f, ensure_ascii=False, indent=2)
+    with open(out / 'data' / 'geocode_cache.json', 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    print(f"💾 {len(stations)} Stationen, {len(cache)} Cache-Einträge in {out / 'data'}")
+    return 0
+
+
+def cmd_run(args) -> int:
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    print("⏱️  BENCHMARKS")
+    print("=" * 50)
+    report = run_benchmarks(sizes, args.repeat, args.only, args.page_size)
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"💾 Ergebnisse: {output}")
+    return 0
+
+
+def cmd_compare(args) -> int:
+    old = json.loads(args.old.read_text(encoding='utf-8'))
+    new = json.loads(args.new.read_text(encoding='utf-8'))
+    regressions = compare(old, new, args.threshold)
+    if regressions:
+        print(f"🔴 {regressions} Benchmarks mehr als {args.threshold:.0%} langsamer")
+        return 1
+    print("✅ Keine Verschlechterung")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Benchmarks für Scraper, Cache und Koordinaten-Fix')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('record', help='PLZ-Seiten und NABU-KML als Fixtures aufzeichnen')
+
+    p_gen = sub.add_parser('generate', help='Synthetische Stations- und Cache-Datei erzeugen')
+    p_gen.add_argument('--size', type=int, default=10000, help='Anzahl Stationen (Standard: 10000)')
+    p_gen.add_argument('--seed', type=int, default=42)
+    p_gen.add_argument('--out', required=True, help='Zielverzeichnis (darin data/...)')
+
+    p_run = sub.add_parser('run', help='Benchmarks ausführen und als JSON speichern')
+    p_run.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                       help='Datenmengen, kommagetrennt (Standard: 1000,10000,100000; bis 1000000)')
+    p_run.add_argument('--repeat', type=int, default=3, help='Wiederholungen je Benchmark (Standard: 3)')
+    p_run.add_argument('--only', nargs='*', default=None, metavar='NAME',
+                       help='Nur Benchmarks mit diesem Präfix (z.B. scrape_page find_missing json wvhc)')
+    p_run.add_argument('--output', type=Path, default=None, help='Ergebnisdatei (Standard: benchmarks/results/)')
+    p_run.add_argument('--page-size', type=int, default=20000,
+                       help='Stationen der synthetischen Seite für parse_blocks (Standard: 20000)')
+
+    p_cmp = sub.add_parser('compare', help='Zwei Ergebnisdateien vergleichen')
+    p_cmp.add_argument('old', type=Path)
+    p_cmp.add_argument('new', type=Path)
+    p_cmp.add_argument('--threshold', type=float, default=THRESHOLD,
+                       help=f'Toleranz vor Markierung als Verschlechterung (Standard: {THRESHOLD})')
+
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('benchmark')
+    commands = {'record': cmd_record, 'generate': cmd_generate, 'run': cmd_run, 'compare': cmd_compare}
+    return commands[args.command](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
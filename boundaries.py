@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Land und Bundesland aus Koordinaten (Punkt-in-Polygon, offline)
+
+Statt Stichwortlisten ("wien", "zürich") und PLZ-Längen entscheiden mitgelieferte,
+vereinfachte Grenzpolygone (data/boundaries.json, GeoJSON), in welchem Land und Bundesland
+eine Koordinate liegt. Damit fallen auch Geocodes auf, die im falschen Land gelandet sind –
+ohne eine zusätzliche Nominatim-Anfrage.
+
+Index: Raster mit GRID_DEG Grad Zellgröße, einmal beim Laden gebaut. Zellen, die ganz in
+einem Polygon liegen, liefern das Ergebnis direkt; nur Zellen mit einer Grenze darin
+brauchen den (vektorisierten) Strahltest gegen ihre wenigen Kandidaten.
+
+Die mitgelieferten Umrisse sind grob (einige km, Küsten großzügig); deshalb gilt eine
+Koordinate erst als "falsches Land", wenn sie mehr als BORDER_TOLERANCE_KM außerhalb liegt.
+Genauere Daten: python boundaries.py build --source <Natural-Earth-Admin-1.geojson>
+"""
+
+import sys
+import json
+import math
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from station_utils import STATIONS_PATH, load_stations, get_station_coords
+import profiling
+import provenance
+
+BOUNDARIES_PATH = Path('data/boundaries.json')
+GRID_DEG = 0.25
+BORDER_TOLERANCE_KM = 10.0
+KM_PER_DEG = 111.2
+
+# Länder im Datensatz (Name wie im Feld 'country' der Stationen)
+COUNTRIES = {'DE': 'Deutschland', 'AT': 'Österreich', 'CH': 'Schweiz', 'LI': 'Liechtenstein', 'IT': 'Italien'}
+
+
+def _points_in_rings(x: np.ndarray, y: np.ndarray, rings: List[np.ndarray]) -> np.ndarray:
+    """Gerade-Ungerade-Regel über alle Ringe (Löcher inklusive) für viele Punkte auf einmal."""
+    inside = np.zeros(len(x), dtype=bool)
+    px, py = x[:, None], y[:, None]
+    for ring in rings:
+        x1, y1, x2, y2 = ring[:-1, 0], ring[:-1, 1], ring[1:, 0], ring[1:, 1]
+        crosses = (y1 > py) != (y2 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_at = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= (np.count_nonzero(crosses & (px < x_at), axis=1) % 2).astype(bool)
+    return inside
+
+
+def _segment_distances_km(lat: np.ndarray, lon: np.ndarray, segments: Tuple[np.ndarray, ...],
+                          chunk_cells: int = 2_000_000) -> np.ndarray:
+    """Kürzeste Entfernung je Punkt zu einer der Kanten (lokal flache Erde, reicht für Grenzabstände).
+
+    segments: (lon_a, lat_a, lon_b, lat_b) aller Kanten. Gerechnet wird als Matrix Punkte × Kanten,
+    in Blöcken von höchstens chunk_cells Einträgen.
+    """
+    sax, say, sbx, sby = segments
+    result = np.full(len(lat), np.inf)
+    if not len(sax):
+        return result
+    step = max(1, chunk_cells // len(sax))
+    for start in range(0, len(lat), step):
+        plat, plon = lat[start:start + step, None], lon[start:start + step, None]
+        scale = np.cos(np.radians(plat))
+        ax, ay = (sax - plon) * scale, say - plat
+        dx, dy = (sbx - sax) * scale, np.broadcast_to(sby - say, ax.shape)
+        length2 = dx * dx + dy * dy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.clip(np.where(length2 > 0, -(ax * dx + ay * dy) / length2, 0.0), 0.0, 1.0)
+        dist2 = (ax + t * dx) ** 2 + (ay + t * dy) ** 2
+        result[start:start + step] = np.sqrt(dist2.min(axis=1)) * KM_PER_DEG
+    return result
+
+
+class BoundaryIndex:
+    """Polygone aus einer GeoJSON-FeatureCollection mit Rasterindex.
+
+    regions[i] sind die properties des i-ten Features (country, iso, state, state_code);
+    locate_many() liefert diese Indizes (-1 = außerhalb aller Polygone).
+    """
+
+    def __init__(self, features: List[Dict], grid_deg: float = GRID_DEG):
+        self.grid_deg = grid_deg
+        self.regions: List[Dict] = []
+        # Je Polygon: (Region, Ringe als (n, 2)-Arrays lon/lat, Fläche in Grad²)
+        self.polygons: List[Tuple[int, List[np.ndarray], float]] = []
+        for feature in features:
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                parts = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                parts = geometry['coordinates']
+            else:
+                continue
+            region = len(self.regions)
+            self.regions.append(dict(feature.get('properties') or {}))
+            for part in parts:
+                rings = [np.asarray(ring, dtype=np.float64) for ring in part if len(ring) >= 4]
+                if rings:
+                    self.polygons.append((region, rings, self._area(rings)))
+        # Kleinste Fläche zuerst: Enklaven (Berlin, Bremen) gewinnen gegen das umgebende Land
+        self.polygons.sort(key=lambda p: p[2])
+        self._build_grid()
+        # Für die Grenzabstände: Land je Region und alle Kanten je Land, einmal beim Laden
+        self._country_names = {r.get('country') for r in self.regions}
+        self._region_country = np.array([r.get('country') for r in self.regions] + [None], dtype=object)
+        edges: Dict[str, List[np.ndarray]] = {}
+        for region, rings, _area in self.polygons:
+            edges.setdefault(self.regions[region].get('country'), []).extend(
+                np.hstack([ring[:-1], ring[1:]]) for ring in rings)
+        self._country_segments: Dict[str, Tuple[np.ndarray, ...]] = {
+            country: tuple(np.vstack(parts).T.copy()) for country, parts in edges.items()}
+
+    @staticmethod
+    def _area(rings: List[np.ndarray]) -> float:
+        total = 0.0
+        for i, ring in enumerate(rings):
+            x, y = ring[:, 0], ring[:, 1]
+            area = abs(float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))) / 2
+            total += area if i == 0 else -area
+        return total
+
+    @classmethod
+    def from_file(cls, path: Path = BOUNDARIES_PATH) -> 'BoundaryIndex':
+        data = json.loads(path.read_text(encoding='utf-8'))
+        return cls(data.get('features', []))
+
+    def _cell(self, lat, lon):
+        return np.floor(np.asarray(lat) / self.grid_deg).astype(np.int64), \
+            np.floor(np.asarray(lon) / self.grid_deg).astype(np.int64)
+
+    def _build_grid(self):
+        # Randzellen: alle Zellen im Rechteck jeder Kante (konservativ)
+        edge_cells: Dict[Tuple[int, int], List[int]] = {}
+        for pid, (_region, rings, _area) in enumerate(self.polygons):
+            touched = set()
+            for ring in rings:
+                row_a, col_a = self._cell(ring[:-1, 1], ring[:-1, 0])
+                row_b, col_b = self._cell(ring[1:, 1], ring[1:, 0])
+                for r0, r1, c0, c1 in zip(np.minimum(row_a, row_b).tolist(), np.maximum(row_a, row_b).tolist(),
+                                          np.minimum(col_a, col_b).tolist(), np.maximum(col_a, col_b).tolist()):
+                    for row in range(r0, r1 + 1):
+                        for col in range(c0, c1 + 1):
+                            touched.add((row, col))
+            for cell in touched:
+                edge_cells.setdefault(cell, []).append(pid)
+        self.candidates: Dict[Tuple[int, int], List[int]] = {cell: sorted(pids) for cell, pids in edge_cells.items()}
+
+        # Innenzellen: ohne Kante des Polygons darin entscheidet der Zellmittelpunkt für die ganze Zelle
+        self.interior: Dict[Tuple[int, int], int] = {}
+        for pid, (region, rings, _area) in enumerate(self.polygons):
+            outer = rings[0]
+            (row0, row1), (col0, col1) = self._cell([outer[:, 1].min(), outer[:, 1].max()],
+                                                   [outer[:, 0].min(), outer[:, 0].max()])
+            rows, cols = np.meshgrid(np.arange(row0, row1 + 1), np.arange(col0, col1 + 1), indexing='ij')
+            rows, cols = rows.ravel(), cols.ravel()
+            keep = np.array([pid not in edge_cells.get(cell, ())
+                             for cell in zip(rows.tolist(), cols.tolist())], dtype=bool)
+            rows, cols = rows[keep], cols[keep]
+            if not len(rows):
+                continue
+            inside = _points_in_rings((cols + 0.5) * self.grid_deg, (rows + 0.5) * self.grid_deg, rings)
+            for cell in zip(rows[inside].tolist(), cols[inside].tolist()):
+                # Polygone sind nach Fläche sortiert: das erste (kleinste) gewinnt
+                if cell not in self.interior and not self.candidates.get(cell):
+                    self.interior[cell] = region
+                elif cell in self.candidates:
+                    self.candidates[cell] = sorted(set(self.candidates[cell]) | {pid})
+
+    def locate_many(self, lat, lon) -> np.ndarray:
+        """Region je Punkt (Index in self.regions, -1 wenn außerhalb)."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        result = np.full(len(lat), -1, dtype=np.int64)
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        if not len(valid):
+            return result
+        rows, cols = self._cell(lat[valid], lon[valid])
+        keys, inverse = np.unique(np.stack([rows, cols], axis=1), axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        for k, (row, col) in enumerate(keys.tolist()):
+            idx = valid[inverse == k]
+            region = self.interior.get((row, col))
+            if region is not None:
+                result[idx] = region
+                continue
+            open_idx = idx
+            for pid in self.candidates.get((row, col), ()):
+                region, rings, _area = self.polygons[pid]
+                hit = _points_in_rings(lon[open_idx], lat[open_idx], rings)
+                result[open_idx[hit]] = region
+                open_idx = open_idx[~hit]
+                if not len(open_idx):
+                    break
+        return result
+
+    def locate(self, lat: float, lon: float) -> Optional[Dict]:
+        region = int(self.locate_many([lat], [lon])[0])
+        return self.regions[region] if region >= 0 else None
+
+    def countries(self) -> set:
+        return self._country_names
+
+    def outside_km_many(self, lat, lon, countries, located: Optional[np.ndarray] = None) -> np.ndarray:
+        """outside_km für viele Punkte: Entfernung je Punkt zur nächsten Grenze seines Landes.
+
+        0 für Punkte in ihrem Land, NaN ohne Koordinaten oder bei Ländern ohne Grenzdaten.
+        located: schon berechnetes locate_many(lat, lon) (spart den zweiten Durchlauf).
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        countries = np.asarray(countries, dtype=object)
+        if located is None:
+            located = self.locate_many(lat, lon)
+        result = np.full(len(lat), np.nan)
+        known = np.isfinite(lat) & np.isfinite(lon) & np.fromiter(
+            (c in self._country_names for c in countries.tolist()), dtype=bool, count=len(countries))
+        # Index -1 (außerhalb) trifft den angehängten None-Eintrag
+        inside = known & (self._region_country[located] == countries)
+        result[inside] = 0.0
+        outside = np.flatnonzero(known & ~inside)
+        for country in set(countries[outside].tolist()):
+            idx = outside[countries[outside] == country]
+            result[idx] = _segment_distances_km(lat[idx], lon[idx], self._country_segments[country])
+        return result
+
+    def outside_km(self, lat: float, lon: float, country: str) -> Optional[float]:
+        """Entfernung zur nächsten Grenze von country, 0 wenn der Punkt darin liegt.
+
+        None, wenn das Land nicht in den Grenzdaten vorkommt (dann lässt sich nichts sagen).
+        """
+        if country not in self._country_names:
+            return None
+        return float(self.outside_km_many([lat], [lon], [country])[0])
+
+    def wrong_country(self, lat: float, lon: float, country: str,
+                      tolerance_km: float = BORDER_TOLERANCE_KM) -> bool:
+        """True, wenn die Koordinate deutlich (mehr als tolerance_km) außerhalb von country liegt."""
+        distance = self.outside_km(lat, lon, country)
+        return distance is not None and distance > tolerance_km
+
+    def wrong_country_many(self, lat, lon, countries, tolerance_km: float = BORDER_TOLERANCE_KM,
+                           located: Optional[np.ndarray] = None) -> np.ndarray:
+        """wrong_country für viele Punkte auf einmal."""
+        distance = self.outside_km_many(lat, lon, countries, located)
+        with np.errstate(invalid='ignore'):
+            return distance > tolerance_km
+
+
+_DEFAULT: Optional[BoundaryIndex] = None
+
+
+def get_index(path: Path = BOUNDARIES_PATH) -> Optional[BoundaryIndex]:
+    """Geladener Standard-Index (einmal je Prozess); None, wenn die Grenzdaten fehlen."""
+    global _DEFAULT
+    if _DEFAULT is None and path.exists():
+        _DEFAULT = BoundaryIndex.from_file(path)
+    return _DEFAULT
+
+
+def wrong_country(lat: float, lon: float, country: str) -> bool:
+    """Geocode-Prüfung für Aufrufer ohne eigenen Index (ohne Grenzdaten: nie falsch)."""
+    index = get_index()
+    if not index or not country:
+        return False
+    # Aufrufer nutzen teils Kleinschreibung ('deutschland' im Cache-Schlüssel)
+    names = {name.lower(): name for name in index.countries() if name}
+    return index.wrong_country(lat, lon, names.get(country.lower(), country))
+
+
+def country_at(lat: float, lon: float) -> Optional[str]:
+    index = get_index()
+    region = index.locate(lat, lon) if index else None
+    return region.get('country') if region else None
+
+
+def _plz_fields(station: Dict, country: str):
+    # Gleiche Regeln wie scraper_nabu_wvh.extract_plz_info
+    plz = str(station.get('plz') or '')
+    if country == 'Deutschland' and len(plz) == 5:
+        station['plz_prefix'] = plz[0]
+        station['region'] = f"PLZ {plz[0]}"
+    else:
+        station['plz_prefix'] = country.lower()
+        station['region'] = country
+
+
+def apply_region(station: Dict, region: Optional[Dict]) -> str:
+    """Setzt 'state' (und bei exakten Koordinaten 'country') aus der gefundenen Region.
+
+    PLZ-Näherungen (Herkunft mit Genauigkeit 'region') bekommen kein Bundesland: die
+    Koordinate ist dort nur aus der PLZ geraten. Rückgabe: 'country', 'state', 'unchanged'
+    oder 'cleared'.
+    """
+    info = provenance.get(station) or {}
+    if info.get('precision') == 'region' or region is None:
+        return 'cleared' if station.pop('state', None) is not None else 'unchanged'
+    country = region.get('country')
+    result = 'unchanged'
+    if info.get('precision') == 'exact' and country and station.get('country') != country:
+        # Von Hand gesetzter Kartenpunkt schlägt die Stichwort-Vermutung aus der Adresse
+        station['country'] = country
+        _plz_fields(station, country)
+        result = 'country'
+    state = region.get('state') if station.get('country') == country else None
+    if state:
+        if station.get('state') != state:
+            station['state'] = state
+            result = result if result != 'unchanged' else 'state'
+    elif station.pop('state', None) is not None and result == 'unchanged':
+        result = 'cleared'
+    return result
+
+
+def assign_regions(stations: List[Dict], index: BoundaryIndex,
+                   tolerance_km: float = BORDER_TOLERANCE_KM) -> Dict:
+    """Bundesland/Land für alle Stationen in einem Batch; Rückgabe: Zähler und Abweichungen."""
+    coords = [get_station_coords(s) for s in stations]
+    lat = np.array([c[0] if c else np.nan for c in coords])
+    lon = np.array([c[1] if c else np.nan for c in coords])
+    located = index.locate_many(lat, lon)
+    counts: Dict[str, int] = {}
+    for station, coord, region in zip(stations, coords, located.tolist()):
+        if not coord:
+            counts['no_coords'] = counts.get('no_coords', 0) + 1
+            continue
+        result = apply_region(station, index.regions[region] if region >= 0 else None)
+        counts[result] = counts.get(result, 0) + 1
+    # Abstände erst nach apply_region: korrigierte Länder zählen nicht als Abweichung
+    distances = index.outside_km_many(lat, lon, [s.get('country') for s in stations], located)
+    mismatches = []
+    for station, coord, region, distance in zip(stations, coords, located.tolist(), distances.tolist()):
+        if coord and distance > tolerance_km:
+            found = index.regions[region] if region >= 0 else None
+            mismatches.append({'name': station.get('name', ''), 'country': station.get('country'),
+                               'located': found.get('country') if found else None,
+                               'latitude': coord[0], 'longitude': coord[1], 'outside_km': round(distance, 1)})
+    return {'counts': counts, 'mismatches': mismatches}
+
+
+# ---------------------------------------------------------------------------
+# Grenzdaten aus Natural Earth (Admin-1) erzeugen
+# ---------------------------------------------------------------------------
+
+def simplify(points: List[List[float]], tolerance: float) -> List[List[float]]:
+    """Douglas-Peucker (iterativ) für einen geschlossenen Ring; Start/Ende bleiben."""
+    if len(points) <= 4:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        (x1, y1), (x2, y2) = points[start][:2], points[end][:2]
+        dx, dy = x2 - x1, y2 - y1
+        norm = math.hypot(dx, dy)
+        best, best_i = 0.0, None
+        for i in range(start + 1, end):
+            px, py = points[i][:2]
+            d = abs(dy * (px - x1) - dx * (py - y1)) / norm if norm else math.hypot(px - x1, py - y1)
+            if d > best:
+                best, best_i = d, i
+        if best_i is not None and best > tolerance:
+            keep[best_i] = True
+            stack.append((start, best_i))
+            stack.append((best_i, end))
+    result = [p for p, k in zip(points, keep) if k]
+    return result if len(result) >= 4 else points
+
+
+def build_from_admin1(source: Path, tolerance: float, countries: Dict[str, str] = COUNTRIES) -> Dict:
+    """FeatureCollection mit vereinfachten Bundesländern der gewünschten Länder."""
+    data = json.loads(source.read_text(encoding='utf-8'))
+    features = []
+    for feature in data.get('features', []):
+        props = feature.get('properties') or {}
+        iso = props.get('iso_a2') or props.get('ISO_A2')
+        if iso not in countries:
+            continue
+        geometry = feature.get('geometry') or {}
+        parts = [geometry['coordinates']] if geometry.get('type') == 'Polygon' else geometry.get('coordinates', [])
+        polygons = []
+        for part in parts:
+            rings = [[[round(x, 4), round(y, 4)] for x, y, *_ in simplify(ring, tolerance)] for ring in part]
+            if len(rings[0]) >= 4:
+                polygons.append(rings)
+        if not polygons:
+            continue
+        code = (props.get('iso_3166_2') or '').split('-')[-1] or None
+        features.append({
+            'type': 'Feature',
+            'properties': {'country': countries[iso], 'iso': iso,
+                           'state': props.get('name_de') or props.get('name'), 'state_code': code},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': polygons},
+        })
+    features.sort(key=lambda f: (f['properties']['iso'], f['properties']['state'] or ''))
+    return {'type': 'FeatureCollection', 'name': 'wvhmap-boundaries',
+            'source': f"{source.name}, vereinfacht mit Toleranz {tolerance} Grad", 'features': features}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Land/Bundesland aus Koordinaten (Punkt-in-Polygon)')
+    parser.add_argument('--boundaries', type=Path, default=BOUNDARIES_PATH, help='Grenzdaten (GeoJSON)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_assign = sub.add_parser('assign', help='Bundesland setzen und Länder-Abweichungen melden')
+    p_assign.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    p_assign.add_argument('--tolerance-km', type=float, default=BORDER_TOLERANCE_KM,
+                          help=f'Erst ab dieser Entfernung außerhalb gilt das Land als falsch '
+                               f'(Standard: {BORDER_TOLERANCE_KM:g})')
+    p_assign.add_argument('--dry-run', action='store_true', help='Nur berichten, nichts speichern')
+
+    p_locate = sub.add_parser('locate', help='Region einer Koordinate ausgeben')
+    p_locate.add_argument('lat', type=float)
+    p_locate.add_argument('lon', type=float)
+
+    p_build = sub.add_parser('build', help='Grenzdaten aus Natural-Earth-Admin-1 (GeoJSON) erzeugen')
+    p_build.add_argument('--source', type=Path, required=True, help='z.B. ne_10m_admin_1_states_provinces.geojson')
+    p_build.add_argument('--tolerance', type=float, default=0.01, help='Vereinfachung in Grad (Standard: 0.01)')
+
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('boundaries')
+
+    if args.command == 'build':
+        collection = build_from_admin1(args.source, args.tolerance)
+        if not collection['features']:
+            print(f"❌ Keine passenden Features in {args.source}")
+            return 1
+        payload = json.dumps(collection, ensure_ascii=False, separators=(',', ':')) + '\n'
+        tmp_path = args.boundaries.with_name(args.boundaries.name + '.tmp')
+        tmp_path.write_text(payload, encoding='utf-8')
+        tmp_path.replace(args.boundaries)
+        print(f"💾 {args.boundaries}: {len(collection['features'])} Regionen, "
+              f"{len(payload.encode('utf-8')) / 1024:.1f} KB")
+        return 0
+
+    if not args.boundaries.exists():
+        print(f"❌ Grenzdaten fehlen: {args.boundaries}")
+        return 1
+    start = time.perf_counter()
+    index = BoundaryIndex.from_file(args.boundaries)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    if args.command == 'locate':
+        region = index.locate(args.lat, args.lon)
+        if not region:
+            print(f"❓ ({args.lat}, {args.lon}) liegt außerhalb der Grenzdaten")
+            return 1
+        print(f"📍 ({args.lat}, {args.lon}): {region.get('country')}"
+              + (f" / {region['state']}" if region.get('state') else ''))
+        return 0
+
+    print("🗺️  LAND/BUNDESLAND AUS KOORDINATEN")
+    print("=" * 50)
+    stations = load_stations(args.input)
+    if not stations:
+        return 1
+    print(f"   Index: {len(index.regions)} Regionen, {len(index.interior)} Innen-/"
+          f"{len(index.candidates)} Randzellen ({build_ms:.0f} ms)")
+    with profiling.stage('assign_regions'):
+        result = assign_regions(stations, index, args.tolerance_km)
+    counts = result['counts']
+    print(f"   ✅ Bundesland neu/geändert: {counts.get('state', 0)}, Land korrigiert: {counts.get('country', 0)}, "
+          f"entfernt: {counts.get('cleared', 0)}, unverändert: {counts.get('unchanged', 0)}, "
+          f"ohne Koordinaten: {counts.get('no_coords', 0)}")
+    for m in result['mismatches']:
+        located = m['located'] or 'außerhalb'
+        print(f"   ⚠️  {m['name'][:45]:<45} {m['country']} → liegt in {located} "
+              f"({m['outside_km']} km außerhalb)")
+    changed = counts.get('state', 0) + counts.get('country', 0) + counts.get('cleared', 0)
+    if args.dry_run or not changed:
+        return 0
+    tmp_path = args.input.with_name(args.input.name + '.tmp')
+    tmp_path.write_text(json.dumps(stations, ensure_ascii=False, indent=2), encoding='utf-8')
+    tmp_path.replace(args.input)
+    print(f"💾 {args.input} gespeichert")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Kompakter Binär-Export der Stationen (data/stations.wvhc, optional data/stations.fgb)
+
+WVHC ist ein spaltenweises Format in Blöcken:
+
+  Kopf (32 Byte)   'WVHC', Version, Blockgröße, Anzahl, Skalierung, Länge der Metadaten, Blockanzahl
+  Metadaten        JSON: Spalten (Name, Art) und Wörterbücher der Wörterbuch-Spalten
+  Blockindex       je Block 32 Byte: Bounding Box (Festkomma), Byte-Offset/-Länge, erste Zeile, Zeilen
+  Blöcke           je Block: Koordinaten, danach jede Spalte für sich
+
+Die Stationen sind entlang einer Hilbert-Kurve sortiert (wie bei FlatGeobuf), benachbarte
+Stationen liegen also im selben Block. Eine Umkreis-/BBox-Abfrage liest Kopf, Metadaten und
+Index und danach nur die Blöcke, deren Box die Abfrage schneidet – lokal per seek, im
+Browser per HTTP-Range-Request (js/stations_bin.js).
+
+Spalten:
+  Koordinaten   Festkomma (1e-7 Grad), Differenz zur Vorgängerstation, ZigZag-Varint
+  dict          country, region, plz_prefix, state, status: Code je Zeile (u8/u16, 0 = fehlt)
+  text          Anwesenheits-Bitmap + UTF-8 der vorhandenen Werte, getrennt durch NUL
+  json          wie text, Werte als JSON durch Komma getrennt (ein json.loads je Spalte)
+
+Gleiche Stationsdaten ergeben byteidentische Dateien (kein Zeitstempel). FlatGeobuf (mit
+gepacktem R-Baum) entsteht zusätzlich, wenn GDAL (osgeo) installiert ist.
+"""
+
+import io
+import sys
+import gzip
+import json
+import time
+import struct
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from station_utils import STATIONS_PATH, load_stations, get_station_coords
+import profiling
+
+OUTPUT_PATH = Path('data/stations.wvhc')
+FGB_PATH = Path('data/stations.fgb')
+REPORT_PATH = Path('logs/binary_formats.json')
+
+MAGIC = b'WVHC'
+FORMAT_VERSION = 1
+SCALE = 10_000_000  # 1e-7 Grad ≈ 1 cm; ±180° passt noch in int32
+BLOCK_SIZE = 64
+HILBERT_BITS = 16
+HAS_COORDS = 1
+
+HEADER = struct.Struct('<4sHHIIIIQ')        # magic, version, block_size, count, scale, meta_len, blocks, reserviert
+INDEX_ENTRY = struct.Struct('<iiiiIIIHH')   # min_lat, min_lon, max_lat, max_lon, offset, length, first_row, rows, flags
+DICT_FIELDS = ('country', 'region', 'plz_prefix', 'state', 'status')
+COORD_FIELDS = ('latitude', 'longitude')
+
+
+# ---------------------------------------------------------------------------
+# Hilfsfunktionen
+# ---------------------------------------------------------------------------
+
+def hilbert_index(x: np.ndarray, y: np.ndarray, bits: int = HILBERT_BITS) -> np.ndarray:
+    """Position auf der Hilbert-Kurve für ganzzahlige Gitterkoordinaten (0 .. 2**bits-1)."""
+    x = x.astype(np.int64).copy()
+    y = y.astype(np.int64).copy()
+    d = np.zeros(len(x), dtype=np.int64)
+    s = 1 << (bits - 1)
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Quadrant drehen
+        flip = ~ry & rx
+        x = np.where(flip, s - 1 - x, x)
+        y = np.where(flip, s - 1 - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s >>= 1
+    return d
+
+
+def _encode_varints(values: Iterable[int]) -> bytes:
+    out = bytearray()
+    for value in values:
+        value = (value << 1) ^ (value >> 63)  # ZigZag: kleine negative Zahlen bleiben kurz
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def _decode_varints(data: bytes, offset: int, count: int) -> Tuple[np.ndarray, int]:
+    """count ZigZag-Varints ab offset (vektorisiert) → (Werte, Offset danach)."""
+    if count == 0:
+        return np.zeros(0, dtype=np.int64), offset
+    raw = np.frombuffer(data, dtype=np.uint8, count=min(len(data) - offset, count * 10), offset=offset)
+    ends = np.flatnonzero(raw < 0x80)[:count]
+    if len(ends) < count:
+        raise ValueError("Varints abgeschnitten")
+    used = raw[:ends[-1] + 1]
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    shift = (np.arange(len(used)) - np.repeat(starts, ends - starts + 1)) * 7
+    values = np.bitwise_or.reduceat((used & 0x7F).astype(np.uint64) << shift.astype(np.uint64), starts)
+    decoded = (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+    return decoded, offset + len(used)
+
+
+def _column_kinds(stations: List[Dict]) -> List[Dict]:
+    """Spalten in fester Reihenfolge (erstes Auftreten) mit Art und ggf. Wörterbuch."""
+    names: Dict[str, None] = {}
+    for station in stations:
+        for key in station:
+            names.setdefault(key, None)
+    columns = []
+    for name in names:
+        values = [s[name] for s in stations if name in s]
+        all_text = all(isinstance(v, str) for v in values)
+        if name in DICT_FIELDS and all_text:
+            columns.append({'name': name, 'kind': 'dict', 'values': sorted(set(values))})
+        elif all_text and not any('\x00' in v for v in values):
+            columns.append({'name': name, 'kind': 'text'})
+        else:
+            columns.append({'name': name, 'kind': 'json'})
+    return columns
+
+
+# ---------------------------------------------------------------------------
+# Schreiben
+# ---------------------------------------------------------------------------
+
+def _encode_block(rows: List[Dict], coords: Optional[np.ndarray], columns: List[Dict],
+                  lookups: List[Optional[Dict[str, int]]]) -> bytes:
+    out = io.BytesIO()
+    if coords is not None:
+        # erste Station absolut, danach Differenz zur vorherigen (Hilbert-Nachbarn: kleine Zahlen)
+        deltas = np.diff(coords, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+        out.write(_encode_varints(deltas.reshape(-1).tolist()))
+    for column, lookup in zip(columns, lookups):
+        name = column['name']
+        if column['kind'] == 'dict':
+            dtype = np.uint8 if len(column['values']) < 255 else np.uint16
+            codes = np.array([lookup[r[name]] + 1 if name in r else 0 for r in rows], dtype=dtype)
+            out.write(codes.tobytes())
+            continue
+        present = np.array([name in r for r in rows], dtype=bool)
+        if column['kind'] == 'text':
+            blob = '\x00'.join(r[name] for r in rows if name in r).encode('utf-8')
+        else:
+            blob = ','.join(json.dumps(r[name], ensure_ascii=False, separators=(',', ':'))
+                            for r in rows if name in r).encode('utf-8')
+        out.write(np.packbits(present).tobytes())
+        out.write(struct.pack('<I', len(blob)))
+        out.write(blob)
+    return out.getvalue()
+
+
+def encode_stations(stations: List[Dict], block_size: int = BLOCK_SIZE) -> bytes:
+    """Stationen → WVHC-Bytes (Reihenfolge: Hilbert-Kurve, Stationen ohne Koordinaten am Ende)."""
+    coords = [get_station_coords(s) for s in stations]
+    located = [i for i, c in enumerate(coords) if c]
+    unlocated = [i for i, c in enumerate(coords) if not c]
+    fixed = np.array([[round(coords[i][0] * SCALE), round(coords[i][1] * SCALE)] for i in located],
+                     dtype=np.int64).reshape(-1, 2)
+    if len(located):
+        lo, hi = fixed.min(axis=0), fixed.max(axis=0)
+        span = np.maximum(hi - lo, 1)
+        grid = ((fixed - lo) * ((1 << HILBERT_BITS) - 1) // span)
+        order = np.lexsort((np.arange(len(located)), hilbert_index(grid[:, 1], grid[:, 0])))
+        located = [located[i] for i in order]
+        fixed = fixed[order]
+
+    # Bei Stationen mit gültigen Koordinaten stecken latitude/longitude im Koordinatenteil
+    rows = [{k: v for k, v in stations[i].items() if k not in COORD_FIELDS} for i in located]
+    rows += [dict(stations[i]) for i in unlocated]
+    columns = _column_kinds(rows)
+    lookups = [{v: n for n, v in enumerate(c['values'])} if c['kind'] == 'dict' else None for c in columns]
+
+    blocks: List[Tuple[int, int, int, Optional[np.ndarray]]] = []  # (erste Zeile, Zeilen, flags, Koordinaten)
+    for start in range(0, len(located), block_size):
+        end = min(start + block_size, len(located))
+        blocks.append((start, end - start, HAS_COORDS, fixed[start:end]))
+    for start in range(len(located), len(rows), block_size):
+        blocks.append((start, min(block_size, len(rows) - start), 0, None))
+
+    meta = json.dumps({'columns': columns}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    payloads = [_encode_block(rows[first:first + count], block_coords, columns, lookups)
+                for first, count, _flags, block_coords in blocks]
+    offset = HEADER.size + len(meta) + INDEX_ENTRY.size * len(blocks)
+    index = bytearray()
+    for (first, count, flags, block_coords), payload in zip(blocks, payloads):
+        if block_coords is not None:
+            (min_lat, min_lon), (max_lat, max_lon) = block_coords.min(axis=0), block_coords.max(axis=0)
+        else:
+            min_lat, min_lon, max_lat, max_lon = 1, 1, 0, 0  # leere Box: trifft keine Abfrage
+        index += INDEX_ENTRY.pack(int(min_lat), int(min_lon), int(max_lat), int(max_lon),
+                                  offset, len(payload), first, count, flags)
+        offset += len(payload)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, block_size, len(rows), SCALE, len(meta), len(blocks), 0)
+    return b''.join([header, meta, bytes(index)] + payloads)
+
+
+# ---------------------------------------------------------------------------
+# Lesen
+# ---------------------------------------------------------------------------
+
+class StationFile:
+    """Liest WVHC über eine Funktion read_range(offset, length) → bytes.
+
+    Damit funktioniert dieselbe Logik für Bytes im Speicher, lokale Dateien (seek) und
+    HTTP-Range-Requests. Beim Öffnen werden nur Kopf, Metadaten und Blockindex gelesen.
+    """
+
+    def __init__(self, read_range: Callable[[int, int], bytes]):
+        self.read_range = read_range
+        (magic, version, self.block_size, self.count, self.scale,
+         meta_len, block_count, _reserved) = HEADER.unpack(read_range(0, HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Kein WVHC-Format (Version {FORMAT_VERSION})")
+        rest = read_range(HEADER.size, meta_len + INDEX_ENTRY.size * block_count)
+        self.columns: List[Dict] = json.loads(rest[:meta_len].decode('utf-8'))['columns']
+        self.index = np.frombuffer(rest[meta_len:], dtype=np.dtype([
+            ('min_lat', '<i4'), ('min_lon', '<i4'), ('max_lat', '<i4'), ('max_lon', '<i4'),
+            ('offset', '<u4'), ('length', '<u4'), ('first', '<u4'), ('rows', '<u2'), ('flags', '<u2')]))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'StationFile':
+        return cls(lambda offset, length: data[offset:offset + length])
+
+    @classmethod
+    def open(cls, path: Path) -> 'StationFile':
+        handle = open(path, 'rb')
+
+        def read_range(offset: int, length: int) -> bytes:
+            handle.seek(offset)
+            return handle.read(length)
+        return cls(read_range)
+
+    @classmethod
+    def from_url(cls, url: str, session=None) -> 'StationFile':
+        """Liest per HTTP-Range-Request (Server ohne Range-Unterstützung: ganze Datei einmal)."""
+        if session is None:
+            import http_client
+            session = http_client.create_session()
+        full: List[bytes] = []
+
+        def read_range(offset: int, length: int) -> bytes:
+            if full:
+                return full[0][offset:offset + length]
+            response = session.get(url, headers={'Range': f"bytes={offset}-{offset + length - 1}"})
+            response.raise_for_status()
+            if response.status_code == 206:
+                return response.content
+            full.append(response.content)
+            return response.content[offset:offset + length]
+        return cls(read_range)
+
+    def _decode_block(self, data: bytes, entry) -> Tuple[Optional[np.ndarray], Dict[str, list], Dict[str, np.ndarray]]:
+        """Block → (Koordinaten (n, 2) oder None, Werte je Spalte, Anwesenheit je Spalte)."""
+        rows = int(entry['rows'])
+        offset = 0
+        coords = None
+        if entry['flags'] & HAS_COORDS:
+            deltas, offset = _decode_varints(data, 0, rows * 2)
+            coords = deltas.reshape(-1, 2).cumsum(axis=0) / self.scale
+        values: Dict[str, list] = {}
+        present: Dict[str, np.ndarray] = {}
+        for column in self.columns:
+            name, kind = column['name'], column['kind']
+            if kind == 'dict':
+                dtype = np.uint8 if len(column['values']) < 255 else np.uint16
+                codes = np.frombuffer(data, dtype=dtype, count=rows, offset=offset)
+                offset += codes.nbytes
+                lookup = [None] + column['values']
+                values[name] = [lookup[c] for c in codes.tolist()]
+                present[name] = codes > 0
+                continue
+            bitmap_len = (rows + 7) // 8
+            mask = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=bitmap_len, offset=offset))[:rows]
+            present[name] = mask.astype(bool)
+            offset += bitmap_len
+            (blob_len,) = struct.unpack_from('<I', data, offset)
+            offset += 4
+            blob = data[offset:offset + blob_len].decode('utf-8')
+            offset += blob_len
+            if not present[name].any():
+                values[name] = [None] * rows
+                continue
+            decoded = blob.split('\x00') if kind == 'text' else json.loads(f"[{blob}]")
+            if len(decoded) == rows:
+                values[name] = decoded
+            else:
+                it = iter(decoded)
+                values[name] = [next(it) if p else None for p in present[name].tolist()]
+        return coords, values, present
+
+    def _read_blocks(self, entries) -> List[Tuple[bytes, np.void]]:
+        """Liest Blöcke; aneinandergrenzende Blöcke in einem Aufruf (ein Range-Request)."""
+        out = []
+        i = 0
+        while i < len(entries):
+            j = i
+            while j + 1 < len(entries) and entries[j + 1]['offset'] == entries[j]['offset'] + entries[j]['length']:
+                j += 1
+            start = int(entries[i]['offset'])
+            data = self.read_range(start, int(entries[j]['offset'] + entries[j]['length']) - start)
+            for entry in entries[i:j + 1]:
+                rel = int(entry['offset']) - start
+                out.append((data[rel:rel + int(entry['length'])], entry))
+            i = j + 1
+        return out
+
+    def _rows(self, data: bytes, entry) -> List[Dict]:
+        coords, values, present = self._decode_block(data, entry)
+        names = [c['name'] for c in self.columns]
+        flags = {name: present[name].tolist() for name in names}
+        rows = []
+        for i in range(int(entry['rows'])):
+            row = {name: values[name][i] for name in names if flags[name][i]}
+            if coords is not None:
+                row['latitude'], row['longitude'] = float(coords[i, 0]), float(coords[i, 1])
+            rows.append(row)
+        return rows
+
+    def read_columns(self) -> Dict[str, object]:
+        """Alle Stationen spaltenweise: latitude/longitude als NumPy-Arrays (NaN ohne gültige
+        Koordinaten), übrige Spalten als Listen (None = Feld fehlt)."""
+        coords, columns = [], {c['name']: [] for c in self.columns if c['name'] not in COORD_FIELDS}
+        for data, entry in self._read_blocks(self.index):
+            block_coords, values, _present = self._decode_block(data, entry)
+            coords.append(block_coords if block_coords is not None else np.full((int(entry['rows']), 2), np.nan))
+            for name, column in columns.items():
+                column.extend(values[name])
+        stacked = np.concatenate(coords) if coords else np.zeros((0, 2))
+        return {'latitude': stacked[:, 0], 'longitude': stacked[:, 1], **columns}
+
+    def read_all(self) -> List[Dict]:
+        """Alle Stationen als Dicts (wie in der JSON-Datei, Reihenfolge nach Hilbert-Kurve)."""
+        stations = []
+        for data, entry in self._read_blocks(self.index):
+            stations.extend(self._rows(data, entry))
+        return stations
+
+    def query_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Dict]:
+        """Stationen innerhalb der Box; gelesen werden nur Blöcke, deren Box sie schneidet."""
+        q = [round(v * self.scale) for v in (min_lat, min_lon, max_lat, max_lon)]
+        idx = self.index
+        hit = ((idx['flags'] & HAS_COORDS) > 0) & (idx['min_lat'] <= q[2]) & (idx['max_lat'] >= q[0]) \
+            & (idx['min_lon'] <= q[3]) & (idx['max_lon'] >= q[1])
+        result = []
+        for data, entry in self._read_blocks(idx[hit]):
+            for row in self._rows(data, entry):
+                if min_lat <= row['latitude'] <= max_lat and min_lon <= row['longitude'] <= max_lon:
+                    result.append(row)
+        return result
+
+
+def decode_stations(data: bytes) -> List[Dict]:
+    return StationFile.from_bytes(data).read_all()
+
+
+# ---------------------------------------------------------------------------
+# FlatGeobuf (optional über GDAL)
+# ---------------------------------------------------------------------------
+
+def write_flatgeobuf(stations: List[Dict], path: Path) -> bool:
+    """FlatGeobuf mit gepacktem Hilbert-R-Baum; False, wenn GDAL (osgeo) fehlt."""
+    try:
+        from osgeo import ogr, osr
+    except ImportError:
+        return False
+    ogr.UseExceptions()
+    tmp_path = path.with_name(path.stem + '.tmp' + path.suffix)
+    if tmp_path.exists():
+        tmp_path.unlink()
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(4326)
+    srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    dataset = ogr.GetDriverByName('FlatGeobuf').CreateDataSource(str(tmp_path))
+    layer = dataset.CreateLayer('stations', srs, ogr.wkbPoint, options=['SPATIAL_INDEX=YES'])
+    names: Dict[str, None] = {}
+    for station in stations:
+        for key in station:
+            if key not in COORD_FIELDS:
+                names.setdefault(key, None)
+    for name in names:
+        layer.CreateField(ogr.FieldDefn(name, ogr.OFTString))
+    for station in stations:
+        coords = get_station_coords(station)
+        if not coords:
+            continue  # FlatGeobuf-Index braucht eine Geometrie
+        feature = ogr.Feature(layer.GetLayerDefn())
+        point = ogr.Geometry(ogr.wkbPoint)
+        point.AddPoint_2D(coords[1], coords[0])
+        feature.SetGeometry(point)
+        for name in names:
+            value = station.get(name)
+            if value is not None:
+                feature.SetField(name, value if isinstance(value, str)
+                                 else json.dumps(value, ensure_ascii=False, separators=(',', ':')))
+        layer.CreateFeature(feature)
+    dataset = None  # schließt die Datei und schreibt den Index
+    tmp_path.replace(path)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Vergleich mit JSON
+# ---------------------------------------------------------------------------
+
+def _best_ms(fn: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def compare_formats(json_bytes: bytes, wvhc: bytes, fgb: Optional[bytes],
+                    bbox: Tuple[float, float, float, float], repeat: int = 20) -> Dict:
+    """Größen (roh/gzip) und Dekodierzeiten (bestes von repeat) von JSON und WVHC."""
+    stations = json.loads(json_bytes)
+    compact = json.dumps(stations, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    sizes = {
+        'json': len(json_bytes), 'json_gzip': len(gzip.compress(json_bytes, 9, mtime=0)),
+        'json_compact': len(compact), 'json_compact_gzip': len(gzip.compress(compact, 9, mtime=0)),
+        'wvhc': len(wvhc), 'wvhc_gzip': len(gzip.compress(wvhc, 9, mtime=0)),
+    }
+    if fgb is not None:
+        sizes.update(fgb=len(fgb), fgb_gzip=len(gzip.compress(fgb, 9, mtime=0)))
+    reader = StationFile.from_bytes(wvhc)
+    touched = []
+
+    def bbox_query():
+        # zählt die gelesenen Bytes mit (so viel müsste ein Browser per Range-Request laden)
+        counting = StationFile(lambda o, n: touched.append(n) or wvhc[o:o + n])
+        return counting.query_bbox(*bbox)
+
+    hits = bbox_query()
+    bbox_bytes = sum(touched)
+    decode = {
+        'json_loads': _best_ms(lambda: json.loads(json_bytes), repeat),
+        'wvhc_rows': _best_ms(lambda: StationFile.from_bytes(wvhc).read_all(), repeat),
+        'wvhc_columns': _best_ms(lambda: StationFile.from_bytes(wvhc).read_columns(), repeat),
+        'json_bbox_scan': _best_ms(lambda: [s for s in json.loads(json_bytes) if (c := get_station_coords(s))
+                                            and bbox[0] <= c[0] <= bbox[2] and bbox[1] <= c[1] <= bbox[3]], repeat),
+        'wvhc_bbox': _best_ms(lambda: StationFile.from_bytes(wvhc).query_bbox(*bbox), repeat),
+    }
+    return {'stations': len(stations), 'blocks': len(reader.index), 'sizes': sizes, 'decode_ms': decode,
+            'bbox': {'box': list(bbox), 'hits': len(hits), 'bytes_read': bbox_bytes}}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Stationen als kompakte Binärdatei exportieren (WVHC, FlatGeobuf)')
+    parser.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    parser.add_argument('--out', type=Path, default=OUTPUT_PATH, help='WVHC-Ausgabe')
+    parser.add_argument('--fgb', type=Path, default=FGB_PATH, help='FlatGeobuf-Ausgabe (nur mit GDAL)')
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE,
+                        help=f'Stationen je Block (Standard: {BLOCK_SIZE})')
+    parser.add_argument('--compare', action='store_true',
+                        help=f'Größe und Dekodierzeit mit JSON vergleichen (→ {REPORT_PATH})')
+    parser.add_argument('--bbox', type=float, nargs=4, default=[52.3, 13.0, 52.7, 13.8],
+                        metavar=('MIN_LAT', 'MIN_LON', 'MAX_LAT', 'MAX_LON'),
+                        help='Box für den Abfragevergleich (Standard: Berlin)')
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('build_binary')
+
+    print("📦 BINÄR-EXPORT")
+    print("=" * 50)
+    stations = load_stations(args.input)
+    if not stations:
+        return 1
+    with profiling.stage('encode_wvhc'):
+        payload = encode_stations(stations, args.block_size)
+    if args.out.exists() and args.out.read_bytes() == payload:
+        print(f"⏭️  {args.out} unverändert ({len(payload) / 1024:.1f} KB)")
+    else:
+        tmp_path = args.out.with_name(args.out.name + '.tmp')
+        tmp_path.write_bytes(payload)
+        tmp_path.replace(args.out)
+        print(f"💾 {args.out}: {len(stations)} Stationen, {len(payload) / 1024:.1f} KB")
+
+    with profiling.stage('write_flatgeobuf'):
+        fgb_written = write_flatgeobuf(stations, args.fgb)
+    if fgb_written:
+        print(f"💾 {args.fgb}: {args.fgb.stat().st_size / 1024:.1f} KB")
+    else:
+        print("⏭️  FlatGeobuf übersprungen (GDAL/osgeo nicht installiert)")
+
+    if not args.compare:
+        return 0
+    result = compare_formats(args.input.read_bytes(), payload, args.fgb.read_bytes() if fgb_written else None,
+                             tuple(args.bbox))
+    sizes, decode = result['sizes'], result['decode_ms']
+    print(f"\n📏 Größe (roh / gzip):")
+    for name in ('json', 'json_compact', 'wvhc', 'fgb'):
+        if name in sizes:
+            print(f"   {name:<13} {sizes[name] / 1024:8.1f} KB / {sizes[name + '_gzip'] / 1024:6.1f} KB")
+    print(f"⏱️  Dekodieren (bestes von 20):")
+    for name, ms in decode.items():
+        print(f"   {name:<15} {ms:8.3f} ms")
+    print(f"🔲 BBox {result['bbox']['box']}: {result['bbox']['hits']} Treffer, "
+          f"{result['bbox']['bytes_read'] / 1024:.1f} KB gelesen")
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"   💾 {REPORT_PATH}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
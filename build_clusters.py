@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Vorberechnete, hierarchische Marker-Cluster pro Zoomstufe (0-18)
+Grid-basiertes, gieriges Clustering im Stil von supercluster: Die Stationen werden
+einmal in Web-Mercator projiziert. Die Stufen entstehen von unten nach oben: auf
+MAX_ZOOM werden die Stationen einem Zellraster (Zelle = Radius) zugeordnet, auf jeder
+Stufe darüber die Cluster der nächstfeineren Stufe (gewichtete Schwerpunkte).
+Benachbarte Zellen, deren Schwerpunkte näher als der Radius liegen, werden gierig
+(größte zuerst) verschmolzen. Jeder Cluster hat so genau einen Elterncluster.
+"""
+
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from station_utils import STATIONS_PATH, load_stations, get_station_coords, assign_station_ids, dump_compact
+import profiling
+
+CLUSTERS_DIR = Path('data/clusters')
+MIN_ZOOM = 0
+MAX_ZOOM = 18
+TILE_SIZE = 256
+# Zellgröße in Pixeln – Zweierpotenz, damit die Zellen der Stufen exakt ineinander liegen
+DEFAULT_RADIUS = 64
+
+def project(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Web-Mercator, normiert auf [0, 1)."""
+    lat = np.clip(lat, -85.05112878, 85.05112878)
+    x = (lon + 180.0) / 360.0
+    s = np.sin(np.radians(lat))
+    y = 0.5 - 0.25 * np.log((1 + s) / (1 - s)) / math.pi
+    return np.clip(x, 0.0, 1.0 - 1e-12), np.clip(y, 0.0, 1.0 - 1e-12)
+
+
+def unproject(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    lon = x * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(math.pi * (1 - 2 * y))))
+    return lat, lon
+
+
+def _cell_bits(zoom: int, radius: int) -> int:
+    """Anzahl Bits pro Achse für das Zellraster einer Zoomstufe (2^bits Zellen)."""
+    return max(0, zoom + int(math.log2(TILE_SIZE // radius)))
+
+
+def _greedy_merge(cx: np.ndarray, cy: np.ndarray, mx: np.ndarray, my: np.ndarray, counts: np.ndarray,
+                  radius_units: float) -> np.ndarray:
+    """Gieriges Verschmelzen benachbarter Rasterzellen (größte zuerst).
+
+    Es werden nur die 8 Nachbarzellen betrachtet; da eine Zelle genau einen Radius
+    breit ist, liegen alle Kandidaten innerhalb des Radius dort.
+    Rückgabe: Gruppennummer je Zelle.
+    """
+    n = len(counts)
+    by_pos = {(int(a), int(b)): i for i, (a, b) in enumerate(zip(cx.tolist(), cy.tolist()))}
+    group = np.full(n, -1, dtype=np.int64)
+    r2 = radius_units * radius_units
+    mxl, myl, cl, cxl, cyl = mx.tolist(), my.tolist(), counts.tolist(), cx.tolist(), cy.tolist()
+    for seed in np.lexsort((np.arange(n), -counts)).tolist():
+        if group[seed] >= 0:
+            continue
+        group[seed] = seed
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if not dx and not dy:
+                    continue
+                other = by_pos.get((cxl[seed] + dx, cyl[seed] + dy))
+                if other is None or group[other] >= 0 or cl[other] > cl[seed]:
+                    continue
+                if (mxl[other] - mxl[seed]) ** 2 + (myl[other] - myl[seed]) ** 2 <= r2:
+                    group[other] = seed
+    return group
+
+
+def _cluster_level(x: np.ndarray, y: np.ndarray, weight: np.ndarray, zoom: int, radius: int,
+                   merge_limit: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Fasst gewichtete Punkte einer Stufe zusammen.
+
+    Rückgabe: (Cluster je Punkt, Anzahl Stationen, Schwerpunkt x, Schwerpunkt y) je Cluster.
+    """
+    cells = 1 << _cell_bits(zoom, radius)
+    ix = (x * cells).astype(np.int64)
+    iy = (y * cells).astype(np.int64)
+    keys, inverse = np.unique(ix * cells + iy, return_inverse=True)
+    inverse = inverse.ravel()
+    counts = np.bincount(inverse, weights=weight)
+    sx = np.bincount(inverse, weights=x * weight)
+    sy = np.bincount(inverse, weights=y * weight)
+    if len(keys) <= merge_limit:
+        group = _greedy_merge(keys // cells, keys % cells, sx / counts, sy / counts, counts,
+                              radius / (TILE_SIZE * float(1 << zoom)))
+        _roots, group = np.unique(group, return_inverse=True)
+        inverse = group.ravel()[inverse]
+        counts = np.bincount(inverse, weights=weight)
+        sx = np.bincount(inverse, weights=x * weight)
+        sy = np.bincount(inverse, weights=y * weight)
+    return inverse, counts.astype(np.int64), sx / counts, sy / counts
+
+
+def build_hierarchy(points: List[Tuple[float, float, str]], min_zoom: int = MIN_ZOOM, max_zoom: int = MAX_ZOOM,
+                    radius: int = DEFAULT_RADIUS, merge_limit: int = 20000) -> Dict:
+    """Berechnet die Cluster aller Zoomstufen.
+
+    Von max_zoom aufwärts: Stufe z clustert die Cluster der Stufe z+1 (Gewicht = Anzahl
+    Stationen, Position = Schwerpunkt), vektorisiert (NumPy) über Rasterzelle und
+    bincount. Auf Stufen mit höchstens merge_limit Zellen werden danach benachbarte
+    Zellen gierig verschmolzen – darüber ist das Raster schon so fein, dass sich der
+    Zusatzaufwand nicht lohnt.
+
+    points: Liste von (lat, lon, station_id).
+    Rückgabe: {'clusters': {zoom: [[lat, lon, count, id, parent_id], ...]},
+               'points': [[lat, lon, station_id, ab_zoom, parent_id], ...]}
+    Cluster-IDs haben die Form "z/index". ab_zoom ist die Stufe, ab der die Station
+    dauerhaft als Einzelmarker erscheint; parent_id ist der Cluster der Stufe davor.
+    """
+    lat = np.array([p[0] for p in points], dtype=np.float64)
+    lon = np.array([p[1] for p in points], dtype=np.float64)
+    ids = [p[2] for p in points]
+    x, y = project(lat, lon)
+
+    # Clusterzuordnung je Punkt und Stufe; up[z] = Cluster der Stufe z-1 je Cluster der Stufe z
+    labels = {}
+    level_info = {}
+    up = {}
+    items_x, items_y, weight = x, y, np.ones(len(points))
+    for z in range(max_zoom, min_zoom - 1, -1):
+        assign, counts, mx, my = _cluster_level(items_x, items_y, weight, z, radius, merge_limit)
+        if z == max_zoom:
+            labels[z] = assign
+        else:
+            up[z + 1] = assign
+            labels[z] = assign[labels[z + 1]]
+        level_info[z] = (counts, mx, my)
+        items_x, items_y, weight = mx, my, counts.astype(np.float64)
+
+    # Ab welcher Stufe ist eine Station dauerhaft allein?
+    from_zoom = np.full(len(points), max_zoom + 1, dtype=np.int64)
+    alone = np.ones(len(points), dtype=bool)
+    for z in range(max_zoom, min_zoom - 1, -1):
+        alone &= level_info[z][0][labels[z]] == 1
+        from_zoom[alone] = z
+
+    clusters = {}
+    for z in range(min_zoom, max_zoom + 1):
+        counts, mx, my = level_info[z]
+        clat, clon = unproject(mx, my)
+        parent = np.full(len(counts), -1, dtype=np.int64)
+        if z > min_zoom:
+            # Elterncluster = der Cluster der Stufe davor, in den dieser Cluster eingegangen ist
+            parent = up[z]
+        # Cluster mit >1 Station sowie (seltene) Einzelpunkte, die erst später dauerhaft allein sind
+        point_of = np.empty(len(counts), dtype=np.int64)
+        point_of[labels[z]] = np.arange(len(points))
+        show = np.nonzero((counts > 1) | (from_zoom[point_of] > z))[0]
+        clusters[z] = [
+            [la, lo, n, f"{z}/{c}", f"{z - 1}/{p}" if p >= 0 else None]
+            for la, lo, n, c, p in zip(np.round(clat[show], 6).tolist(), np.round(clon[show], 6).tolist(),
+                                       counts[show].tolist(), show.tolist(), parent[show].tolist())
+        ]
+
+    singles = []
+    single_idx = np.nonzero(from_zoom <= max_zoom)[0]
+    for i, la, lo, fz in zip(single_idx.tolist(), np.round(lat[single_idx], 6).tolist(),
+                             np.round(lon[single_idx], 6).tolist(), from_zoom[single_idx].tolist()):
+        parent = f"{fz - 1}/{int(labels[fz - 1][i])}" if fz > min_zoom else None
+        singles.append([la, lo, ids[i], fz, parent])
+    return {'clusters': clusters, 'points': singles}
+
+
+def load_points(stations_path: Path = STATIONS_PATH) -> Tuple[List[Tuple[float, float, str]], int]:
+    stations = load_stations(stations_path)
+    points = []
+    for station, sid in zip(stations, assign_station_ids(stations)):
+        coords = get_station_coords(station)
+        if coords:
+            points.append((coords[0], coords[1], sid))
+    return points, len(stations) - len(points)
+
+
+def synthetic_points(n: int, seed: int = 42) -> List[Tuple[float, float, str]]:
+    """Erzeugt n künstliche Stationen (Ballungen um Städte + Streuung über DE/AT/CH/IT)."""
+    rnd = random.Random(seed)
+    centers = [(52.52, 13.40), (48.14, 11.58), (53.55, 9.99), (50.94, 6.96), (50.11, 8.68),
+               (48.21, 16.37), (47.38, 8.54), (45.46, 9.19), (41.90, 12.50), (51.34, 12.37)]
+    points = []
+    for i in range(n):
+        if rnd.random() < 0.6:
+            c = centers[rnd.randrange(len(centers))]
+            lat, lon = rnd.gauss(c[0], 0.6), rnd.gauss(c[1], 0.8)
+        else:
+            lat, lon = rnd.uniform(37.0, 55.0), rnd.uniform(5.5, 18.5)
+        points.append((lat, lon, f"s{i}"))
+    return points
+
+
+def write_clusters(hierarchy: Dict, out_dir: Path = CLUSTERS_DIR, total: int = 0) -> Dict:
+    """Schreibt eine Datei pro Zoomstufe (Cluster mit >1 Station und Einzelpunkte, die erst
+    später dauerhaft allein sind), points.json mit allen Einzelmarkern (inkl. ab welcher
+    Stufe sie einzeln erscheinen) und index.json."""
+    tmp_dir = out_dir.with_name(out_dir.name + '.tmp')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    index = {
+        'stations': total,
+        'cluster_fields': ['lat', 'lon', 'count', 'id', 'parent'],
+        'point_fields': ['lat', 'lon', 'id', 'from_zoom', 'parent'],
+        'zooms': {},
+    }
+    for z, entries in sorted(hierarchy['clusters'].items()):
+        payload = dump_compact({'zoom': z, 'clusters': entries})
+        (tmp_dir / f"{z}.json").write_text(payload, encoding='utf-8')
+        singles = sum(1 for p in hierarchy['points'] if p[3] <= z)
+        index['zooms'][str(z)] = {'clusters': len(entries), 'single_markers': singles,
+                                  'bytes': len(payload.encode('utf-8'))}
+    payload = dump_compact({'points': hierarchy['points']})
+    (tmp_dir / 'points.json').write_text(payload, encoding='utf-8')
+    (tmp_dir / 'index.json').write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    old_dir = out_dir.with_name(out_dir.name + '.old')
+    if out_dir.exists():
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        out_dir.rename(old_dir)
+    tmp_dir.rename(out_dir)
+    if old_dir.exists():
+        shutil.rmtree(old_dir)
+    return index
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Vorberechnete Marker-Cluster je Zoomstufe erzeugen')
+    parser.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    parser.add_argument('--out', type=Path, default=CLUSTERS_DIR, help='Ausgabeverzeichnis')
+    parser.add_argument('--radius', type=int, default=DEFAULT_RADIUS, choices=[16, 32, 64, 128],
+                        help='Clusterradius in Pixeln (Standard: 64)')
+    parser.add_argument('--synthetic', type=int, default=None,
+                        help='Benchmark: N künstliche Stationen statt der echten Daten (nichts wird geschrieben)')
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('build_clusters')
+
+    print("🔵 CLUSTER-BUILD")
+    print("=" * 50)
+
+    if args.synthetic:
+        points = synthetic_points(args.synthetic)
+        print(f"🧪 {len(points)} synthetische Stationen")
+    else:
+        points, skipped = load_points(args.input)
+        print(f"📍 {len(points)} Stationen mit Koordinaten ({skipped} übersprungen)")
+
+    start = time.perf_counter()
+    hierarchy = build_hierarchy(points, radius=args.radius)
+    duration = time.perf_counter() - start
+    print(f"⏱️  Hierarchie berechnet in {duration * 1000:.0f} ms")
+
+    from_zoom = [p[3] for p in hierarchy['points']]
+    for z in (0, 4, 6, 8, 10, 12, 14, 18):
+        singles = sum(1 for fz in from_zoom if fz <= z)
+        print(f"   Zoom {z:>2}: {len(hierarchy['clusters'][z]):>7} Cluster + {singles:>7} Einzelmarker")
+
+    if args.synthetic:
+        return
+
+    write_clusters(hierarchy, args.out, total=len(points))
+    print(f"💾 Cluster für Zoom {MIN_ZOOM}-{MAX_ZOOM} geschrieben nach {args.out}/")
+
+
+if __name__ == '__main__':
+    main()
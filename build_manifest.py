@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Versioniertes Datensatz-Manifest und JSON-Patch-Deltas (data/manifest.json)
+
+Der Datensatz wird in eine kanonische Form gebracht ({'version', 'stations': {id: station}},
+Schlüssel sortiert), deren Hash die Version ist. Jede Version liegt unveränderlich unter
+data/versions/<version>.json. Für die letzten KEEP_VERSIONS Versionen gibt es je ein
+RFC-6902-Patch auf die aktuelle Version (data/deltas/<alt>_<neu>.json): ein Client mit
+Version V lädt nur noch die Änderungen statt der ganzen Datei.
+
+Unveränderte Daten ändern nichts (kein neuer Zeitstempel, keine neuen Dateien).
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from station_utils import STATIONS_PATH, load_stations, assign_station_ids, get_station_coords, dump_compact
+import profiling
+
+MANIFEST_PATH = Path('data/manifest.json')
+MANIFEST_FORMAT = 1
+KEEP_VERSIONS = 10
+
+
+def canonical_dataset(stations: List[Dict]) -> Dict:
+    """Stationen nach stabiler ID, leere Felder entfernt; Version = Hash des Inhalts."""
+    by_id = {}
+    for sid, station in zip(assign_station_ids(stations), stations):
+        by_id[sid] = {k: v for k, v in station.items() if v not in (None, '', [], {})}
+    stations_sorted = {sid: by_id[sid] for sid in sorted(by_id)}
+    body = json.dumps(stations_sorted, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return {'version': hashlib.sha256(body.encode('utf-8')).hexdigest()[:16], 'stations': stations_sorted}
+
+
+def dump_canonical(data) -> str:
+    """Sortierte Schlüssel, ein Wert je Zeile: kleine Git-Diffs und byte-gleiche Ausgabe."""
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, indent=1) + '\n'
+
+
+def _pointer(parent: str, key: str) -> str:
+    return f"{parent}/{key.replace('~', '~0').replace('/', '~1')}"
+
+
+def json_diff(old: Any, new: Any, path: str = '') -> List[Dict]:
+    """RFC-6902-Operationen von old nach new (Objekte rekursiv, alles andere wird ersetzt)."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in sorted(old.keys() | new.keys()):
+            pointer = _pointer(path, key)
+            if key not in new:
+                ops.append({'op': 'remove', 'path': pointer})
+            elif key not in old:
+                ops.append({'op': 'add', 'path': pointer, 'value': new[key]})
+            else:
+                ops.extend(json_diff(old[key], new[key], pointer))
+        return ops
+    if old == new and type(old) is type(new):
+        return []
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+
+def make_patch(old: Dict, new: Dict) -> List[Dict]:
+    """Patch zwischen zwei kanonischen Datensätzen; prüft zuerst die Ausgangsversion (test)."""
+    return ([{'op': 'test', 'path': '/version', 'value': old['version']}]
+            + json_diff(old, new))
+
+
+def apply_patch(document: Any, patch: List[Dict]) -> Any:
+    """Referenz-Implementierung für die Operationen aus make_patch (gleiche Logik wie map.js)."""
+    for op in patch:
+        keys = [k.replace('~1', '/').replace('~0', '~') for k in op['path'].split('/')[1:]]
+        parent = document
+        for key in keys[:-1]:
+            parent = parent[key]
+        last = keys[-1]
+        if op['op'] == 'test':
+            if parent[last] != op['value']:
+                raise ValueError(f"test fehlgeschlagen: {op['path']}")
+        elif op['op'] == 'remove':
+            del parent[last]
+        elif op['op'] in ('add', 'replace'):
+            parent[last] = op['value']
+        else:
+            raise ValueError(f"Nicht unterstützte Operation: {op['op']}")
+    return document
+
+
+def region_stats(stations: Dict[str, Dict]) -> Dict[str, Dict[str, int]]:
+    stats: Dict[str, Dict[str, int]] = {}
+    for station in stations.values():
+        region = station.get('region') or station.get('country') or 'Unbekannt'
+        entry = stats.setdefault(region, {'stations': 0, 'with_coords': 0})
+        entry['stations'] += 1
+        if get_station_coords(station):
+            entry['with_coords'] += 1
+    return dict(sorted(stats.items()))
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except Exception as e:
+        print(f"⚠️  Manifest nicht lesbar, beginne neu: {e}")
+        return None
+    return data if data.get('format') == MANIFEST_FORMAT else None
+
+
+def _write(path: Path, payload: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(payload, encoding='utf-8')
+    tmp_path.replace(path)
+
+
+def build_manifest(stations: List[Dict], out_dir: Path, keep: int = KEEP_VERSIONS,
+                   previous: Optional[Dict] = None) -> Dict:
+    """Schreibt Version, Deltas und Manifest nach out_dir.
+
+    Rückgabe: {'manifest', 'changed', 'deltas_written'}
+    """
+    dataset = canonical_dataset(stations)
+    version = dataset['version']
+    if previous and previous.get('version') == version:
+        return {'manifest': previous, 'changed': False, 'deltas_written': 0}
+
+    versions_dir = out_dir / 'versions'
+    deltas_dir = out_dir / 'deltas'
+    _write(versions_dir / f"{version}.json", dump_canonical(dataset))
+
+    history = [h for h in (previous or {}).get('history', []) if h['version'] != version]
+    history.insert(0, {
+        'version': version,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'stations': len(dataset['stations']),
+    })
+    history = history[:keep]
+    full_size = (versions_dir / f"{version}.json").stat().st_size
+
+    deltas = {}
+    for entry in history[1:]:
+        old_path = versions_dir / f"{entry['version']}.json"
+        if not old_path.exists():
+            continue
+        old = json.loads(old_path.read_text(encoding='utf-8'))
+        patch = make_patch(old, dataset)
+        payload = dump_compact(patch)
+        size = len(payload.encode('utf-8'))
+        if size >= full_size:
+            # Größer als die ganze Version: Client lädt dann direkt die volle Datei
+            continue
+        name = f"{entry['version']}_{version}.json"
+        _write(deltas_dir / name, payload)
+        deltas[entry['version']] = {'path': f"deltas/{name}", 'ops': len(patch) - 1, 'bytes': size}
+
+    # Alles aufräumen, was nicht mehr im Manifest steht
+    kept = {h['version'] for h in history}
+    for path in versions_dir.glob('*.json'):
+        if path.stem not in kept:
+            path.unlink()
+    current_deltas = {Path(d['path']).name for d in deltas.values()}
+    if deltas_dir.exists():
+        for path in deltas_dir.glob('*.json'):
+            if path.name not in current_deltas:
+                path.unlink()
+
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'version': version,
+        'created': history[0]['created'],
+        'path': f"versions/{version}.json",
+        'bytes': full_size,
+        'counts': {
+            'stations': len(dataset['stations']),
+            'with_coords': sum(1 for s in dataset['stations'].values() if get_station_coords(s)),
+        },
+        'regions': region_stats(dataset['stations']),
+        'deltas': deltas,
+        'history': history,
+    }
+    _write(out_dir / MANIFEST_PATH.name, dump_canonical(manifest))
+    return {'manifest': manifest, 'changed': True, 'deltas_written': len(deltas)}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Versioniertes Manifest und JSON-Patch-Deltas bauen')
+    parser.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    parser.add_argument('--out-dir', type=Path, default=MANIFEST_PATH.parent,
+                        help='Zielverzeichnis (manifest.json, versions/, deltas/)')
+    parser.add_argument('--keep', type=int, default=KEEP_VERSIONS, help='Versionen mit Delta behalten')
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('build_manifest')
+
+    print("🏷️  MANIFEST-BUILD")
+    print("=" * 50)
+    stations = load_stations(args.input)
+    if not stations:
+        return 1
+    previous = load_manifest(args.out_dir / MANIFEST_PATH.name)
+    result = build_manifest(stations, args.out_dir, args.keep, previous)
+    manifest = result['manifest']
+    if not result['changed']:
+        print(f"✅ Version {manifest['version']} unverändert – nichts zu tun")
+        return 0
+    print(f"✅ Version {manifest['version']}: {manifest['counts']['stations']} Stationen "
+          f"in {len(manifest['regions'])} Regionen")
+    for old, delta in manifest['deltas'].items():
+        print(f"   🩹 {old} → {manifest['version']}: {delta['ops']} Operationen ({delta['bytes'] / 1024:.1f} KB)")
+    print(f"   💾 {args.out_dir / MANIFEST_PATH.name}, {manifest['path']} ({manifest['bytes'] / 1024:.1f} KB)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Statische Seiten je PLZ-Gebiet und Land (regionen/*.html)
+
+Für Deutschland eine Seite je PLZ-Leitzone (0–9), für die übrigen Länder je eine Seite.
+Jede Seite enthält fertig gerenderte Stationskarten (Adresse, Telefon, Links) und ein
+kleines JSON mit den Koordinaten, dazu eine Übersicht regionen/index.html. Die Seiten
+brauchen weder map.js noch die große JSON-Datei: auf schwachen Handys steht der Inhalt
+mit dem ersten HTML-Paket.
+
+Vorlagen sind string.Template-Objekte (einmal beim Import kompiliert); alle Werte werden
+HTML-maskiert. Inkrementell: je Seite wird ein Hash über Stationen und Vorlagen in
+regionen/pages.json gespeichert; nur Seiten mit geändertem Hash werden neu geschrieben.
+"""
+
+import sys
+import json
+import html
+import hashlib
+import argparse
+from pathlib import Path
+from string import Template
+from typing import Dict, List, Optional, Tuple
+
+from station_utils import STATIONS_PATH, load_stations, get_station_coords, dump_compact
+from build_search_index import normalize
+import profiling
+
+PAGES_DIR = Path('regionen')
+STATE_FILE = 'pages.json'
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="de">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>$title – Wildvogelhilfen</title>
+<meta name="description" content="$count Wildvogelhilfen und Auffangstationen: $title">
+<style>$css</style>
+</head>
+<body>
+<header><a href="index.html">← Alle Regionen</a><h1>🦅 $title</h1><p>$count Stationen · <a href="../index.html">Interaktive Karte</a></p></header>
+<main>
+$cards
+</main>
+<footer><p>Daten: wildvogelhilfe.org und NABU. Die meisten Stationen arbeiten ehrenamtlich – bitte vorher anrufen.</p></footer>
+<script type="application/json" id="wvh-coords">$coords</script>
+</body>
+</html>
+""")
+
+CARD_TEMPLATE = Template("""<article class="card" id="$anchor">
+<h2>$name</h2>$status$specialization
+<p class="address">$address</p>$contact$note$map_link
+</article>""")
+
+INDEX_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="de">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Wildvogelhilfen nach Region</title>
+<style>$css</style>
+</head>
+<body>
+<header><h1>🦅 Wildvogelhilfen nach Region</h1><p>$total Stationen · <a href="../index.html">Interaktive Karte</a></p></header>
+<main>
+$groups
+</main>
+</body>
+</html>
+""")
+
+CSS = ("body{margin:0;font:16px/1.4 system-ui,sans-serif;color:#333;background:#f8fdf8}"
+       "header,main,footer{max-width:48rem;margin:0 auto;padding:.75rem 1rem}"
+       "header{background:#2c5530;color:#fff;max-width:none}header a{color:#a8d8a8}"
+       "h1{font-size:1.4rem;margin:.3rem 0}h2{font-size:1.1rem;margin:0 0 .3rem;color:#2c5530}"
+       ".card{background:#fff;border:1px solid #dee2e6;border-radius:8px;padding:.75rem;margin:.75rem 0}"
+       ".card p{margin:.25rem 0}.spec{color:#4a7c59;font-style:italic}.note{font-size:.9rem;color:#495057}"
+       ".inactive{display:inline-block;background:#dc3545;color:#fff;border-radius:12px;padding:0 .5rem;font-size:.8rem}"
+       "a{color:#0066cc}ul{padding-left:1.2rem}li{margin:.3rem 0}footer{font-size:.85rem;color:#666}")
+
+# Ändert sich eine Vorlage, sind alle Seiten veraltet
+TEMPLATE_HASH = hashlib.sha256('\x1f'.join(
+    t.template for t in (PAGE_TEMPLATE, CARD_TEMPLATE, INDEX_TEMPLATE)).encode('utf-8') + CSS.encode('utf-8')).hexdigest()[:12]
+
+
+def page_key(station: Dict) -> Tuple[str, str, str]:
+    """(Dateiname ohne .html, Titel, Land) der Seite einer Station."""
+    country = station.get('country') or 'Deutschland'
+    plz = str(station.get('plz') or '')
+    if country == 'Deutschland' and len(plz) == 5 and plz.isdigit():
+        return f"plz-{plz[0]}", f"PLZ-Gebiet {plz[0]}xxxx", country
+    if country == 'Deutschland':
+        return 'deutschland', 'Deutschland (ohne PLZ-Gebiet)', country
+    return normalize(country).replace(' ', '-') or 'unbekannt', country, country
+
+
+def group_stations(stations: List[Dict]) -> Dict[str, Dict]:
+    pages: Dict[str, Dict] = {}
+    for station in stations:
+        slug, title, country = page_key(station)
+        page = pages.setdefault(slug, {'title': title, 'country': country, 'stations': []})
+        page['stations'].append(station)
+    for page in pages.values():
+        page['stations'].sort(key=lambda s: (str(s.get('plz') or ''), s.get('name') or ''))
+    return pages
+
+
+def page_hash(page: Dict) -> str:
+    body = json.dumps(page['stations'], ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256((TEMPLATE_HASH + page['title'] + body).encode('utf-8')).hexdigest()[:16]
+
+
+def _e(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def render_card(station: Dict, n: int) -> str:
+    contact = []
+    if station.get('phone'):
+        tel = ''.join(c for c in station['phone'] if c.isdigit() or c == '+')
+        contact.append(f'<a href="tel:{_e(tel)}">☎ {_e(station["phone"])}</a>')
+    if station.get('email'):
+        contact.append(f'<a href="mailto:{_e(station["email"])}">✉ {_e(station["email"])}</a>')
+    website = station.get('website') or ''
+    if website.startswith(('http://', 'https://')):
+        contact.append(f'<a href="{_e(website)}" rel="noopener">🌐 Website</a>')
+    coords = get_station_coords(station)
+    map_link = ''
+    if coords:
+        lat, lon = coords
+        map_link = (f'\n<p><a href="https://www.openstreetmap.org/?mlat={lat}&amp;mlon={lon}#map=15/{lat}/{lon}" '
+                    f'rel="noopener">📍 Auf der Karte</a></p>')
+    status = str(station.get('status') or '').lower()
+    return CARD_TEMPLATE.substitute(
+        anchor=f"s{n}",
+        name=_e(station.get('name') or ''),
+        status='\n<p class="inactive">⚠️ inaktiv</p>' if status == 'inaktiv' else '',
+        specialization=f'\n<p class="spec">{_e(station["specialization"])}</p>' if station.get('specialization') else '',
+        address=_e(station.get('address') or ''),
+        contact=f'\n<p>{" · ".join(contact)}</p>' if contact else '',
+        note=f'\n<p class="note">{_e(station["note"])}</p>' if station.get('note') else '',
+        map_link=map_link,
+    )
+
+
+def render_page(page: Dict) -> str:
+    stations = page['stations']
+    # [lat, lon, Kartennummer] – Kartennummer = Anker #s<n> der Stationskarte
+    coords = [[c[0], c[1], n] for n, c in enumerate(map(get_station_coords, stations)) if c]
+    return PAGE_TEMPLATE.substitute(
+        title=_e(page['title']),
+        count=len(stations),
+        css=CSS,
+        cards='\n'.join(render_card(s, n) for n, s in enumerate(stations)),
+        coords=dump_compact(coords).replace('</', '<\\/'),
+    )
+
+
+def render_index(pages: Dict[str, Dict]) -> str:
+    by_country: Dict[str, List[Tuple[str, Dict]]] = {}
+    for slug, page in sorted(pages.items()):
+        by_country.setdefault(page['country'], []).append((slug, page))
+    groups = []
+    for country in sorted(by_country, key=lambda c: (c != 'Deutschland', c)):
+        items = ''.join(f'<li><a href="{_e(slug)}.html">{_e(page["title"])}</a> ({page["count"]})</li>'
+                        for slug, page in by_country[country])
+        groups.append(f'<h2>{_e(country)}</h2>\n<ul>{items}</ul>')
+    return INDEX_TEMPLATE.substitute(css=CSS, total=sum(p['count'] for p in pages.values()),
+                                     groups='\n'.join(groups))
+
+
+def _write(path: Path, text: str) -> bool:
+    """Schreibt atomar, wenn sich der Inhalt unterscheidet; True wenn geschrieben."""
+    data = text.encode('utf-8')
+    if path.exists() and path.read_bytes() == data:
+        return False
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+    return True
+
+
+def build_pages(stations: List[Dict], out_dir: Path = PAGES_DIR, full: bool = False) -> Dict:
+    """Rendert geänderte Seiten; Rückgabe: Zähler (written, unchanged, removed) und Seitenliste."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    state_path = out_dir / STATE_FILE
+    previous: Dict[str, Dict] = {}
+    if state_path.exists() and not full:
+        try:
+            previous = json.loads(state_path.read_text(encoding='utf-8')).get('pages', {})
+        except (ValueError, OSError) as e:
+            print(f"⚠️  {state_path} nicht lesbar, baue alle Seiten neu: {e}")
+
+    stats = {'written': 0, 'unchanged': 0, 'removed': 0, 'bytes': 0}
+    state: Dict[str, Dict] = {}
+    for slug, page in sorted(group_stations(stations).items()):
+        digest = page_hash(page)
+        path = out_dir / f"{slug}.html"
+        old = previous.get(slug)
+        if old and old.get('hash') == digest and path.exists():
+            stats['unchanged'] += 1
+            state[slug] = old
+            continue
+        text = render_page(page)
+        _write(path, text)
+        stats['written'] += 1
+        state[slug] = {'hash': digest, 'title': page['title'], 'country': page['country'],
+                       'count': len(page['stations']), 'bytes': len(text.encode('utf-8'))}
+
+    for slug in previous:
+        if slug not in state:
+            (out_dir / f"{slug}.html").unlink(missing_ok=True)
+            stats['removed'] += 1
+
+    _write(out_dir / 'index.html', render_index(state))
+    _write(state_path, json.dumps({'template': TEMPLATE_HASH, 'pages': state}, ensure_ascii=False, indent=2))
+    stats['bytes'] = sum(p['bytes'] for p in state.values())
+    return {'stats': stats, 'pages': state}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Statische HTML-Seiten je PLZ-Gebiet und Land erzeugen')
+    parser.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    parser.add_argument('--out', type=Path, default=PAGES_DIR, help=f'Zielverzeichnis (Standard: {PAGES_DIR})')
+    parser.add_argument('--full', action='store_true', help='Alle Seiten neu schreiben')
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('build_region_pages')
+
+    print("🗂️  REGIONSSEITEN")
+    print("=" * 50)
+    stations = load_stations(args.input)
+    if not stations:
+        return 1
+    with profiling.stage('render_pages'):
+        result = build_pages(stations, args.out, args.full)
+    stats, pages = result['stats'], result['pages']
+    print(f"✅ {len(pages)} Seiten: {stats['written']} neu geschrieben, {stats['unchanged']} unverändert, "
+          f"{stats['removed']} entfernt")
+    largest = max(pages.items(), key=lambda kv: kv[1]['bytes']) if pages else None
+    if largest:
+        print(f"   📄 {stats['bytes'] / 1024:.1f} KB gesamt, größte Seite {largest[0]}.html "
+              f"({largest[1]['bytes'] / 1024:.1f} KB, {largest[1]['count']} Stationen)")
+    print(f"   💾 {args.out}/index.html")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Vorberechneter Suchindex für die Stationssuche (data/search_index.json)
+Normalisiert Name, Adresse, PLZ und Spezialisierung (Umlaute/ß gefaltet) und baut
+daraus einen Trigramm-Index, eine Tabelle kurzer Wortanfänge und eine PLZ-Präfix-
+Tabelle. Eine Suche kostet damit nur noch so viel wie die Treffer des Suchbegriffs,
+nicht wie der ganze Datensatz. Bei erneutem Aufruf werden nur geänderte Stationen
+neu indexiert.
+"""
+
+import json
+import re
+import heapq
+import hashlib
+import argparse
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from station_utils import STATIONS_PATH, load_stations, assign_station_ids, dump_compact
+import profiling
+
+INDEX_PATH = Path('data/search_index.json')
+INDEX_VERSION = 1
+SEARCH_FIELDS = ('name', 'address', 'plz', 'specialization')
+# Ab diesem Anteil freier Dokument-Slots wird komplett neu gebaut
+COMPACT_RATIO = 0.25
+
+_UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+_UMLAUTS_SHORT = str.maketrans({'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss'})
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def _fold(text: str, table) -> str:
+    text = text.lower().translate(table)
+    # Übrige Akzente (é, è, ...) entfernen
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def normalize(text: str) -> str:
+    """Kleinschreibung, ä→ae, ö→oe, ü→ue, ß→ss, Satzzeichen → Leerzeichen."""
+    return _fold(text or '', _UMLAUTS)
+
+
+def normalize_variants(text: str) -> List[str]:
+    """Beide Faltungen (ö→oe und ö→o), damit 'Gorlitz' und 'Goerlitz' 'Görlitz' finden."""
+    long_form = _fold(text or '', _UMLAUTS)
+    short_form = _fold(text or '', _UMLAUTS_SHORT)
+    return [long_form] if long_form == short_form else [long_form, short_form]
+
+
+def document_text(station: Dict) -> str:
+    """Normalisierter Suchtext einer Station (alle Varianten, durch ' | ' getrennt)."""
+    parts = []
+    for field in SEARCH_FIELDS:
+        value = station.get(field)
+        if value:
+            parts.extend(normalize_variants(str(value)))
+    return ' | '.join(parts)
+
+
+def document_hash(station: Dict) -> str:
+    key = '\x1f'.join(str(station.get(f) or '') for f in SEARCH_FIELDS)
+    return hashlib.md5(key.encode('utf-8')).hexdigest()[:12]
+
+
+def trigrams(text: str) -> Set[str]:
+    grams = set()
+    for token in text.split():
+        if token == '|':
+            continue
+        for i in range(len(token) - 2):
+            grams.add(token[i:i + 3])
+    return grams
+
+
+def short_prefixes(text: str) -> Set[str]:
+    """Wortanfänge der Länge 1 und 2 (für Suchbegriffe, die kürzer als ein Trigramm sind)."""
+    result = set()
+    for token in text.split():
+        if token == '|':
+            continue
+        result.add(token[:1])
+        if len(token) >= 2:
+            result.add(token[:2])
+    return result
+
+
+def plz_prefixes(plz: Optional[str]) -> List[str]:
+    if not plz or not str(plz).isdigit():
+        return []
+    plz = str(plz)
+    return [plz[:i] for i in range(1, len(plz) + 1)]
+
+
+class SearchIndexBuilder:
+    """Hält den Index als Mengen im Speicher und kann Dokumente einzeln hinzufügen/entfernen."""
+
+    def __init__(self):
+        self.docs: List[Optional[Dict]] = []  # {'id', 'h', 't', 'plz'} oder None (freier Slot)
+        self.by_id: Dict[str, int] = {}
+        self.free: List[int] = []  # Heap freier Slots (kleinste zuerst)
+        self.grams: Dict[str, Set[int]] = {}
+        self.short: Dict[str, Set[int]] = {}
+        self.plz: Dict[str, Set[int]] = {}
+
+    @classmethod
+    def from_artifact(cls, data: Dict) -> 'SearchIndexBuilder':
+        builder = cls()
+        builder.docs = [None if d is None else {'id': d[0], 'h': d[1], 't': d[2], 'plz': d[3]} for d in data['docs']]
+        builder.by_id = {d['id']: n for n, d in enumerate(builder.docs) if d}
+        builder.free = [n for n, d in enumerate(builder.docs) if d is None]
+        builder.grams = {k: set(v) for k, v in data['grams'].items()}
+        builder.short = {k: set(v) for k, v in data['short'].items()}
+        builder.plz = {k: set(v) for k, v in data['plz'].items()}
+        return builder
+
+    def _postings(self, doc: Dict):
+        yield self.grams, trigrams(doc['t'])
+        yield self.short, short_prefixes(doc['t'])
+        yield self.plz, plz_prefixes(doc['plz'])
+
+    def add(self, sid: str, station: Dict, doc_hash: str):
+        doc = {'id': sid, 'h': doc_hash, 't': document_text(station), 'plz': station.get('plz') or ''}
+        if self.free:
+            n = heapq.heappop(self.free)
+            self.docs[n] = doc
+        else:
+            n = len(self.docs)
+            self.docs.append(doc)
+        self.by_id[sid] = n
+        for table, keys in self._postings(doc):
+            for key in keys:
+                table.setdefault(key, set()).add(n)
+
+    def remove(self, sid: str):
+        n = self.by_id.pop(sid)
+        doc = self.docs[n]
+        for table, keys in self._postings(doc):
+            for key in keys:
+                posting = table.get(key)
+                if posting is not None:
+                    posting.discard(n)
+                    if not posting:
+                        del table[key]
+        self.docs[n] = None
+        heapq.heappush(self.free, n)
+
+    def free_ratio(self) -> float:
+        return len(self.free) / len(self.docs) if self.docs else 0.0
+
+    def to_artifact(self) -> Dict:
+        return {
+            'version': INDEX_VERSION,
+            'fields': list(SEARCH_FIELDS),
+            'docs': [None if d is None else [d['id'], d['h'], d['t'], d['plz']] for d in self.docs],
+            'grams': {k: sorted(v) for k, v in sorted(self.grams.items())},
+            'short': {k: sorted(v) for k, v in sorted(self.short.items())},
+            'plz': {k: sorted(v) for k, v in sorted(self.plz.items())},
+        }
+
+
+def load_index(path: Path = INDEX_PATH) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except Exception as e:
+        print(f"⚠️  Suchindex nicht lesbar, baue neu: {e}")
+        return None
+    if data.get('version') != INDEX_VERSION or data.get('fields') != list(SEARCH_FIELDS):
+        return None
+    return data
+
+
+def build_search_index(stations: List[Dict], previous: Optional[Dict] = None) -> Dict:
+    """Baut den Index (inkrementell, falls ein vorheriger Index übergeben wird).
+
+    Rückgabe: {'index': Artefakt, 'stats': {added, changed, removed, unchanged, full_rebuild}}
+    """
+    ids = assign_station_ids(stations)
+    current = {sid: (station, document_hash(station)) for sid, station in zip(ids, stations)}
+    stats = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0, 'full_rebuild': previous is None}
+
+    builder = SearchIndexBuilder.from_artifact(previous) if previous else SearchIndexBuilder()
+    for sid in list(builder.by_id):
+        if sid not in current:
+            builder.remove(sid)
+            stats['removed'] += 1
+    for sid, (station, doc_hash) in current.items():
+        n = builder.by_id.get(sid)
+        if n is not None:
+            if builder.docs[n]['h'] == doc_hash:
+                stats['unchanged'] += 1
+                continue
+            builder.remove(sid)
+            stats['changed'] += 1
+        else:
+            stats['added'] += 1
+        builder.add(sid, station, doc_hash)
+
+    if previous and builder.free_ratio() > COMPACT_RATIO:
+        # Zu viele Lücken: komplett neu (Dokumentnummern werden dicht vergeben)
+        result = build_search_index(stations, None)
+        result['stats'].update({k: stats[k] for k in ('added', 'changed', 'removed', 'unchanged')})
+        return result
+    return {'index': builder.to_artifact(), 'stats': stats}
+
+
+def _term_candidates(index: Dict, term: str) -> Set[int]:
+    docs = index['docs']
+    if len(term) >= 3:
+        postings = [index['grams'].get(term[i:i + 3]) for i in range(len(term) - 2)]
+        if any(p is None for p in postings):
+            return set()
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates.intersection_update(p)
+            if not candidates:
+                break
+        candidates = {n for n in candidates if term in docs[n][2]}
+    else:
+        candidates = set(index['short'].get(term, ()))
+    if term.isdigit():
+        candidates.update(index['plz'].get(term, ()))
+    return candidates
+
+
+def search(index: Dict, query: str, limit: int = 25) -> List[str]:
+    """Referenz-Implementierung der Suche auf dem Artefakt (gleiche Logik wie im Frontend).
+
+    Alle Suchbegriffe müssen passen (UND). Begriffe ab 3 Zeichen laufen über den
+    Trigramm-Index und werden anschließend als Teilstring im Dokumenttext geprüft,
+    kürzere über die Wortanfangs-Tabelle, reine Ziffern zusätzlich über die PLZ-Präfixe.
+    """
+    docs = index['docs']
+    result: Optional[Set[int]] = None
+    # Pro Wort beide Umlaut-Faltungen als Alternativen (ODER), zwischen Wörtern UND
+    variants = [v.split() for v in normalize_variants(query)]
+    words = [set(alts) for alts in zip(*variants)]
+    for alternatives in sorted(words, key=lambda a: max(len(t) for t in a), reverse=True):
+        candidates = set()
+        for term in alternatives:
+            candidates |= _term_candidates(index, term)
+        result = candidates if result is None else result & candidates
+        if not result:
+            return []
+    if not result:
+        return []
+    return [docs[n][0] for n in sorted(result)[:limit]]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Suchindex für die Stationssuche bauen')
+    parser.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    parser.add_argument('--out', type=Path, default=INDEX_PATH, help='Ausgabedatei')
+    parser.add_argument('--full', action='store_true', help='Vorhandenen Index ignorieren und komplett neu bauen')
+    parser.add_argument('--query', type=str, default=None, help='Nach dem Build eine Testsuche ausführen')
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('build_search_index')
+
+    print("🔎 SUCHINDEX-BUILD")
+    print("=" * 50)
+    stations = load_stations(args.input)
+    previous = None if args.full else load_index(args.out)
+    result = build_search_index(stations, previous)
+    index, stats = result['index'], result['stats']
+
+    payload = dump_compact(index)
+    tmp_path = args.out.with_name(args.out.name + '.tmp')
+    tmp_path.write_text(payload, encoding='utf-8')
+    tmp_path.replace(args.out)
+
+    mode = 'komplett' if stats['full_rebuild'] else 'inkrementell'
+    print(f"✅ Index {mode} gebaut: {len(stations)} Stationen")
+    print(f"   ➕ {stats['added']} neu | ✏️  {stats['changed']} geändert | ➖ {stats['removed']} entfernt | "
+          f"= {stats['unchanged']} unverändert")
+    print(f"   🔤 {len(index['grams'])} Trigramme, {len(index['short'])} Kurzpräfixe, {len(index['plz'])} PLZ-Präfixe")
+    print(f"   💾 {args.out} ({len(payload.encode('utf-8')) / 1024:.1f} KB)")
+
+    if args.query:
+        by_id = dict(zip(assign_station_ids(stations), stations))
+        hits = search(index, args.query)
+        print(f"\n🔎 '{args.query}': {len(hits)} Treffer")
+        for sid in hits:
+            print(f"   - {by_id[sid]['name']} ({by_id[sid].get('address', '')})")
+
+
+if __name__ == '__main__':
+    main()
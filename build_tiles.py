@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Zerlegt wildvogelhilfen.json in räumliche Kacheln (Slippy-Map-Schema z/x/y)
+Pro nicht-leerer Kachel wird ein kleiner JSON-Shard geschrieben, dazu ein Index
+aller vorhandenen Kacheln. Die Karte kann so nur die Kacheln im Sichtbereich laden.
+"""
+
+import json
+import math
+import shutil
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from station_utils import STATIONS_PATH, load_stations, get_station_coords, assign_station_ids, dump_compact
+import profiling
+
+TILES_DIR = Path('data/tiles')
+DEFAULT_ZOOMS = [6, 8, 10]
+
+
+def lat_lon_to_tile(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    """Slippy-Map-Kachel (x, y) für eine Koordinate (Web-Mercator, wie Leaflet/OSM)."""
+    n = 1 << zoom
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(x: int, y: int, zoom: int) -> Tuple[float, float, float, float]:
+    """Grenzen einer Kachel als (süd, west, nord, ost)."""
+    n = 1 << zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return round(south, 6), round(west, 6), round(north, 6), round(east, 6)
+
+
+def quadkey(x: int, y: int, zoom: int) -> str:
+    """Bing-Quadkey einer Kachel (nützlich für Präfix-Abfragen)."""
+    digits = []
+    for i in range(zoom, 0, -1):
+        digit = 0
+        mask = 1 << (i - 1)
+        if x & mask:
+            digit += 1
+        if y & mask:
+            digit += 2
+        digits.append(str(digit))
+    return ''.join(digits)
+
+
+def partition_stations(stations: List[Dict], zooms: List[int]) -> Tuple[Dict[int, Dict[Tuple[int, int], List[Dict]]], int]:
+    """Verteilt Stationen (mit ID) auf Kacheln je Zoomstufe. Gibt (Kacheln, übersprungen) zurück."""
+    ids = assign_station_ids(stations)
+    tiles = {z: {} for z in zooms}
+    skipped = 0
+    for station, sid in zip(stations, ids):
+        coords = get_station_coords(station)
+        if not coords:
+            skipped += 1
+            continue
+        record = {'id': sid, **station}
+        for z in zooms:
+            tiles[z].setdefault(lat_lon_to_tile(coords[0], coords[1], z), []).append(record)
+    return tiles, skipped
+
+
+def _percentile(sorted_values: List[int], pct: float) -> int:
+    if not sorted_values:
+        return 0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def build_tiles(stations_path: Path = STATIONS_PATH, out_dir: Path = TILES_DIR, zooms: List[int] = None) -> Dict:
+    """Schreibt alle Shards + index.json + report.json. Gibt den Report zurück."""
+    zooms = sorted(set(zooms or DEFAULT_ZOOMS))
+    stations = load_stations(stations_path)
+    tiles, skipped = partition_stations(stations, zooms)
+
+    # In temporäres Verzeichnis schreiben und erst am Ende austauschen,
+    # damit nie ein halber Kachelsatz ausgeliefert wird und alte Shards verschwinden.
+    tmp_dir = out_dir.with_name(out_dir.name + '.tmp')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    index = {'scheme': 'xyz', 'zooms': zooms, 'path': '{z}/{x}/{y}.json', 'tiles': {}}
+    report = {'stations': len(stations), 'skipped_without_coords': skipped, 'zooms': {}}
+
+    for z in zooms:
+        sizes = []
+        index['tiles'][str(z)] = {}
+        for (x, y), records in sorted(tiles[z].items()):
+            shard = {'z': z, 'x': x, 'y': y, 'quadkey': quadkey(x, y, z), 'bounds': tile_bounds(x, y, z), 'stations': records}
+            payload = dump_compact(shard).encode('utf-8')
+            tile_path = tmp_dir / str(z) / str(x) / f"{y}.json"
+            tile_path.parent.mkdir(parents=True, exist_ok=True)
+            tile_path.write_bytes(payload)
+            sizes.append(len(payload))
+            index['tiles'][str(z)][f"{x}/{y}"] = len(records)
+
+        sizes.sort()
+        counts = sorted(len(r) for r in tiles[z].values())
+        report['zooms'][str(z)] = {
+            'shards': len(sizes),
+            'bytes_total': sum(sizes),
+            'bytes_min': sizes[0] if sizes else 0,
+            'bytes_median': _percentile(sizes, 50),
+            'bytes_p90': _percentile(sizes, 90),
+            'bytes_max': sizes[-1] if sizes else 0,
+            'stations_per_shard_median': _percentile(counts, 50),
+            'stations_per_shard_max': counts[-1] if counts else 0,
+        }
+
+    (tmp_dir / 'index.json').write_text(dump_compact(index), encoding='utf-8')
+    (tmp_dir / 'report.json').write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    old_dir = out_dir.with_name(out_dir.name + '.old')
+    if out_dir.exists():
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        out_dir.rename(old_dir)
+    tmp_dir.rename(out_dir)
+    if old_dir.exists():
+        shutil.rmtree(old_dir)
+    return report
+
+
+def print_report(report: Dict, out_dir: Path = TILES_DIR):
+    print("\n📊 KACHEL-REPORT:")
+    print(f"   📍 {report['stations']} Stationen ({report['skipped_without_coords']} ohne Koordinaten übersprungen)")
+    print(f"   {'Zoom':>4} {'Shards':>7} {'Gesamt':>10} {'Min':>7} {'Median':>7} {'P90':>7} {'Max':>7} {'Max/Shard':>10}")
+    for z, s in report['zooms'].items():
+        print(f"   {z:>4} {s['shards']:>7} {s['bytes_total']:>10} {s['bytes_min']:>7} {s['bytes_median']:>7} "
+              f"{s['bytes_p90']:>7} {s['bytes_max']:>7} {s['stations_per_shard_max']:>10}")
+    print(f"   📁 Ausgabe: {out_dir}/ (index.json, report.json)")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Räumliche Kachel-Shards für die Karte erzeugen')
+    parser.add_argument('--zooms', type=str, default=','.join(str(z) for z in DEFAULT_ZOOMS),
+                        help='Kommagetrennte Zoomstufen (Standard: 6,8,10)')
+    parser.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    parser.add_argument('--out', type=Path, default=TILES_DIR, help='Ausgabeverzeichnis')
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('build_tiles')
+
+    zooms = [int(z) for z in args.zooms.split(',') if z.strip()]
+    if any(z < 0 or z > 18 for z in zooms):
+        parser.error('Zoomstufen müssen zwischen 0 und 18 liegen')
+
+    print("🧩 KACHEL-BUILD")
+    print("=" * 50)
+    report = build_tiles(args.input, args.out, zooms)
+    print_report(report, args.out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Crawl-Scheduler für alle Quellen (wildvogelhilfe.org, NABU-Karten, ...)
+
+Jede Quelle ist ein Adapter (Source): Start-URLs, optional eine Link-Erkennung (discover)
+und eine Extraktionsfunktion (extract), die aus einer Antwort Stationen macht. Alle Quellen
+werden gleichzeitig in einem Prozess abgearbeitet, mit
+  - robots.txt je Host (zwischengespeichert, inkl. Crawl-delay),
+  - Parallelität und Mindestabstand je Domain (DOMAIN_POLICIES),
+  - einer persistenten Frontier (.crawl/frontier.json) samt Seitenergebnissen: ein
+    abgebrochener Lauf setzt fort, Seiten jünger als `recrawl` werden nicht erneut geladen,
+    und fällt eine Seite aus, wird ihr letztes gutes Ergebnis weiterverwendet.
+
+Neue Verzeichnisse = neuer Eintrag in default_sources().
+"""
+
+import re
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import http_client
+import log_setup
+import metrics
+import profiling
+import provenance
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = Path('.crawl')
+FRONTIER_PATH = STATE_DIR / 'frontier.json'
+PAGES_DIR = STATE_DIR / 'pages'
+ROBOTS_DIR = STATE_DIR / 'robots'
+OUTPUT_PATH = Path('data/wildvogelhilfen.json')
+HOUR = 3600
+ROBOTS_TTL = 24 * HOUR
+MAX_ATTEMPTS = 3
+MAX_PAGES_PER_SOURCE = 200
+
+
+class DomainPolicy:
+    """Höflichkeitsregeln je Host: gleichzeitige Anfragen und Mindestabstand zwischen Starts."""
+
+    def __init__(self, concurrency: int = 1, delay: float = 3.0):
+        self.concurrency = concurrency
+        self.delay = delay
+
+
+DOMAIN_POLICIES = {
+    'wp.wildvogelhilfe.org': DomainPolicy(concurrency=2, delay=2.0),
+    'www.google.com': DomainPolicy(concurrency=1, delay=5.0),
+}
+DEFAULT_POLICY = DomainPolicy()
+
+
+class Source:
+    """Deklarativer Quellen-Adapter.
+
+    seeds:    Start-URLs
+    extract:  (url, content) -> Liste von Stationen
+    discover: (url, content) -> weitere URLs dieser Quelle (optional)
+    recrawl:  Seiten erst nach so vielen Sekunden erneut laden
+    required: ohne Ergebnisse dieser Quelle wird nichts geschrieben
+    dedupe:   Einträge verwerfen, die schon von einer vorherigen Quelle stammen
+    close:    Aufräumen nach dem Lauf (z.B. Prozess-Pool des Parsers)
+    """
+
+    def __init__(self, name: str, seeds: List[str], extract: Callable[[str, bytes], List[Dict]],
+                 discover: Optional[Callable[[str, bytes], List[str]]] = None, recrawl: int = 24 * HOUR,
+                 required: bool = False, dedupe: bool = False, max_pages: int = MAX_PAGES_PER_SOURCE,
+                 close: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.seeds = seeds
+        self.extract = extract
+        self.discover = discover
+        self.recrawl = recrawl
+        self.required = required
+        self.dedupe = dedupe
+        self.max_pages = max_pages
+        self.close = close
+
+
+# ---------------------------------------------------------------------------
+# Adapter
+# ---------------------------------------------------------------------------
+
+WVH_INDEX = 'https://wp.wildvogelhilfe.org/de/auffangstationen/'
+WVH_PAGE_RE = re.compile(r'/auffangstationen/auffangstationen-([a-z0-9\-]+)/?$')
+WVH_REGIONS = {'oesterreich': 'Österreich', 'schweiz': 'Schweiz', 'italien': 'Italien'}
+
+
+def wvh_region(url: str) -> Optional[str]:
+    """'…/auffangstationen-plz-gebiet-3/' -> 'PLZ 3', '…-oesterreich/' -> 'Österreich'."""
+    m = WVH_PAGE_RE.search(urlsplit(url).path)
+    if not m:
+        return None
+    slug = m.group(1)
+    plz = re.fullmatch(r'plz-gebiet-(\d)', slug)
+    if plz:
+        return f"PLZ {plz.group(1)}"
+    return WVH_REGIONS.get(slug, slug.replace('-', ' ').title())
+
+
+def wildvogelhilfe_source() -> Source:
+    from bs4 import BeautifulSoup
+    from scraper_wildvogelhilfe_org import SimpleWildvogelhilfeScraper, split_station_blocks
+
+    scraper = SimpleWildvogelhilfeScraper()
+
+    def discover(url: str, content: bytes) -> List[str]:
+        soup = BeautifulSoup(content, 'html.parser')
+        links = (urljoin(url, a['href']) for a in soup.find_all('a', href=True))
+        return [link.split('#')[0] for link in links if wvh_region(link)]
+
+    def extract(url: str, content: bytes) -> List[Dict]:
+        region = wvh_region(url)
+        if not region:
+            return []  # Übersichtsseite
+        start = time.perf_counter()
+        soup = BeautifulSoup(content, 'html.parser')
+        main = soup.find('div', class_='entry-content') or soup.find('main')
+        if not main:
+            logger.warning("⚠️  Kein Hauptinhalt gefunden für %s", region)
+            return []
+        stations = scraper.parse_blocks(split_station_blocks(main), region)
+        metrics.record_parsed('wildvogelhilfe', len(stations), time.perf_counter() - start)
+        return stations
+
+    # Bekannte Seiten als Start, falls die Übersicht (noch) nicht alle verlinkt
+    return Source('wildvogelhilfe', [WVH_INDEX] + [url for _region, url in scraper.urls], extract, discover,
+                  required=True, close=scraper.close)
+
+
+def nabu_source() -> Source:
+    import xml.etree.ElementTree as ET
+    from scraper_nabu_wvh import NABU_MAP_IDS, NABUGoogleMapsScraper, kml_url
+
+    scraper = NABUGoogleMapsScraper()
+
+    def extract(url: str, content: bytes) -> List[Dict]:
+        scraper.data, scraper.existing_data = [], []
+        scraper.parse_kml_data(ET.fromstring(content))
+        return scraper.data
+
+    return Source('nabu', [kml_url(mid) for mid in NABU_MAP_IDS], extract, dedupe=True)
+
+
+SOURCE_FACTORIES: Dict[str, Callable[[], Source]] = {
+    'wildvogelhilfe': wildvogelhilfe_source,
+    'nabu': nabu_source,
+}
+
+
+def default_sources(names: Optional[List[str]] = None) -> List[Source]:
+    return [factory() for name, factory in SOURCE_FACTORIES.items() if not names or name in names]
+
+
+# ---------------------------------------------------------------------------
+# robots.txt
+# ---------------------------------------------------------------------------
+
+class RobotsCache:
+    """robots.txt je Host, im Speicher und unter .crawl/robots/ (ROBOTS_TTL) zwischengespeichert."""
+
+    def __init__(self, session, directory: Path = ROBOTS_DIR, ttl: int = ROBOTS_TTL,
+                 user_agent: str = http_client.USER_AGENT):
+        self.session = session
+        self.directory = directory
+        self.ttl = ttl
+        self.agent = user_agent.split('/')[0]
+        self.parsers: Dict[str, RobotFileParser] = {}
+
+    def _load(self, origin: str) -> RobotFileParser:
+        path = self.directory / (hashlib.sha1(origin.encode('utf-8')).hexdigest()[:16] + '.txt')
+        parser = RobotFileParser(origin + '/robots.txt')
+        if path.exists() and time.time() - path.stat().st_mtime < self.ttl:
+            parser.parse(path.read_text(encoding='utf-8').splitlines())
+            return parser
+        try:
+            response = self.session.get(origin + '/robots.txt')
+            status = response.status_code
+            text = response.text if status == 200 else ''
+        except Exception as e:
+            # Nicht erreichbar: diesmal erlauben, aber nicht zwischenspeichern
+            logger.warning("⚠️  robots.txt von %s nicht abrufbar: %s", origin, e)
+            parser.parse([])
+            return parser
+        if status in (401, 403):
+            text = 'User-agent: *\nDisallow: /'
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        parser.parse(text.splitlines())
+        return parser
+
+    def _parser(self, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if origin not in self.parsers:
+            self.parsers[origin] = self._load(origin)
+        return self.parsers[origin]
+
+    def allowed(self, url: str) -> bool:
+        return self._parser(url).can_fetch(self.agent, url)
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        delay = self._parser(url).crawl_delay(self.agent)
+        return float(delay) if delay is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Frontier
+# ---------------------------------------------------------------------------
+
+def _page_path(url: str) -> Path:
+    return PAGES_DIR / (hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+
+class Frontier:
+    """Alle bekannten URLs mit Zustand; Reihenfolge = Reihenfolge des Entdeckens.
+
+    Eintrag: {source, depth, status: pending|done|failed|gone|blocked, fetched, attempts, count}
+    failed behält das letzte gute Ergebnis der Seite, gone (404/410) verwirft es.
+    """
+
+    def __init__(self, path: Path = FRONTIER_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding='utf-8'))['urls']
+            except Exception as e:
+                logger.warning("⚠️  Frontier nicht lesbar, beginne neu: %s", e)
+
+    def add(self, url: str, source: str, depth: int = 0) -> bool:
+        if url in self.entries:
+            return False
+        self.entries[url] = {'source': source, 'depth': depth, 'status': 'pending', 'fetched': None, 'attempts': 0}
+        return True
+
+    def due(self, sources: Dict[str, Source], now: float) -> List[str]:
+        """URLs, die in diesem Lauf geladen werden müssen."""
+        urls = []
+        for url, entry in self.entries.items():
+            source = sources.get(entry['source'])
+            if source is None:
+                continue
+            fresh = entry['fetched'] and now - entry['fetched'] < source.recrawl
+            if entry['status'] == 'pending' or not fresh:
+                entry['status'] = 'pending'
+                entry['attempts'] = 0
+                urls.append(url)
+        return urls
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        tmp_path.write_text(json.dumps({'urls': self.entries}, ensure_ascii=False, indent=1), encoding='utf-8')
+        tmp_path.replace(self.path)
+
+    def store_result(self, url: str, stations: List[Dict]):
+        PAGES_DIR.mkdir(parents=True, exist_ok=True)
+        path = _page_path(url)
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(json.dumps({'url': url, 'stations': stations}, ensure_ascii=False), encoding='utf-8')
+        tmp_path.replace(path)
+
+    def drop_result(self, url: str):
+        _page_path(url).unlink(missing_ok=True)
+
+    def results(self, source: str) -> List[Dict]:
+        """Stationen aller Seiten einer Quelle (letztes gutes Ergebnis je Seite)."""
+        stations = []
+        for url, entry in self.entries.items():
+            path = _page_path(url)
+            if entry['source'] == source and entry['status'] != 'blocked' and path.exists():
+                stations.extend(json.loads(path.read_text(encoding='utf-8'))['stations'])
+        return stations
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+class Crawler:
+    def __init__(self, sources: List[Source], session=None, frontier: Optional[Frontier] = None,
+                 robots: Optional[RobotsCache] = None, max_workers: int = 8,
+                 policies: Optional[Dict[str, DomainPolicy]] = None):
+        self.policies = DOMAIN_POLICIES if policies is None else policies
+        if session is None:
+            # Fehlversuche plant der Scheduler selbst neu ein (Domain-Abstand, Retry-After)
+            session = http_client.create_session(
+                retries=0, pool_sizes={host: p.concurrency for host, p in self.policies.items()})
+        self.session = session
+        self.sources = {s.name: s for s in sources}
+        self.frontier = frontier or Frontier()
+        self.robots = robots or RobotsCache(session)
+        self.max_workers = max_workers
+        self.active: Dict[str, int] = {}
+        self.next_start: Dict[str, float] = {}
+        self.pages: Dict[str, int] = {}
+        self.stats = {'fetched': 0, 'failed': 0, 'blocked': 0, 'discovered': 0}
+
+    def _policy(self, host: str) -> DomainPolicy:
+        return self.policies.get(host, DEFAULT_POLICY)
+
+    def _fetch(self, url: str):
+        response = self.session.get(url)
+        response.raise_for_status()
+        return response.content
+
+    def _ready(self, url: str, now: float) -> bool:
+        host = urlsplit(url).netloc
+        return self.active.get(host, 0) < self._policy(host).concurrency and now >= self.next_start.get(host, 0.0)
+
+    def _start(self, pool: ThreadPoolExecutor, url: str, now: float) -> Future:
+        host = urlsplit(url).netloc
+        delay = max(self._policy(host).delay, self.robots.crawl_delay(url) or 0.0)
+        self.active[host] = self.active.get(host, 0) + 1
+        self.next_start[host] = now + delay
+        self.frontier.entries[url]['attempts'] += 1
+        return pool.submit(self._fetch, url)
+
+    def _finish(self, url: str, future: Future, queue: Deque[str]):
+        entry = self.frontier.entries[url]
+        source = self.sources[entry['source']]
+        host = urlsplit(url).netloc
+        self.active[host] -= 1
+        try:
+            content = future.result()
+        except Exception as e:
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            retry_after = getattr(getattr(e, 'response', None), 'headers', {}).get('Retry-After', '')
+            if retry_after.isdigit():
+                self.next_start[host] = max(self.next_start.get(host, 0.0), time.monotonic() + int(retry_after))
+            if entry['attempts'] < MAX_ATTEMPTS and (status is None or status == 429 or status >= 500):
+                logger.warning("⚠️  %s: %s – neuer Versuch (%s/%s)", url, e, entry['attempts'], MAX_ATTEMPTS)
+                queue.append(url)
+                return
+            logger.error("❌ %s: %s", url, e)
+            if status in (404, 410):
+                # Seite gibt es nicht mehr: ihre alten Stationen dürfen nicht weiter einfließen
+                self.frontier.drop_result(url)
+                entry['status'] = 'gone'
+            else:
+                entry['status'] = 'failed'
+            self.stats['failed'] += 1
+            return
+
+        try:
+            stations = source.extract(url, content)
+        except Exception as e:
+            # z.B. Consent-Seite statt KML: letztes gutes Ergebnis der Seite bleibt erhalten
+            logger.error("❌ %s: Inhalt nicht auswertbar: %s", url, e, exc_info=True)
+            entry['status'] = 'failed'
+            self.stats['failed'] += 1
+            self.frontier.save()
+            return
+        self.frontier.store_result(url, stations)
+        entry.update(status='done', fetched=time.time(), count=len(stations))
+        self.stats['fetched'] += 1
+        logger.info("✅ %s: %s (%s Stationen)", source.name, url, len(stations),
+                    extra={'source': source.name, 'url': url, 'stations': len(stations)})
+
+        links: List[str] = []
+        if source.discover:
+            try:
+                links = source.discover(url, content)
+            except Exception as e:
+                logger.error("❌ %s: Links nicht auswertbar: %s", url, e, exc_info=True)
+        for link in links:
+            if self.pages.get(source.name, 0) >= source.max_pages:
+                break
+            if self.frontier.add(link, source.name, entry['depth'] + 1):
+                self.pages[source.name] = self.pages.get(source.name, 0) + 1
+                self.stats['discovered'] += 1
+                queue.append(link)
+        self.frontier.save()
+
+    def run(self, max_pages: Optional[int] = None) -> Dict:
+        for source in self.sources.values():
+            for url in source.seeds:
+                self.frontier.add(url, source.name)
+        for url, entry in self.frontier.entries.items():
+            self.pages[entry['source']] = self.pages.get(entry['source'], 0) + 1
+        queue: Deque[str] = deque(self.frontier.due(self.sources, time.time()))
+        logger.info("🧭 %s Seiten fällig, %s aktuell", len(queue), len(self.frontier.entries) - len(queue))
+
+        started = 0
+        in_flight: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='crawl') as pool:
+            while queue or in_flight:
+                now = time.monotonic()
+                for _ in range(len(queue)):
+                    if max_pages is not None and started >= max_pages:
+                        queue.clear()
+                        break
+                    url = queue.popleft()
+                    if not self.robots.allowed(url):
+                        logger.warning("🚫 robots.txt verbietet %s", url)
+                        self.frontier.entries[url]['status'] = 'blocked'
+                        self.stats['blocked'] += 1
+                        continue
+                    if len(in_flight) < self.max_workers and self._ready(url, now):
+                        in_flight[self._start(pool, url, now)] = url
+                        started += 1
+                    else:
+                        queue.append(url)
+
+                if in_flight:
+                    # Spätestens aufwachen, wenn der nächste Host wieder an der Reihe ist
+                    waits = [t - now for t in self.next_start.values() if t > now]
+                    done, _ = wait(in_flight, timeout=min(waits, default=1.0) if queue else None,
+                                   return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish(in_flight.pop(future), future, queue)
+                elif queue:
+                    time.sleep(min((t - now for t in self.next_start.values() if t > now), default=0.01))
+        self.frontier.save()
+        return self.stats
+
+
+def is_duplicate(station: Dict, existing: List[Dict]) -> bool:
+    """Gleiche Regel wie NABUGoogleMapsScraper.is_duplicate (Name gleich oder Adresse enthalten)."""
+    name = station.get('name', '').lower()
+    address = station.get('address', '').lower()
+    for other in existing:
+        other_address = other.get('address', '')
+        if other.get('name', '').lower() == name or (len(other_address) > 10 and other_address.lower() in address):
+            return True
+    return False
+
+
+def combine_results(sources: List[Source], frontier: Frontier) -> Optional[List[Dict]]:
+    """Stationen aller Quellen in Reihenfolge der Quellen; None, wenn eine Pflichtquelle leer ist."""
+    combined: List[Dict] = []
+    for source in sources:
+        stations = frontier.results(source.name)
+        if not stations and source.required:
+            logger.error("❌ Keine Stationen von Pflichtquelle %s", source.name)
+            return None
+        if source.dedupe:
+            previous = list(combined)
+            stations = [s for s in stations if not is_duplicate(s, previous)]
+        logger.info("📦 %s: %s Stationen", source.name, len(stations))
+        combined.extend(stations)
+    return combined
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Alle Quellen gemeinsam und höflich crawlen')
+    parser.add_argument('--sources', nargs='*', default=None, choices=list(SOURCE_FACTORIES),
+                        help='Nur diese Quellen (Standard: alle)')
+    parser.add_argument('--fresh', action='store_true', help='Frontier verwerfen und alle Seiten neu laden')
+    parser.add_argument('--max-pages', type=int, default=None, help='Höchstens so viele Abrufe in diesem Lauf')
+    parser.add_argument('--output', type=Path, default=OUTPUT_PATH, help='Stationsdatei')
+    parser.add_argument('--status', action='store_true', help='Nur den Zustand der Frontier anzeigen')
+    profiling.add_argument(parser)
+    log_setup.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    if args.status:
+        entries = Frontier().entries
+        counts: Dict[str, int] = {}
+        for entry in entries.values():
+            key = f"{entry['source']}:{entry['status']}"
+            counts[key] = counts.get(key, 0) + 1
+        print(f"🧭 {len(entries)} URLs in {FRONTIER_PATH}")
+        for key, count in sorted(counts.items()):
+            print(f"   {key}: {count}")
+        return 0
+
+    log_setup.setup('crawl', args.log_level)
+    metrics.enable('crawl')
+    if args.profile:
+        profiling.enable('crawl')
+    if args.fresh and FRONTIER_PATH.exists():
+        FRONTIER_PATH.unlink()
+
+    sources = default_sources(args.sources)
+    with metrics.stage('crawl'):
+        crawler = Crawler(sources)
+        stats = crawler.run(args.max_pages)
+        for source in sources:
+            if source.close:
+                source.close()
+    logger.info("📊 %s geladen, %s fehlgeschlagen, %s durch robots.txt gesperrt, %s neu entdeckt",
+                stats['fetched'], stats['failed'], stats['blocked'], stats['discovered'], extra={'crawl': stats})
+
+    combined = combine_results(sources, crawler.frontier)
+    if combined is None:
+        return 1
+    if args.output.exists():
+        # Geocodierte/KML-Koordinaten des letzten Stands behalten
+        kept = provenance.carry_over(combined, json.loads(args.output.read_text(encoding='utf-8')))
+        logger.info("📌 Koordinaten von %s Stationen aus dem letzten Stand übernommen", kept)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = args.output.with_name(args.output.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(combined, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(args.output)
+    logger.info("💾 %s Stationen gespeichert in %s", len(combined), args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
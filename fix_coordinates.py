@@ -6,12 +6,20 @@ Skript zur Korrektur der Koordinaten basierend auf PLZ
 import json
 import re
 import hashlib
+import sys
 import time
 import argparse
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, List, Set, Tuple, Optional
 
-import requests
+import boundaries
+import geocode_queue
+import metrics
+import profiling
+import provenance
+
+if TYPE_CHECKING:
+    import requests
 
 def extract_plz_from_address(address: str) -> str:
     """Extrahiert die PLZ (DE 5-stellig, AT/CH 4-stellig) aus der Adresse."""
@@ -53,9 +61,10 @@ IT_CENTROIDS = {
     '04': (44.05, 12.57)  # Rimini Umgebung (fiktiv, da 479xx real wäre)
 }
 
-def get_coordinates_for_plz(plz: str, country: str = 'Deutschland') -> Tuple[Optional[float], Optional[float]]:
+def get_plz_centroid(plz: str, country: str = 'Deutschland') -> Optional[Tuple[float, float]]:
+    """Grobes Zentrum des PLZ-Bereichs (ohne Hash-Streuung) oder None."""
     if not plz:
-        return None, None
+        return None
     country = country.lower()
     base = None
     if country == 'deutschland' and len(plz) == 5:
@@ -85,146 +94,429 @@ def get_coordinates_for_plz(plz: str, country: str = 'Deutschland') -> Tuple[Opt
             base = IT_CENTROIDS[plz[:2]]
         elif len(plz) >= 3 and plz[:3] in IT_CENTROIDS:
             base = IT_CENTROIDS[plz[:3]]
+    return base
+
+def get_coordinates_for_plz(plz: str, country: str = 'Deutschland') -> Tuple[Optional[float], Optional[float]]:
+    base = get_plz_centroid(plz, country)
     if not base:
         return None, None
     lat_off, lon_off = _hash_offset(plz)
     return round(base[0] + lat_off, 4), round(base[1] + lon_off, 4)
 
-def geocode_plz_city(plz: str, city: str, country: str, session: requests.Session, cache: Dict, delay: float = 1.0) -> Tuple[Optional[float], Optional[float]]:
+def geocode_plz_city(plz: str, city: str, country: str, session: 'requests.Session', cache: Dict, delay: float = 1.0) -> Tuple[Optional[float], Optional[float]]:
     """Fragt Nominatim nach exakten Koordinaten (Cache genutzt)."""
     key = f"{plz}|{city.lower()}|{country.lower()}"
     if key in cache:
         return cache[key]
     url = "https://nominatim.openstreetmap.org/search"
     params = {"postalcode": plz, "city": city, "country": country, "format": "json", "limit": 1}
-    headers = {"User-Agent": "wvhMap/1.0 (kontakt@example.com)"}
     try:
-        resp = session.get(url, params=params, headers=headers, timeout=20)
+        resp = session.get(url, params=params)
         if resp.status_code == 200:
             data = resp.json()
             if data:
                 lat = float(data[0]['lat'])
                 lon = float(data[0]['lon'])
-                cache[key] = (lat, lon)
                 time.sleep(delay)
-                return lat, lon
-    except Exception:
-        pass
+                if not boundaries.wrong_country(lat, lon, country):
+                    cache[key] = (lat, lon)
+                    return lat, lon
+                # Gleichnamiger Ort im Nachbarland: lieber PLZ-Näherung als falsches Land
+                metrics.record_nominatim_error('wrong_country')
+            else:
+                metrics.record_nominatim_error('no_result')
+        else:
+            metrics.record_nominatim_error(f"http_{resp.status_code}")
+    except Exception as e:
+        metrics.record_nominatim_error(metrics.classify_error(e))
     cache[key] = (None, None)
     return None, None
 
-def fix_coordinates_in_json(geocode: bool = False, only_missing: bool = False, max_geocode: Optional[int] = None):
-    """Korrigiert / präzisiert Koordinaten; optional exaktes Geocoding."""
+def station_location(station: Dict) -> Optional[Tuple[str, Tuple[str, str, str]]]:
+    """(Cache-Schlüssel, (PLZ, Ort, Land)) der Station oder None ohne PLZ."""
+    address = station.get('address', '')
+    plz = extract_plz_from_address(address)
+    if not plz:
+        return None
+    country = station.get('country', 'Deutschland')
+    # Stadt extrahieren (alles nach PLZ bis Komma / Ende)
+    city = ''
+    mcity = re.search(rf'{plz}\s+([^,]+)', address)
+    if mcity:
+        city = mcity.group(1).strip()
+    return f"{plz}|{city.lower()}|{country.lower()}", (plz, city, country)
+
+def fix_station(station: Dict, geocode_cache: Dict, session: Optional['requests.Session'], geocode: bool = False,
+                only_missing: bool = False, may_geocode: bool = True, verbose: bool = True,
+                fresh: Optional[Set[str]] = None, delay: float = 1.0) -> Tuple[str, int]:
+    """Korrigiert eine Station in place.
+
+    Koordinaten werden nur durch mindestens so genaue ersetzt (provenance.set_coordinates);
+    geocodiert werden nur ungenaue Einträge (mit only_missing: nur Einträge ohne Koordinaten).
+
+    Rückgabe: (Ergebnis, Anzahl Bereinigungen) mit Ergebnis 'cache', 'geocoded', 'fallback',
+    'unchanged' oder 'skipped'. fresh: in diesem Lauf geocodierte Cache-Schlüssel
+    (Herkunft 'nominatim' statt 'cache'). delay: Pause nach jeder Nominatim-Anfrage.
+    """
+    location = station_location(station)
+    if not location:
+        if verbose:
+            print(f"❌ Keine PLZ: {station.get('address', '')[:60]}")
+        return 'skipped', 0
+    cache_key, (plz, city, country) = location
+
+    # Zuerst im Cache nach exakten Koordinaten suchen
+    lat = lon = None
+    is_fresh = fresh is not None and cache_key in fresh
+
+    cached_coords = geocode_cache.get(cache_key)
+    metrics.record_cache_lookup(bool(cached_coords and cached_coords[0] is not None))
+    if cache_key in geocode_cache:
+        if (cached_coords and cached_coords[0] is not None and cached_coords[1] is not None
+                and provenance.set_coordinates(station, round(cached_coords[0], 6), round(cached_coords[1], 6),
+                                               'nominatim' if is_fresh else 'cache')):
+            lat, lon = cached_coords
+            if verbose:
+                label = 'Geocoded ' if is_fresh else 'Cache-Hit'
+                print(f"{'🌐' if is_fresh else '💾'} {label} {station['name'][:45]:<45} -> {lat:.6f},{lon:.6f}")
+            station['plz'] = plz
+            station['plz_prefix'] = plz[0] if country.lower() == 'deutschland' and len(plz)==5 else country.lower()
+            return 'geocoded' if is_fresh else 'cache', 0
+
+    # Optional exaktes Geocoding (nur wenn nicht im Cache gefunden)
+    wanted = not station.get('latitude') if only_missing else provenance.is_low_precision(station)
+    if geocode and city and wanted and may_geocode:
+        lat, lon = geocode_plz_city(plz, city, country, session, geocode_cache, delay=delay)
+        if lat and lon and provenance.set_coordinates(station, round(lat, 6), round(lon, 6), 'nominatim'):
+            if verbose:
+                print(f"🌐 Geocoded {station['name'][:45]:<45} -> {lat:.6f},{lon:.6f}")
+            station['plz'] = plz
+            station['plz_prefix'] = plz[0] if country.lower() == 'deutschland' and len(plz)==5 else country.lower()
+            return 'geocoded', 0
+
+    # Fallback deterministische Koordinaten
+    result = 'unchanged'
+    base_lat, base_lon = get_coordinates_for_plz(plz, country)
+    if base_lat and base_lon:
+        missing = not station.get('latitude') or not station.get('longitude')
+        if (missing or not only_missing) and provenance.set_coordinates(station, base_lat, base_lon,
+                                                                        'hash-fallback'):
+            result = 'fallback'
+            if verbose:
+                print(f"✅ Fallback {station['name'][:50]:<50} -> {base_lat:.4f},{base_lon:.4f}")
+    else:
+        if verbose:
+            print(f"⚠️  Kein Fallback für {plz} ({station['name'][:40]})")
+        result = 'skipped'
+
+    station['plz'] = plz
+    if country.lower() == 'deutschland' and len(plz) == 5:
+        station['plz_prefix'] = plz[0]
+    else:
+        station['plz_prefix'] = country.lower()
+
+    # Aufräumen
+    cleaned = 0
+    spec = station.get('specialization')
+    if spec and station['name'] in spec:
+        new_spec = spec.replace(station['name'], '').strip()
+        if new_spec:
+            station['specialization'] = new_spec
+            cleaned += 1
+    addr = station.get('address')
+    if addr and station['name'] in addr:
+        new_addr = addr.replace(station['name'], '').strip(', ') or addr
+        if new_addr != addr:
+            station['address'] = new_addr
+            cleaned += 1
+    return result, cleaned
+
+
+def _count(counts: Dict[str, int], result: str, cleaned: int):
+    counts[result] = counts.get(result, 0) + 1
+    counts['cleaned'] = counts.get('cleaned', 0) + cleaned
+
+
+def _load_geocode_cache(cache_path: Path) -> Dict:
+    if cache_path.exists():
+        return json.loads(cache_path.read_text(encoding='utf-8'))
+    return {}
+
+
+def _print_summary(counts: Dict[str, int], output: Path, cache_path: Path, cache_size: int):
+    print("\n📊 Zusammenfassung:")
+    print(f"   🌐 Geocoded exakt: {counts.get('geocoded', 0)}")
+    print(f"   ✅ Koordinaten gesetzt/aktualisiert: "
+          f"{counts.get('cache', 0) + counts.get('geocoded', 0) + counts.get('fallback', 0)}")
+    print(f"   ⚠️  Übersprungen: {counts.get('skipped', 0)}")
+    print(f"   🧹 Bereinigt: {counts.get('cleaned', 0)}")
+    print(f"   📁 Datei: {output}")
+    print(f"   💾 Cache: {cache_path} ({cache_size} Keys)")
+
+
+def geocode_missing(stations: List[Dict], geocode_cache: Dict, session: 'requests.Session',
+                    only_missing: bool = False, max_geocode: Optional[int] = None,
+                    deadline: Optional[float] = None, delay: float = 1.0) -> Set[str]:
+    """Geocodiert priorisiert (geocode_queue) in den Cache; Rückgabe: neu gefundene Schlüssel.
+
+    deadline: Sekunden ab jetzt. Eingetragen werden die Koordinaten danach von fix_station.
+    """
+    def locate(station):
+        location = station_location(station)
+        return location if location and location[1][1] else None  # ohne Ort kein Geocoding
+
+    queue = geocode_queue.build_queue(stations, geocode_cache, locate, only_missing)
+    if not len(queue):
+        return set()
+    print(f"🌍 {len(queue)} Orte zu geocodieren: "
+          + ', '.join(f"{geocode_queue.PRIORITY_NAMES[p]}: {n}" for p, n in queue.counts().items()))
+    fresh: Set[str] = set()
+
+    def geocode(task) -> bool:
+        plz, city, country = task.location
+        geocode_cache.pop(task.key, None)  # fehlgeschlagene Einträge erneut anfragen
+        lat, lon = geocode_plz_city(plz, city, country, session, geocode_cache, delay=0)
+        if lat and lon:
+            fresh.add(task.key)
+            return True
+        return False
+
+    end = time.monotonic() + deadline if deadline is not None else None
+    stats = geocode_queue.run_queue(queue, geocode, end, delay, max_geocode)
+    metrics.record_geocode_queue(stats)
+    if stats['remaining']:
+        print(f"⏳ Offen ({stats['stopped']}): " + ', '.join(f"{k}: {v}" for k, v in stats['remaining'].items()))
+    return fresh
+
+
+def fix_coordinates_in_json(geocode: bool = False, only_missing: bool = False, max_geocode: Optional[int] = None,
+                            deadline: Optional[float] = None, delay: float = 1.0):
+    """Korrigiert / präzisiert Koordinaten; optional exaktes Geocoding (priorisiert, bis zur Deadline)."""
     path = Path('data/wildvogelhilfen.json')
     stations = json.loads(path.read_text(encoding='utf-8'))
     print(f"🔍 Verarbeite {len(stations)} Stationen... (geocode={'on' if geocode else 'off'})")
 
     cache_path = Path('data/geocode_cache.json')
-    if cache_path.exists():
-        geocode_cache = json.loads(cache_path.read_text(encoding='utf-8'))
-    else:
-        geocode_cache = {}
+    geocode_cache = _load_geocode_cache(cache_path)
 
-    session = requests.Session()
-    fixed_count = 0
-    skipped_count = 0
-    cleaned_count = 0
-    geocoded = 0
+    import http_client  # erst hier: reine Statistik-/Build-Aufrufe brauchen kein requests
+    session = http_client.create_session()
+    counts: Dict[str, int] = {}
 
+    fresh = geocode_missing(stations, geocode_cache, session, only_missing, max_geocode, deadline, delay) \
+        if geocode else set()
     for station in stations:
-        address = station.get('address', '')
-        plz = extract_plz_from_address(address)
-        country = station.get('country', 'Deutschland')
-        if not plz:
-            print(f"❌ Keine PLZ: {address[:60]}")
-            skipped_count += 1
+        _count(counts, *fix_station(station, geocode_cache, session, only_missing=only_missing, fresh=fresh))
+
+    # Speichern
+    path.write_text(json.dumps(stations, ensure_ascii=False, indent=2), encoding='utf-8')
+    cache_path.write_text(json.dumps(geocode_cache, ensure_ascii=False, indent=2), encoding='utf-8')
+    _print_summary(counts, path, cache_path, len(geocode_cache))
+
+
+# ---------------------------------------------------------------------------
+# Streaming-Modus: konstanter Speicher unabhängig von der Anzahl Stationen
+# ---------------------------------------------------------------------------
+
+READ_BLOCK = 1 << 16
+
+
+def iter_json_array(f) -> Iterator[Dict]:
+    """Liefert die Elemente eines JSON-Arrays aus einer Textdatei, ohne sie ganz zu laden."""
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    started = False
+    eof = False
+    while True:
+        # Leerraum und Trennzeichen überspringen
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            block = f.read(READ_BLOCK)
+            eof = not block
+            buf, pos = buf[pos:] + block, 0
+        if pos >= len(buf):
+            raise ValueError('Unerwartetes Dateiende im JSON-Array')
+        char = buf[pos]
+        if not started:
+            if char != '[':
+                raise ValueError('Erwartet wird ein JSON-Array')
+            started = True
+            pos += 1
+            continue
+        if char == ']':
+            return
+        if char == ',':
+            pos += 1
+            continue
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Element über die Blockgrenze hinweg: weiterlesen
+            if eof:
+                raise
+            block = f.read(READ_BLOCK)
+            eof = not block
+            buf, pos = buf[pos:] + block, 0
             continue
+        # Zahlen am Blockende könnten abgeschnitten sein ("12" von "123")
+        if end == len(buf) and not eof:
+            block = f.read(READ_BLOCK)
+            eof = not block
+            buf, pos = buf[pos:] + block, 0
+            continue
+        yield item
+        pos = end
+        if pos > READ_BLOCK:
+            buf, pos = buf[pos:], 0
+
+
+def iter_jsonl(f) -> Iterator[Dict]:
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
 
-        # Stadt extrahieren (alles nach PLZ bis Komma / Ende)
-        city = ''
-        mcity = re.search(rf'{plz}\s+([^,]+)', address)
-        if mcity:
-            city = mcity.group(1).strip()
-
-        # Zuerst im Cache nach exakten Koordinaten suchen
-        lat = lon = None
-        cache_key = f"{plz}|{city.lower()}|{country.lower()}"
-        
-        if cache_key in geocode_cache:
-            cached_coords = geocode_cache[cache_key]
-            if cached_coords and cached_coords[0] is not None and cached_coords[1] is not None:
-                lat, lon = cached_coords
-                station['latitude'] = round(lat, 6)
-                station['longitude'] = round(lon, 6)
-                print(f"💾 Cache-Hit {station['name'][:45]:<45} -> {lat:.6f},{lon:.6f}")
-                fixed_count += 1
-                station['plz'] = plz
-                station['plz_prefix'] = plz[0] if country.lower() == 'deutschland' and len(plz)==5 else country.lower()
-                continue
-        
-        # Optional exaktes Geocoding (nur wenn nicht im Cache gefunden)
-        if geocode and city and (not only_missing or not station.get('latitude')):
-            if max_geocode is None or geocoded < max_geocode:
-                lat, lon = geocode_plz_city(plz, city, country, session, geocode_cache)
-                if lat and lon:
-                    station['latitude'] = round(lat, 6)
-                    station['longitude'] = round(lon, 6)
-                    geocoded += 1
-                    print(f"🌐 Geocoded {station['name'][:45]:<45} -> {lat:.6f},{lon:.6f}")
-                    fixed_count += 1
-                    # Continue to next station after exact match
-                    station['plz'] = plz
-                    station['plz_prefix'] = plz[0] if country.lower() == 'deutschland' and len(plz)==5 else country.lower()
-                    continue
-
-        # Fallback deterministische Koordinaten
-        base_lat, base_lon = get_coordinates_for_plz(plz, country)
-        if base_lat and base_lon:
-            if not station.get('latitude') or not station.get('longitude') or not only_missing:
-                station['latitude'] = base_lat
-                station['longitude'] = base_lon
-                fixed_count += 1
-                print(f"✅ Fallback {station['name'][:50]:<50} -> {base_lat:.4f},{base_lon:.4f}")
-        else:
-            print(f"⚠️  Kein Fallback für {plz} ({station['name'][:40]})")
-            skipped_count += 1
 
-        station['plz'] = plz
-        if country.lower() == 'deutschland' and len(plz) == 5:
-            station['plz_prefix'] = plz[0]
+def is_jsonl(path: Path) -> bool:
+    """JSONL an der Endung oder am ersten Zeichen ('{' statt '[') erkennen."""
+    if path.suffix in ('.jsonl', '.ndjson'):
+        return True
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            char = f.read(1)
+            if not char or not char.isspace():
+                return char == '{'
+
+
+def iter_chunks(items: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class StreamWriter:
+    """Schreibt Stationen fortlaufend als JSONL oder im Format von json.dumps(..., indent=2)."""
+
+    def __init__(self, f, jsonl: bool):
+        self.f = f
+        self.jsonl = jsonl
+        self.count = 0
+
+    def write(self, station: Dict):
+        if self.jsonl:
+            self.f.write(json.dumps(station, ensure_ascii=False) + '\n')
         else:
-            station['plz_prefix'] = country.lower()
-
-        # Aufräumen
-        spec = station.get('specialization')
-        if spec and station['name'] in spec:
-            new_spec = spec.replace(station['name'], '').strip()
-            if new_spec:
-                station['specialization'] = new_spec
-                cleaned_count += 1
-        addr = station.get('address')
-        if addr and station['name'] in addr:
-            new_addr = addr.replace(station['name'], '').strip(', ') or addr
-            if new_addr != addr:
-                station['address'] = new_addr
-                cleaned_count += 1
+            # JSON-Strings enthalten keine echten Zeilenumbrüche, Einrücken per replace ist sicher
+            text = json.dumps(station, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            self.f.write(('[\n  ' if self.count == 0 else ',\n  ') + text)
+        self.count += 1
 
-    # Speichern
-    path.write_text(json.dumps(stations, ensure_ascii=False, indent=2), encoding='utf-8')
-    cache_path.write_text(json.dumps(geocode_cache, ensure_ascii=False, indent=2), encoding='utf-8')
+    def close(self):
+        if not self.jsonl:
+            self.f.write('\n]' if self.count else '[]')
 
-    print("\n📊 Zusammenfassung:")
-    print(f"   🌐 Geocoded exakt: {geocoded}")
-    print(f"   ✅ Koordinaten gesetzt/aktualisiert: {fixed_count}")
-    print(f"   ⚠️  Übersprungen: {skipped_count}")
-    print(f"   🧹 Bereinigt: {cleaned_count}")
-    print(f"   📁 Datei: data/wildvogelhilfen.json")
-    print(f"   💾 Cache: data/geocode_cache.json ({len(geocode_cache)} Keys)")
 
-if __name__ == "__main__":
+def fix_coordinates_streaming(input_path: Path, output_path: Optional[Path] = None, chunk_size: int = 1000,
+                              geocode: bool = False, only_missing: bool = False,
+                              max_geocode: Optional[int] = None,
+                              cache_path: Path = Path('data/geocode_cache.json'),
+                              deadline: Optional[float] = None, delay: float = 1.0) -> Dict[str, int]:
+    """Wie fix_coordinates_in_json, aber blockweise: Stationen werden gelesen, korrigiert und
+    sofort in eine temporäre Datei geschrieben, die am Ende atomar umbenannt wird.
+    Im Speicher liegen nur ein Block und der Geocode-Cache. --max greift hier in
+    Dateireihenfolge (nicht ungenaueste/älteste zuerst wie im Batch-Modus); nach der
+    Deadline (Sekunden ab jetzt) wird nicht mehr geocodiert, nur noch korrigiert.
+    """
+    output_path = output_path or input_path
+    jsonl = is_jsonl(input_path)
+    print(f"🔍 Verarbeite {input_path} blockweise ({'JSONL' if jsonl else 'JSON-Array'}, "
+          f"{chunk_size} je Block, geocode={'on' if geocode else 'off'})")
+
+    geocode_cache = _load_geocode_cache(cache_path)
+    cache_size = len(geocode_cache)
+    session = None
+    if geocode:
+        import http_client
+        session = http_client.create_session()
+
+    counts: Dict[str, int] = {}
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    start = time.perf_counter()
+    end = time.monotonic() + deadline if deadline is not None else None
+    try:
+        with open(input_path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+            writer = StreamWriter(dst, jsonl)
+            items = iter_jsonl(src) if jsonl else iter_json_array(src)
+            for n, chunk in enumerate(iter_chunks(items, chunk_size), 1):
+                for station in chunk:
+                    may_geocode = ((max_geocode is None or counts.get('geocoded', 0) < max_geocode)
+                                   and (end is None or time.monotonic() < end))
+                    _count(counts, *fix_station(station, geocode_cache, session, geocode, only_missing,
+                                                may_geocode, verbose=False, delay=delay))
+                    writer.write(station)
+                if n % 100 == 0:
+                    print(f"   … {writer.count} Stationen ({time.perf_counter() - start:.1f}s)")
+            writer.close()
+        tmp_path.replace(output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    # Cache nur schreiben, wenn Geocoding etwas hinzugefügt hat
+    if len(geocode_cache) != cache_size:
+        cache_tmp = cache_path.with_name(cache_path.name + '.tmp')
+        cache_tmp.write_text(json.dumps(geocode_cache, ensure_ascii=False, indent=2), encoding='utf-8')
+        cache_tmp.replace(cache_path)
+    print(f"⏱️  {writer.count} Stationen in {time.perf_counter() - start:.1f}s")
+    _print_summary(counts, output_path, cache_path, len(geocode_cache))
+    return counts
+
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Koordinaten fixer mit optionalem Geocoding (Nominatim)")
     parser.add_argument('--geocode', action='store_true', help='Exakte Koordinaten via Nominatim (langsam)')
     parser.add_argument('--only-missing', action='store_true', help='Nur fehlende Koordinaten geocoden / setzen')
     parser.add_argument('--max', type=int, default=None, help='Maximale Anzahl Geocode-Anfragen (z.B. zum Testen)')
-    args = parser.parse_args()
-    fix_coordinates_in_json(geocode=args.geocode, only_missing=args.only_missing, max_geocode=args.max)
+    parser.add_argument('--deadline', type=geocode_queue.parse_deadline, default=None,
+                        help='Mit --geocode: bis dahin geocodieren, Dauer (300, 10m) oder Uhrzeit (06:30)')
+    parser.add_argument('--delay', type=float, default=1.0,
+                        help='Mindestabstand zwischen Geocode-Anfragen in Sekunden (Standard: 1.0)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Blockweise verarbeiten (JSON-Array oder JSONL), Speicher unabhängig von der Dateigröße')
+    parser.add_argument('--input', type=Path, default=Path('data/wildvogelhilfen.json'),
+                        help='Stationsdatei für --stream (.json oder .jsonl)')
+    parser.add_argument('--output', type=Path, default=None, help='Ausgabedatei für --stream (Standard: --input)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Stationen je Block bei --stream (Standard: 1000)')
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('fix_coordinates')
+    path = args.input if args.stream else Path('data/wildvogelhilfen.json')
+    if not path.exists():
+        print(f"❌ Stationsdatei fehlt: {path}")
+        return 1
+    metrics.enable('fix_coordinates')
+    with metrics.stage('fix-coordinates'):
+        try:
+            if args.stream:
+                fix_coordinates_streaming(args.input, args.output, args.chunk_size, geocode=args.geocode,
+                                          only_missing=args.only_missing, max_geocode=args.max,
+                                          deadline=args.deadline, delay=args.delay)
+            else:
+                fix_coordinates_in_json(geocode=args.geocode, only_missing=args.only_missing, max_geocode=args.max,
+                                        deadline=args.deadline, delay=args.delay)
+        except (OSError, ValueError) as e:
+            # z.B. defekte Stationsdatei oder Cache-Datei
+            print(f"❌ Koordinaten nicht korrigiert: {e}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Geocoding-Backends und abgesicherte (hedged) Abfragen
+
+Ein Backend beantwortet search(plz, ort, land) mit (lat, lon) oder None:
+
+  nominatim   Nominatim-Suche (öffentlich oder selbst betrieben, URL wählbar)
+  photon      Photon-Suche (z.B. selbst betrieben unter http://localhost:2322)
+  table       lokale Tabelle im Format von data/geocode_cache.json ("plz|ort|land": [lat, lon])
+  centroid    Offline-Ersatz: grobes PLZ-Zentrum aus fix_coordinates (nur Näherung, wird
+              nicht in den Cache geschrieben)
+
+HedgedGeocoder fragt zuerst das primäre Backend. Kommt nach hedge_after Sekunden keine
+gültige Antwort (oder scheitert die Anfrage vorher), geht dieselbe Anfrage zusätzlich an das
+zweite Backend; die erste gültige Antwort gewinnt. Gültig heißt: Koordinaten vorhanden und
+im erwarteten Land (boundaries.wrong_country). Nach budget Sekunden wird aufgegeben – die
+Dauer je Ort ist damit begrenzt, statt bis zum HTTP-Timeout samt Wiederholungen zu warten.
+Die unterlegene Anfrage läuft im Hintergrund zu Ende (höchstens budget Sekunden) und wird
+nur noch gemessen. Gewinner je Backend: wvhmap_geocode_lookups_total{winner=...}.
+"""
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import boundaries
+import metrics
+
+if TYPE_CHECKING:
+    import requests
+
+Coords = Tuple[float, float]
+
+NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search'
+HEDGE_AFTER = 2.0
+BUDGET = 10.0
+BACKEND_KINDS = ('nominatim', 'photon', 'table', 'centroid')
+
+COUNTRY_CODES = {
+    'deutschland': 'de',
+    'österreich': 'at',
+    'schweiz': 'ch',
+    'italien': 'it',
+    'liechtenstein': 'li',
+}
+
+
+def country_code(country: str) -> str:
+    """Ländername -> ISO-Code (Standard: de)"""
+    return COUNTRY_CODES.get(country.lower(), 'de')
+
+
+class Backend:
+    """Basisklasse: search() liefert (lat, lon), None ohne Treffer oder wirft bei Fehlern."""
+
+    name = 'backend'
+    # False: Ergebnis ist nur eine Näherung und gehört nicht in den Geocode-Cache
+    cacheable = True
+    timeout: Optional[float] = None
+
+    def search(self, plz: str, city: str, country: str) -> Optional[Coords]:
+        raise NotImplementedError
+
+
+class NominatimBackend(Backend):
+    name = 'nominatim'
+
+    def __init__(self, session: 'requests.Session', url: str = NOMINATIM_URL, name: Optional[str] = None):
+        self.session = session
+        self.url = url
+        if name:
+            self.name = name
+
+    def search(self, plz: str, city: str, country: str) -> Optional[Coords]:
+        params = {
+            'q': f"{plz} {city}, {country}",
+            'format': 'json',
+            'limit': 1,
+            'countrycodes': country_code(country),
+        }
+        kwargs = {'timeout': self.timeout} if self.timeout else {}
+        response = self.session.get(self.url, params=params, **kwargs)
+        response.raise_for_status()
+        data = response.json()
+        if not data:
+            return None
+        return float(data[0]['lat']), float(data[0]['lon'])
+
+
+class PhotonBackend(Backend):
+    """Photon (GeoJSON-Antwort); Treffer aus anderen Ländern werden übersprungen."""
+
+    name = 'photon'
+
+    def __init__(self, session: 'requests.Session', url: str):
+        self.session = session
+        self.url = url.rstrip('/') + ('' if url.rstrip('/').endswith('/api') else '/api')
+
+    def search(self, plz: str, city: str, country: str) -> Optional[Coords]:
+        kwargs = {'timeout': self.timeout} if self.timeout else {}
+        response = self.session.get(self.url, params={'q': f"{plz} {city}", 'limit': 5, 'lang': 'de'}, **kwargs)
+        response.raise_for_status()
+        code = country_code(country)
+        for feature in response.json().get('features', []):
+            if str(feature.get('properties', {}).get('countrycode', '')).lower() == code:
+                lon, lat = feature['geometry']['coordinates'][:2]
+                return float(lat), float(lon)
+        return None
+
+
+class TableBackend(Backend):
+    """Lokale Tabelle "plz|ort|land": [lat, lon]; ohne Ortstreffer gilt die erste Zeile mit PLZ und Land."""
+
+    name = 'table'
+
+    def __init__(self, path: Path):
+        with open(path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+        self.exact: Dict[str, Coords] = {}
+        self.by_plz: Dict[Tuple[str, str], Coords] = {}
+        for key, value in table.items():
+            parts = key.split('|')
+            if len(parts) != 3 or not value or value[0] is None:
+                continue
+            coords = (float(value[0]), float(value[1]))
+            self.exact[key] = coords
+            self.by_plz.setdefault((parts[0], parts[2]), coords)
+
+    def search(self, plz: str, city: str, country: str) -> Optional[Coords]:
+        country = country.lower()
+        key = f"{plz}|{' '.join(city.lower().split())}|{country}"
+        return self.exact.get(key) or self.by_plz.get((plz, country))
+
+
+class CentroidBackend(Backend):
+    """Offline-Ersatz ohne Netz: grobes PLZ-Zentrum (fix_coordinates.get_plz_centroid)."""
+
+    name = 'centroid'
+    cacheable = False
+
+    def search(self, plz: str, city: str, country: str) -> Optional[Coords]:
+        from fix_coordinates import get_plz_centroid
+        return get_plz_centroid(plz, country)
+
+
+def create_backend(spec: str, session_factory=None) -> Backend:
+    """'photon=http://localhost:2322', 'nominatim=https://…/search', 'table=pfad.json' oder 'centroid'."""
+    kind, _, target = spec.partition('=')
+    kind = kind.strip().lower()
+    if kind not in BACKEND_KINDS:
+        raise ValueError(f"Unbekanntes Backend {kind!r} (möglich: {', '.join(BACKEND_KINDS)})")
+    if kind == 'centroid':
+        return CentroidBackend()
+    if kind == 'table':
+        if not target:
+            raise ValueError("table braucht einen Pfad: table=data/plz_table.json")
+        return TableBackend(Path(target))
+    if kind == 'photon' and not target:
+        raise ValueError("photon braucht eine URL: photon=http://localhost:2322")
+    if session_factory is None:
+        import http_client
+        session_factory = http_client.create_session
+    session = session_factory()
+    if kind == 'photon':
+        return PhotonBackend(session, target)
+    # Zweiter Nominatim-Server: eigener Name, damit Metriken ihn vom primären unterscheiden
+    return NominatimBackend(session, target or NOMINATIM_URL, name='nominatim-2' if target else None)
+
+
+class HedgedGeocoder:
+    """Primäres Backend, nach hedge_after Sekunden zusätzlich das zweite; erste gültige Antwort gewinnt."""
+
+    def __init__(self, primary: Backend, secondary: Optional[Backend] = None,
+                 hedge_after: float = HEDGE_AFTER, budget: float = BUDGET):
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_after = hedge_after
+        self.budget = budget
+        for backend in (primary, secondary):
+            if backend is not None:
+                # Verlorene Anfragen sollen nicht länger als das Budget Threads belegen
+                backend.timeout = budget
+        # Je Ort höchstens zwei laufende Anfragen, dazu Nachzügler früherer Orte
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='geocode')
+
+    def _run(self, backend: Backend, plz: str, city: str, country: str) -> Optional[Coords]:
+        start = time.perf_counter()
+        outcome = 'ok'
+        try:
+            coords = backend.search(plz, city, country)
+            if coords is None:
+                outcome = 'no_result'
+            elif boundaries.wrong_country(coords[0], coords[1], country):
+                outcome = 'wrong_country'
+                coords = None
+            return coords
+        except Exception as e:
+            outcome = metrics.classify_error(e)
+            raise
+        finally:
+            metrics.record_geocode_backend(backend.name, time.perf_counter() - start, outcome)
+            if outcome != 'ok' and backend.name == 'nominatim':
+                metrics.record_nominatim_error(outcome)
+
+    def lookup(self, plz: str, city: str, country: str) -> Tuple[Optional[Coords], Optional[Backend]]:
+        """(Koordinaten, Gewinner) oder (None, None), spätestens nach budget Sekunden."""
+        start = time.monotonic()
+        pending: Dict[Future, Backend] = {
+            self._executor.submit(self._run, self.primary, plz, city, country): self.primary}
+        hedged = self.secondary is None
+        while pending:
+            limit = start + (self.budget if hedged else self.hedge_after)
+            done, _ = wait(pending, timeout=max(0.0, limit - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = pending.pop(future)
+                if future.exception() is None and future.result() is not None:
+                    metrics.record_geocode_lookup(backend.name, hedged and self.secondary is not None)
+                    return future.result(), backend
+            if not hedged and (not pending or time.monotonic() >= limit):
+                # Primäres Backend zu langsam oder erfolglos: zweites dazunehmen
+                pending[self._executor.submit(self._run, self.secondary, plz, city, country)] = self.secondary
+                hedged = True
+            elif hedged and time.monotonic() >= limit:
+                break
+        metrics.record_geocode_lookup('none', self.secondary is not None and hedged)
+        return None, None
+
+    def close(self):
+        """Wartet nicht auf Nachzügler; deren Ergebnis wird ohnehin verworfen."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
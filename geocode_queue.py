@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Priorisierte Geocoding-Warteschlange mit Deadline
+
+Statt der ersten N fehlenden Orte in Dateireihenfolge werden die Orte nach Nutzen geordnet:
+
+  0  Stationen ganz ohne Koordinaten
+  1  Stationen mit PLZ-Näherung (hash-fallback, plz-centroid, unbekannte Herkunft)
+  2  Orte, deren letzte Anfrage fehlgeschlagen ist ([None, None] im Cache) – nur mit Restbudget
+  3  verdächtige Orte aus der QA-Liste (auto_update_cache.py --from-list; haben Koordinaten)
+
+Innerhalb einer Stufe zuerst Orte mit mehr Stationen (eine Anfrage hilft allen), dann die
+ältesten Koordinaten. run_queue() arbeitet bis zu einer Uhrzeit statt bis zu einer festen
+Anzahl: Anfragen starten im Abstand min_interval (Rate-Limit voll ausgenutzt, keine Pause
+zusätzlich zur Antwortzeit), und eine Anfrage startet nur, wenn sie nach der bisherigen
+Antwortzeit noch vor der Deadline fertig wird.
+"""
+
+import re
+import time
+import heapq
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import provenance
+
+NO_COORDS, FALLBACK, RETRY_FAILED, QA_SUSPECT = 0, 1, 2, 3
+PRIORITY_NAMES = {
+    NO_COORDS: 'ohne Koordinaten',
+    FALLBACK: 'PLZ-Näherung',
+    RETRY_FAILED: 'erneuter Versuch',
+    QA_SUSPECT: 'verdächtig (QA)',
+}
+# Startwert für die geschätzte Antwortzeit (wird mit jeder Anfrage nachgeführt)
+INITIAL_ESTIMATE = 1.0
+EWMA_WEIGHT = 0.3
+
+Location = Tuple[str, str, str]  # (plz, city, country)
+
+
+def station_priority(station: Dict, cached: Optional[List]) -> Optional[int]:
+    """Stufe einer Station für ihren Ort; None = keine Anfrage nötig.
+
+    cached ist der Cache-Eintrag des Orts (None wenn nicht im Cache). Treffer im Cache
+    brauchen keine Anfrage, fix_coordinates.py übernimmt sie direkt.
+    """
+    if not provenance.is_low_precision(station):
+        return None
+    if cached is None:
+        has_coords = station.get('latitude') and station.get('longitude')
+        return FALLBACK if has_coords else NO_COORDS
+    if not cached or cached[0] is None:
+        return RETRY_FAILED
+    return None
+
+
+class GeocodeTask:
+    __slots__ = ('key', 'location', 'priority', 'stations', 'oldest')
+
+    def __init__(self, key: str, location: Location, priority: int):
+        self.key = key
+        self.location = location
+        self.priority = priority
+        self.stations = 0
+        self.oldest = '\uffff'  # ohne Station: ganz hinten
+
+    def sort_key(self):
+        return self.priority, -self.stations, self.oldest, self.key
+
+
+class GeocodeQueue:
+    """Orte mit Priorität; mehrere Stationen am selben Ort ergeben eine Aufgabe."""
+
+    def __init__(self):
+        self.tasks: Dict[str, GeocodeTask] = {}
+        self._heap: Optional[List] = None
+
+    def add(self, key: str, location: Location, priority: int, station: Optional[Dict] = None):
+        task = self.tasks.get(key)
+        if task is None:
+            task = self.tasks[key] = GeocodeTask(key, location, priority)
+        task.priority = min(task.priority, priority)
+        if station is not None:
+            task.stations += 1
+            task.oldest = min(task.oldest, provenance.age_key(station))
+        self._heap = None
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def pop(self) -> GeocodeTask:
+        if self._heap is None:
+            self._heap = [(task.sort_key(), task) for task in self.tasks.values()]
+            heapq.heapify(self._heap)
+        _, task = heapq.heappop(self._heap)
+        del self.tasks[task.key]
+        return task
+
+    def ordered(self) -> Iterator[GeocodeTask]:
+        """Alle Aufgaben in Abarbeitungsreihenfolge (ohne sie zu entnehmen)."""
+        return iter(sorted(self.tasks.values(), key=GeocodeTask.sort_key))
+
+    def filter(self, keep: Callable[[GeocodeTask], bool]) -> 'GeocodeQueue':
+        """Neue Warteschlange mit den Aufgaben, für die keep(task) gilt (z.B. ein Shard)."""
+        selected = GeocodeQueue()
+        selected.tasks = {key: task for key, task in self.tasks.items() if keep(task)}
+        return selected
+
+    def counts(self) -> Dict[int, int]:
+        result: Dict[int, int] = {}
+        for task in self.tasks.values():
+            result[task.priority] = result.get(task.priority, 0) + 1
+        return dict(sorted(result.items()))
+
+
+def build_queue(stations: List[Dict], cache: Dict,
+                locate: Callable[[Dict], Optional[Tuple[str, Location]]],
+                only_missing: bool = False) -> GeocodeQueue:
+    """Warteschlange aus den Stationen; locate liefert (Cache-Schlüssel, Ort) oder None."""
+    queue = GeocodeQueue()
+    for station in stations:
+        found = locate(station)
+        if not found:
+            continue
+        key, location = found
+        priority = station_priority(station, cache.get(key))
+        if priority is None or (only_missing and priority == FALLBACK):
+            continue
+        queue.add(key, location, priority, station)
+    return queue
+
+
+def parse_deadline(text: str, now: Optional[datetime] = None) -> float:
+    """'300', '90s', '10m', '1h' (Dauer) oder '06:30' (Uhrzeit, ggf. morgen) -> Sekunden ab jetzt."""
+    text = text.strip()
+    clock = re.fullmatch(r'(\d{1,2}):(\d{2})', text)
+    if clock:
+        now = now or datetime.now()
+        target = now.replace(hour=int(clock.group(1)), minute=int(clock.group(2)), second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        return (target - now).total_seconds()
+    duration = re.fullmatch(r'(\d+(?:\.\d+)?)([smh]?)', text)
+    if not duration:
+        raise ValueError(f"Ungültige Deadline: {text!r} (z.B. 300, 10m, 1h oder 06:30)")
+    return float(duration.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[duration.group(2)]
+
+
+def run_queue(queue: GeocodeQueue, geocode: Callable[[GeocodeTask], bool],
+              deadline: Optional[float] = None, min_interval: float = 1.0,
+              max_requests: Optional[int] = None,
+              clock: Callable[[], float] = time.monotonic,
+              sleep: Callable[[float], None] = time.sleep) -> Dict:
+    """Arbeitet die Warteschlange ab, bis sie leer ist, max_requests erreicht ist oder die
+    nächste Anfrage nicht mehr vor der Deadline (clock()-Zeitpunkt) fertig würde.
+
+    geocode(task) -> True bei Treffer. Rückgabe: Statistik inkl. Rest je Stufe.
+    """
+    stats = {'requests': 0, 'found': 0, 'failed': 0, 'stopped': 'empty'}
+    estimate = INITIAL_ESTIMATE
+    next_start = clock()
+    while len(queue):
+        if max_requests is not None and stats['requests'] >= max_requests:
+            stats['stopped'] = 'max'
+            break
+        now = clock()
+        start_at = max(now, next_start)
+        if deadline is not None and start_at + estimate > deadline:
+            stats['stopped'] = 'deadline'
+            break
+        if start_at > now:
+            sleep(start_at - now)
+        task = queue.pop()
+        started = clock()
+        next_start = started + min_interval
+        found = geocode(task)
+        estimate = (1 - EWMA_WEIGHT) * estimate + EWMA_WEIGHT * (clock() - started)
+        stats['requests'] += 1
+        stats['found' if found else 'failed'] += 1
+    stats['remaining'] = {PRIORITY_NAMES[p]: n for p, n in queue.counts().items()} if len(queue) else {}
+    return stats
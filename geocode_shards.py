@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Verteiltes Geocoding: Shards nach PLZ-Präfix und deterministisches Zusammenführen
+
+Ein Prozess mit Nominatim-Limit (1 Anfrage/s) braucht für zehntausende Orte Tage. Mit
+--shard I/N bearbeitet auto_update_cache.py nur die Orte, deren PLZ-Präfix (Land + die
+ersten --shard-prefix Ziffern) per CRC32 auf Shard I fällt. Die Zuordnung hängt nur vom
+Präfix ab, nicht von Reihenfolge oder Umfang der Warteschlange: Worker auf verschiedenen
+Rechnern, zu verschiedenen Zeiten gestartet, überschneiden sich nie. Jeder Worker darf ein
+eigenes Backend bzw. Kontingent nutzen (--backend, --hedge) und schreibt nur seine
+Shard-Datei, nie data/geocode_cache.json:
+
+    data/geocode_shards/shard-2-of-4.json
+    {"format": 1, "shard": "2/4", "prefix_length": 2, "worker": "host", "updated": "…",
+     "entries": {"10115|berlin|deutschland": {"coords": [52.53, 13.38], "source": "nominatim",
+                                              "precision": "locality", "updated": "2026-10-19T06:30:00"}}}
+
+Ein abgebrochener Worker setzt beim nächsten Start fort (gefundene Orte werden übersprungen).
+
+merge führt Cache und Shards zusammen. Je Ort gewinnt der Kandidat mit dem höchsten
+(gefunden, Genauigkeit, Zeitstempel, Quelle, Koordinaten). Quelle, Genauigkeit und Zeitstempel
+der übernommenen Einträge stehen in data/geocode_cache.meta.json; beim nächsten Merge treten
+Cache-Einträge damit wieder mit ihrer Herkunft an. Einträge ohne (passende) Herkunft – von
+auto_update_cache.py direkt geschrieben oder seitdem geändert – zählen als Quelle 'cache'
+ohne Zeitstempel. Da die Rangfolge total ist, hängt das Ergebnis weder von der Reihenfolge
+der Dateien ab, noch davon, ob Shards in einem oder mehreren Läufen gemergt werden.
+Fehlschläge ersetzen nie einen Treffer.
+
+    python3 geocode_shards.py plan 4
+    python3 geocode_shards.py merge data/geocode_shards/*.json --dry-run
+"""
+
+import sys
+import json
+import zlib
+import socket
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import geocode_queue
+import profiling
+import provenance
+
+SHARD_DIR = Path('data/geocode_shards')
+CACHE_PATH = Path('data/geocode_cache.json')
+META_PATH = Path('data/geocode_cache.meta.json')
+REPORT_PATH = Path('logs/geocode_merge.json')
+FORMAT_VERSION = 1
+PREFIX_LENGTH = 2
+# Zwischenspeichern nach so vielen Einträgen (Abbruch kostet höchstens diese Anfragen)
+SAVE_EVERY = 25
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """'2/4' -> (2, 4); Shards zählen ab 1."""
+    index, _, count = text.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungültiger Shard: {text!r} (z.B. 2/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"Ungültiger Shard: {text!r} (I/N mit 1 ≤ I ≤ N)")
+    return index, count
+
+
+def plz_prefix(location: geocode_queue.Location, prefix_length: int = PREFIX_LENGTH) -> str:
+    plz, _, country = location
+    return f"{country}|{plz[:prefix_length]}"
+
+
+def shard_of(location: geocode_queue.Location, count: int, prefix_length: int = PREFIX_LENGTH) -> int:
+    """Shard (ab 1) eines Orts; CRC32 statt hash(), das je Prozess anders gesalzen ist."""
+    return zlib.crc32(plz_prefix(location, prefix_length).encode('utf-8')) % count + 1
+
+
+def select(queue: geocode_queue.GeocodeQueue, index: int, count: int,
+           prefix_length: int = PREFIX_LENGTH, done: Iterable[str] = ()) -> geocode_queue.GeocodeQueue:
+    """Aufgaben dieses Shards ohne die schon erledigten Schlüssel."""
+    done = set(done)
+    return queue.filter(lambda task: task.key not in done
+                        and shard_of(task.location, count, prefix_length) == index)
+
+
+def plan(queue: geocode_queue.GeocodeQueue, count: int, prefix_length: int = PREFIX_LENGTH) -> Dict[int, Dict]:
+    """Orte und Präfixe je Shard."""
+    shards = {i: {'tasks': 0, 'prefixes': set()} for i in range(1, count + 1)}
+    for task in queue.tasks.values():
+        shard = shards[shard_of(task.location, count, prefix_length)]
+        shard['tasks'] += 1
+        shard['prefixes'].add(plz_prefix(task.location, prefix_length))
+    return shards
+
+
+def default_path(index: int, count: int) -> Path:
+    return SHARD_DIR / f"shard-{index}-of-{count}.json"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _write_json(path: Path, payload) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(path)
+
+
+class ShardFile:
+    """Cache-Shard eines Workers; wird alle SAVE_EVERY Einträge atomar gespeichert."""
+
+    def __init__(self, path: Path, index: int, count: int, prefix_length: int = PREFIX_LENGTH):
+        self.path = path
+        self.index = index
+        self.count = count
+        self.prefix_length = prefix_length
+        self.entries: Dict[str, Dict] = {}
+        self._unsaved = 0
+
+    @classmethod
+    def open(cls, path: Path, index: int, count: int, prefix_length: int = PREFIX_LENGTH) -> 'ShardFile':
+        """Lädt einen vorhandenen Shard zum Fortsetzen; die Aufteilung muss übereinstimmen."""
+        shard = cls(path, index, count, prefix_length)
+        if path.exists():
+            data = load_shard(path)
+            if (data.get('shard'), data.get('prefix_length')) != (f"{index}/{count}", prefix_length):
+                raise ValueError(f"{path} gehört zu Shard {data.get('shard')} mit Präfixlänge "
+                                 f"{data.get('prefix_length')}, nicht {index}/{count} mit {prefix_length}")
+            shard.entries = data['entries']
+        return shard
+
+    def found_keys(self) -> List[str]:
+        return [key for key, entry in self.entries.items() if entry['coords'][0] is not None]
+
+    def record(self, key: str, coords: Optional[Tuple[float, float]], source: str,
+               precision: str = 'locality'):
+        self.entries[key] = {
+            'coords': list(coords) if coords else [None, None],
+            'source': source,
+            'precision': precision,
+            'updated': _now(),
+        }
+        self._unsaved += 1
+        if self._unsaved >= SAVE_EVERY:
+            self.save()
+
+    def save(self):
+        _write_json(self.path, {
+            'format': FORMAT_VERSION,
+            'shard': f"{self.index}/{self.count}",
+            'prefix_length': self.prefix_length,
+            'worker': socket.gethostname(),
+            'updated': _now(),
+            'entries': self.entries,
+        })
+        self._unsaved = 0
+
+
+def load_shard(path: Path) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('format') != FORMAT_VERSION or not isinstance(data.get('entries'), dict):
+        raise ValueError(f"{path}: kein Geocode-Shard (Format {FORMAT_VERSION})")
+    return data
+
+
+def candidate_rank(entry: Dict) -> Tuple:
+    """Totale Ordnung der Kandidaten eines Orts; der größte gewinnt."""
+    coords = entry['coords']
+    found = coords[0] is not None
+    return (found, provenance.PRECISION_RANK.get(entry.get('precision'), 0), entry.get('updated') or '',
+            entry.get('source') or '', json.dumps(coords) if found else '')
+
+
+def merge(cache: Dict[str, List], shards: List[Dict],
+          meta: Optional[Dict[str, Dict]] = None) -> Tuple[Dict[str, List], Dict[str, Dict], Dict]:
+    """Neuer Cache aus Cache und Shards; Rückgabe: (Cache, Herkunft je Eintrag, Bericht).
+
+    meta: Herkunft aus dem letzten Merge; gilt nur, solange die Koordinaten noch passen.
+    """
+    meta = meta or {}
+    candidates: Dict[str, List[Dict]] = {}
+    for key, coords in cache.items():
+        coords = list(coords) if coords and coords[0] is not None else [None, None]
+        known = meta.get(key)
+        if known and known.get('coords') == coords:
+            candidates[key] = [dict(known, cached=True)]
+        else:
+            candidates[key] = [{'coords': coords, 'source': 'cache', 'precision': 'locality', 'updated': '',
+                                'cached': True}]
+    for shard in shards:
+        for key, entry in shard['entries'].items():
+            candidates.setdefault(key, []).append(dict(entry, shard=shard.get('shard')))
+
+    merged: Dict[str, List] = {}
+    merged_meta: Dict[str, Dict] = {}
+    report = {'added': 0, 'updated': 0, 'unchanged': 0, 'failed': 0, 'conflicts': []}
+    # Bestehende Schlüssel in ihrer Reihenfolge, neue sortiert dahinter: kleine, stabile Git-Diffs
+    for key in list(cache) + sorted(k for k in candidates if k not in cache):
+        options = candidates[key]
+        best = max(options, key=candidate_rank)
+        merged[key] = best['coords']
+        if best.get('updated'):
+            merged_meta[key] = {k: best[k] for k in ('coords', 'source', 'precision', 'updated')}
+        found = {json.dumps(o['coords']) for o in options if o['coords'][0] is not None}
+        if len(found) > 1:
+            report['conflicts'].append({'key': key, 'chosen': best['coords'], 'source': best['source'],
+                                        'shard': best.get('shard'),
+                                        'candidates': [{k: o.get(k) for k in ('coords', 'source', 'updated', 'shard')}
+                                                       for o in options if o['coords'][0] is not None]})
+        if best['coords'][0] is None:
+            report['failed'] += 1
+        if key not in cache:
+            report['added'] += 1
+        elif not best.get('cached') and best['coords'] != list(cache[key] or [None, None]):
+            report['updated'] += 1
+        else:
+            report['unchanged'] += 1
+    return merged, dict(sorted(merged_meta.items())), report
+
+
+def _load_cache(path: Path) -> Dict:
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def cmd_merge(args) -> int:
+    try:
+        cache = _load_cache(args.cache)
+        meta = _load_cache(args.meta).get('entries', {})
+        shards = [load_shard(path) for path in sorted(args.shards)]
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    for path, shard in zip(sorted(args.shards), shards):
+        print(f"📂 {path}: Shard {shard.get('shard')} von {shard.get('worker')}, {len(shard['entries'])} Einträge")
+    merged, merged_meta, report = merge(cache, shards, meta)
+    print(f"✅ {len(merged)} Einträge: {report['added']} neu, {report['updated']} aktualisiert, "
+          f"{report['unchanged']} unverändert ({report['failed']} ohne Treffer)")
+    if report['conflicts']:
+        print(f"⚠️  {len(report['conflicts'])} Orte mit abweichenden Koordinaten, z.B.:")
+        for conflict in report['conflicts'][:5]:
+            print(f"   {conflict['key']}: {conflict['chosen']} aus {conflict['source']}"
+                  f" ({len(conflict['candidates'])} Kandidaten)")
+    _write_json(args.report, report)
+    print(f"📄 Bericht: {args.report}")
+    if args.dry_run:
+        print("📝 DRY RUN - Cache nicht geschrieben")
+        return 0
+    _write_json(args.cache, merged)
+    _write_json(args.meta, {'format': FORMAT_VERSION, 'entries': merged_meta})
+    print(f"💾 {args.cache} gespeichert (Herkunft: {args.meta})")
+    return 0
+
+
+def cmd_plan(args) -> int:
+    import auto_update_cache  # erst hier: auto_update_cache importiert dieses Modul
+    cache = auto_update_cache.load_cache()
+    stations = auto_update_cache.load_stations()
+    queue = auto_update_cache.build_geocode_queue(stations, cache)
+    print(f"📍 {len(queue)} Orte in der Warteschlange, {args.count} Shards (Präfixlänge {args.prefix_length})")
+    for index, shard in plan(queue, args.count, args.prefix_length).items():
+        print(f"   {index}/{args.count}: {shard['tasks']:6d} Orte, {len(shard['prefixes']):4d} Präfixe"
+              f"  → {default_path(index, args.count)}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Geocoding-Shards planen und zusammenführen')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_plan = sub.add_parser('plan', help='Orte je Shard für N Worker anzeigen')
+    p_plan.add_argument('count', type=int, help='Anzahl Shards')
+    p_plan.add_argument('--prefix-length', type=int, default=PREFIX_LENGTH,
+                        help=f'Ziffern des PLZ-Präfixes (Standard: {PREFIX_LENGTH})')
+
+    p_merge = sub.add_parser('merge', help='Shards in den Geocode-Cache übernehmen')
+    p_merge.add_argument('shards', type=Path, nargs='+', help='Shard-Dateien')
+    p_merge.add_argument('--cache', type=Path, default=CACHE_PATH, help=f'Cache (Standard: {CACHE_PATH})')
+    p_merge.add_argument('--meta', type=Path, default=None,
+                         help=f'Herkunft der Cache-Einträge (Standard: neben dem Cache, {META_PATH})')
+    p_merge.add_argument('--report', type=Path, default=REPORT_PATH, help=f'Bericht (Standard: {REPORT_PATH})')
+    p_merge.add_argument('--dry-run', action='store_true', help='Nur berichten, Cache nicht schreiben')
+
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('geocode_shards')
+    if args.command == 'merge' and args.meta is None:
+        args.meta = args.cache.with_name(args.cache.stem + '.meta.json')
+    if args.command == 'plan':
+        if args.count < 1:
+            parser.error('count muss mindestens 1 sein')
+        return cmd_plan(args)
+    return cmd_merge(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
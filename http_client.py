@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Gemeinsamer HTTP-Client für Scraper, Crawler und Geocoder
+
+Alle Netzwerkzugriffe des Projekts laufen über create_session(). Damit gelten überall
+dieselben Einstellungen, und Verbindungswiederverwendung und Latenz lassen sich an einer
+Stelle messen und einstellen:
+
+  - ein User-Agent (Nominatim verlangt einen identifizierbaren)
+  - Verbindungs-Pools je Host (HOST_POOL_SIZES), Keep-Alive
+  - Accept-Encoding gzip/deflate, zusätzlich br wenn brotli installiert ist
+  - Standard-Timeout (Verbindungsaufbau, Lesen), wenn der Aufrufer keinen angibt
+  - Wiederholungen bei Verbindungsfehlern, 429 und 5xx mit Backoff und Retry-After
+  - Metriken: Latenz/Bytes/Fehler je Host (auch ohne Antwort) und neu geöffnete
+    Verbindungen (wvhmap_http_connections_opened_total)
+  - Cache-Hook: Funktionen in session.cache_hooks dürfen eine Antwort liefern, bevor
+    eine Anfrage rausgeht
+"""
+
+import time
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+
+USER_AGENT = 'wvhMap/1.0 (kontakt@example.com)'
+# (Verbindungsaufbau, Lesen) in Sekunden
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 30.0)
+RETRIES = 3
+BACKOFF_FACTOR = 1.0
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Gleichzeitige Verbindungen je Host; passt zu crawler.DOMAIN_POLICIES und der
+# Nominatim-Vorgabe (höchstens eine Anfrage zur Zeit)
+HOST_POOL_SIZES: Dict[str, int] = {
+    'wp.wildvogelhilfe.org': 2,
+    'www.google.com': 1,
+    'nominatim.openstreetmap.org': 1,
+}
+DEFAULT_POOL_SIZE = 4
+
+
+def _accept_encoding() -> str:
+    # urllib3 entpackt br nur, wenn brotli (oder brotlicffi) importierbar ist
+    for module in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module)
+            return 'gzip, deflate, br'
+        except ImportError:
+            continue
+    return 'gzip, deflate'
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+# Ein Cache-Hook bekommt (Methode, URL, Anfrage-kwargs) und gibt eine Antwort oder None zurück
+CacheHook = Callable[[str, str, Dict], Optional[requests.Response]]
+
+
+class Session(requests.Session):
+    """requests.Session mit Standard-Timeout, Fehler-Metriken und Cache-Hooks."""
+
+    def __init__(self, timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        self.cache_hooks: List[CacheHook] = []
+
+    def request(self, method, url, **kwargs):
+        for hook in self.cache_hooks:
+            cached = hook(method, url, kwargs)
+            if cached is not None:
+                return cached
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        try:
+            return super().request(method, url, **kwargs)
+        except requests.RequestException as e:
+            if e.response is None:
+                # Ohne Antwort (Timeout, DNS, ...) sieht der Response-Hook nichts
+                metrics.record_http(url, time.perf_counter() - start, None)
+            raise
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Anfragen und geöffnete Verbindungen je Host (aus den urllib3-Pools)."""
+        stats: Dict[str, Dict[str, int]] = {}
+        for adapter in set(self.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                entry = stats.setdefault(pool.host, {'requests': 0, 'connections': 0})
+                entry['requests'] += pool.num_requests
+                entry['connections'] += pool.num_connections
+        return stats
+
+    def close(self):
+        _record_pools(self)
+        _OPEN.discard(self)
+        super().close()
+
+
+_OPEN: 'weakref.WeakSet[Session]' = weakref.WeakSet()
+_RECORDED: 'weakref.WeakKeyDictionary[Session, Dict[str, int]]' = weakref.WeakKeyDictionary()
+
+
+def _record_pools(session: Session):
+    # Nur den Zuwachs seit dem letzten Aufruf zählen (close() und Metrik-Export können beide kommen)
+    seen = _RECORDED.setdefault(session, {})
+    for host, entry in session.pool_stats().items():
+        opened = entry['connections'] - seen.get(host, 0)
+        if opened > 0:
+            metrics.record_connections(host, opened)
+        seen[host] = entry['connections']
+
+
+def _collect():
+    for session in list(_OPEN):
+        _record_pools(session)
+
+
+metrics.add_collector(_collect)
+
+
+def create_session(user_agent: str = USER_AGENT, timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                   retries: int = RETRIES, pool_sizes: Optional[Dict[str, int]] = None) -> Session:
+    """Neue Session mit Pools je Host, Retry-Strategie und Metriken.
+
+    retries=0 schaltet die Wiederholungen ab (der Crawler plant Fehlversuche selbst neu ein).
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # letzte Antwort zurückgeben, raise_for_status entscheidet der Aufrufer
+    )
+    session = Session(timeout)
+    session.headers.update({
+        'User-Agent': user_agent,
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive',
+    })
+    default = HTTPAdapter(pool_connections=8, pool_maxsize=DEFAULT_POOL_SIZE, max_retries=retry)
+    session.mount('https://', default)
+    session.mount('http://', default)
+    for host, size in {**HOST_POOL_SIZES, **(pool_sizes or {})}.items():
+        # Eigener Adapter je Host: pool_maxsize gilt dann genau für diesen Host
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=retry)
+        session.mount(f'https://{host}/', adapter)
+        session.mount(f'http://{host}/', adapter)
+    metrics.instrument_session(session)
+    _OPEN.add(session)
+    return session
@@ -96,11 +96,17 @@ class WildvogelhilfeMap {
     async loadStations() {
         try {
             console.log('🔄 Lade Stationen aus JSON-Datei...');
-            const response = await fetch('data/wildvogelhilfen.json');
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            const dataset = await this.loadDataset();
+            if (dataset) {
+                this.stations = Object.values(dataset.stations);
+            } else {
+                // Ohne Manifest (z.B. vor dem ersten Publish): ganze Datei laden
+                const response = await fetch('data/wildvogelhilfen.json');
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+                this.stations = await response.json();
             }
-            this.stations = await response.json();
             console.log(`✅ ${this.stations.length} Stationen erfolgreich geladen`);
             
             // Validierung der Daten
@@ -116,6 +122,79 @@ class WildvogelhilfeMap {
         }
     }
 
+    // Versionierter Datensatz (build_manifest.py): mit zwischengespeicherter Version V
+    // wird nur das Delta V → aktuell geladen, sonst die ganze Version. null = kein Manifest.
+    async loadDataset() {
+        let manifest;
+        try {
+            const response = await fetch('data/manifest.json', { cache: 'no-cache' });
+            if (!response.ok) return null;
+            manifest = await response.json();
+        } catch (error) {
+            return null;
+        }
+
+        let cached = null;
+        try {
+            cached = JSON.parse(localStorage.getItem('wvh-dataset'));
+        } catch (error) {
+            cached = null;
+        }
+        if (cached && cached.version === manifest.version) {
+            console.log(`📦 Version ${manifest.version} aus dem Browser-Speicher`);
+            return cached;
+        }
+
+        let dataset = null;
+        const delta = cached && manifest.deltas[cached.version];
+        if (delta) {
+            try {
+                const response = await fetch(`data/${delta.path}`);
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                dataset = this.applyPatch(cached, await response.json());
+                console.log(`🩹 ${cached.version} → ${manifest.version}: ${delta.ops} Änderungen`);
+            } catch (error) {
+                console.warn('⚠️ Delta nicht anwendbar, lade vollständig:', error);
+                dataset = null;
+            }
+        }
+        if (!dataset || dataset.version !== manifest.version) {
+            const response = await fetch(`data/${manifest.path}`);
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+            dataset = await response.json();
+        }
+
+        try {
+            localStorage.setItem('wvh-dataset', JSON.stringify(dataset));
+        } catch (error) {
+            // Speicher voll oder deaktiviert: beim nächsten Mal wieder vollständig laden
+        }
+        return dataset;
+    }
+
+    // RFC 6902 für die Operationen aus build_manifest.py (test, add, remove, replace auf Objekten)
+    applyPatch(document, patch) {
+        for (const op of patch) {
+            const keys = op.path.split('/').slice(1).map(k => k.replace(/~1/g, '/').replace(/~0/g, '~'));
+            const last = keys.pop();
+            const parent = keys.reduce((node, key) => node[key], document);
+            if (op.op === 'test') {
+                if (JSON.stringify(parent[last]) !== JSON.stringify(op.value)) {
+                    throw new Error(`test fehlgeschlagen: ${op.path}`);
+                }
+            } else if (op.op === 'remove') {
+                delete parent[last];
+            } else if (op.op === 'add' || op.op === 'replace') {
+                parent[last] = op.value;
+            } else {
+                throw new Error(`Nicht unterstützte Operation: ${op.op}`);
+            }
+        }
+        return document;
+    }
+
     loadDemoData() {
         // Demo-Daten basierend auf dem Beispiel aus der Anfrage
         this.stations = [
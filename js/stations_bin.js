@@ -0,0 +1,185 @@
+// Leser für data/stations.wvhc (Format siehe build_binary.py).
+//
+//   const file = await StationBinaryFile.open('data/stations.wvhc');
+//   const inBerlin = await file.queryBBox(52.3, 13.0, 52.7, 13.8);
+//   const all = await file.readAll();
+//
+// open() lädt per HTTP-Range-Request nur Kopf, Metadaten und Blockindex; queryBBox() danach
+// nur die Blöcke, deren Box die Abfrage schneidet (benachbarte Blöcke in einer Anfrage).
+// Liefert der Server keine Teilantworten (Status 200), wird die Datei einmal ganz geladen.
+
+class StationBinaryFile {
+    static HEADER_SIZE = 32;
+    static INDEX_ENTRY_SIZE = 32;
+    static HAS_COORDS = 1;
+    static FORMAT_VERSION = 1;
+
+    constructor(url) {
+        this.url = url;
+        this.whole = null;
+        this.textDecoder = new TextDecoder('utf-8');
+    }
+
+    static async open(url) {
+        const file = new StationBinaryFile(url);
+        await file.readHeader();
+        return file;
+    }
+
+    async readRange(offset, length) {
+        if (this.whole) {
+            return new Uint8Array(this.whole, offset, length);
+        }
+        const response = await fetch(this.url, {
+            headers: { Range: `bytes=${offset}-${offset + length - 1}` }
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        const buffer = await response.arrayBuffer();
+        if (response.status === 206) {
+            return new Uint8Array(buffer);
+        }
+        this.whole = buffer;
+        return new Uint8Array(buffer, offset, length);
+    }
+
+    async readHeader() {
+        const head = await this.readRange(0, StationBinaryFile.HEADER_SIZE);
+        const view = new DataView(head.buffer, head.byteOffset, head.byteLength);
+        const magic = String.fromCharCode(...head.subarray(0, 4));
+        const version = view.getUint16(4, true);
+        if (magic !== 'WVHC' || version !== StationBinaryFile.FORMAT_VERSION) {
+            throw new Error(`Kein WVHC-Format (Version ${StationBinaryFile.FORMAT_VERSION})`);
+        }
+        this.count = view.getUint32(8, true);
+        this.scale = view.getUint32(12, true);
+        const metaLength = view.getUint32(16, true);
+        const blockCount = view.getUint32(20, true);
+
+        const rest = await this.readRange(StationBinaryFile.HEADER_SIZE,
+            metaLength + blockCount * StationBinaryFile.INDEX_ENTRY_SIZE);
+        this.columns = JSON.parse(this.textDecoder.decode(rest.subarray(0, metaLength))).columns;
+        const index = new DataView(rest.buffer, rest.byteOffset + metaLength, blockCount * StationBinaryFile.INDEX_ENTRY_SIZE);
+        this.blocks = [];
+        for (let i = 0; i < blockCount; i++) {
+            const at = i * StationBinaryFile.INDEX_ENTRY_SIZE;
+            this.blocks.push({
+                minLat: index.getInt32(at, true),
+                minLon: index.getInt32(at + 4, true),
+                maxLat: index.getInt32(at + 8, true),
+                maxLon: index.getInt32(at + 12, true),
+                offset: index.getUint32(at + 16, true),
+                length: index.getUint32(at + 20, true),
+                rows: index.getUint16(at + 28, true),
+                flags: index.getUint16(at + 30, true)
+            });
+        }
+    }
+
+    // Liest Blöcke; aneinandergrenzende in einem Range-Request
+    async readBlocks(blocks) {
+        const result = [];
+        let i = 0;
+        while (i < blocks.length) {
+            let j = i;
+            while (j + 1 < blocks.length && blocks[j + 1].offset === blocks[j].offset + blocks[j].length) {
+                j++;
+            }
+            const start = blocks[i].offset;
+            const data = await this.readRange(start, blocks[j].offset + blocks[j].length - start);
+            for (const block of blocks.slice(i, j + 1)) {
+                result.push([data.subarray(block.offset - start, block.offset - start + block.length), block]);
+            }
+            i = j + 1;
+        }
+        return result;
+    }
+
+    decodeBlock(data, block) {
+        const rows = block.rows;
+        const stations = Array.from({ length: rows }, () => ({}));
+        let offset = 0;
+
+        if (block.flags & StationBinaryFile.HAS_COORDS) {
+            // ZigZag-Varints, abwechselnd lat/lon als Differenz zur vorherigen Station
+            let lat = 0;
+            let lon = 0;
+            for (let i = 0; i < rows * 2; i++) {
+                let value = 0;
+                let factor = 1;
+                let byte;
+                do {
+                    byte = data[offset++];
+                    value += (byte & 0x7f) * factor;
+                    factor *= 128;
+                } while (byte & 0x80);
+                const delta = value % 2 ? -(value + 1) / 2 : value / 2;
+                if (i % 2 === 0) {
+                    lat += delta;
+                } else {
+                    lon += delta;
+                    stations[i >> 1].latitude = lat / this.scale;
+                    stations[i >> 1].longitude = lon / this.scale;
+                }
+            }
+        }
+
+        const view = new DataView(data.buffer, data.byteOffset, data.byteLength);
+        for (const column of this.columns) {
+            if (column.kind === 'dict') {
+                const wide = column.values.length >= 255;
+                for (let i = 0; i < rows; i++) {
+                    const code = wide ? view.getUint16(offset + i * 2, true) : data[offset + i];
+                    if (code) stations[i][column.name] = column.values[code - 1];
+                }
+                offset += rows * (wide ? 2 : 1);
+                continue;
+            }
+            const bitmap = data.subarray(offset, offset + ((rows + 7) >> 3));
+            offset += bitmap.length;
+            const blobLength = view.getUint32(offset, true);
+            offset += 4;
+            const blob = this.textDecoder.decode(data.subarray(offset, offset + blobLength));
+            offset += blobLength;
+            const present = (i) => (bitmap[i >> 3] >> (7 - (i & 7))) & 1;
+            let values = null;
+            for (let i = 0, n = 0; i < rows; i++) {
+                if (!present(i)) continue;
+                if (values === null) {
+                    values = column.kind === 'text' ? blob.split('\0') : JSON.parse(`[${blob}]`);
+                }
+                stations[i][column.name] = values[n++];
+            }
+        }
+        return stations;
+    }
+
+    async readAll() {
+        const stations = [];
+        for (const [data, block] of await this.readBlocks(this.blocks)) {
+            stations.push(...this.decodeBlock(data, block));
+        }
+        return stations;
+    }
+
+    async queryBBox(minLat, minLon, maxLat, maxLon) {
+        const q = [minLat, minLon, maxLat, maxLon].map(v => Math.round(v * this.scale));
+        const hits = this.blocks.filter(b => (b.flags & StationBinaryFile.HAS_COORDS)
+            && b.minLat <= q[2] && b.maxLat >= q[0] && b.minLon <= q[3] && b.maxLon >= q[1]);
+        const stations = [];
+        for (const [data, block] of await this.readBlocks(hits)) {
+            for (const station of this.decodeBlock(data, block)) {
+                if (station.latitude >= minLat && station.latitude <= maxLat
+                    && station.longitude >= minLon && station.longitude <= maxLon) {
+                    stations.push(station);
+                }
+            }
+        }
+        return stations;
+    }
+}
+
+if (typeof module !== 'undefined') {
+    module.exports = { StationBinaryFile };
+}
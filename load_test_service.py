@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Lasttest für query_service.py auf localhost
+Öffnet N Keep-Alive-Verbindungen und schickt für eine feste Dauer eine Mischung aus
+/nearest-, /bbox- und /search-Anfragen. Ausgabe: Anfragen/s, p50/p90/p99-Latenz,
+Statuscodes.
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+from typing import Dict, List
+from urllib.parse import quote
+
+import profiling
+
+SEARCH_TERMS = ['wildvogel', 'nabu', 'greifvögel', 'berlin', 'görlitz', 'jena', 'station', '0', '80', 'eulen',
+                'mauersegler', 'tierschutz', 'münchen', 'wien', 'zürich']
+
+
+def random_target(rnd: random.Random) -> str:
+    kind = rnd.random()
+    if kind < 0.5:
+        lat, lon = rnd.uniform(47.3, 54.9), rnd.uniform(6.0, 15.0)
+        return f"/nearest?lat={lat:.3f}&lon={lon:.3f}&k={rnd.choice((3, 5, 10))}"
+    if kind < 0.75:
+        south, west = rnd.uniform(47.0, 53.0), rnd.uniform(6.0, 13.0)
+        size = rnd.uniform(0.2, 2.0)
+        return f"/bbox?south={south:.2f}&west={west:.2f}&north={south + size:.2f}&east={west + size:.2f}"
+    term = rnd.choice(SEARCH_TERMS)
+    if len(term) > 2:
+        term = term[:rnd.randint(2, len(term))]
+    return f"/search?q={quote(term)}"
+
+
+async def worker(host: str, port: int, deadline: float, seed: int, latencies: List[float], statuses: Dict[int, int],
+                 repeat_ratio: float):
+    rnd = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    recent: List[str] = []
+    try:
+        while time.perf_counter() < deadline:
+            # Ein Teil der Anfragen wiederholt frühere Ziele (realistische Cache-Trefferquote)
+            if recent and rnd.random() < repeat_ratio:
+                target = rnd.choice(recent)
+            else:
+                target = random_target(rnd)
+                recent = (recent + [target])[-50:]
+            request = f"GET {target} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode('ascii')
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b'\r\n\r\n')
+            lines = head.decode('latin-1').split('\r\n')
+            status = int(lines[0].split(' ')[1])
+            length = 0
+            for line in lines[1:]:
+                if line.lower().startswith('content-length:'):
+                    length = int(line.split(':', 1)[1])
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def run(host: str, port: int, concurrency: int, duration: float, repeat_ratio: float) -> Dict:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(host, port, deadline, i, latencies, statuses, repeat_ratio)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p90_ms': percentile(latencies, 90) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+        'statuses': statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lasttest für den lokalen Query-Service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', '-c', type=int, default=16, help='Parallele Verbindungen (Standard: 16)')
+    parser.add_argument('--duration', '-d', type=float, default=10.0, help='Dauer in Sekunden (Standard: 10)')
+    parser.add_argument('--repeat', type=float, default=0.5,
+                        help='Anteil wiederholter Anfragen 0..1 (Standard: 0.5)')
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable('load_test')
+
+    print(f"🔨 LASTTEST http://{args.host}:{args.port} ({args.concurrency} Verbindungen, {args.duration:.0f}s)")
+    print("=" * 50)
+    try:
+        result = asyncio.run(run(args.host, args.port, args.concurrency, args.duration, args.repeat))
+    except ConnectionRefusedError:
+        print("❌ Service nicht erreichbar – läuft 'python3 query_service.py'?")
+        return 1
+
+    print(f"   📨 {result['requests']} Anfragen in {result['seconds']:.1f}s")
+    print(f"   ⚡ {result['rps']:.0f} Anfragen/s")
+    print(f"   ⏱️  p50 {result['p50_ms']:.2f} ms | p90 {result['p90_ms']:.2f} ms | "
+          f"p99 {result['p99_ms']:.2f} ms | max {result['max_ms']:.2f} ms")
+    print(f"   📋 Status: {', '.join(f'{k}: {v}' for k, v in sorted(result['statuses'].items()))}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
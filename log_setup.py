@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Logging für Scraper und Crawler (nicht blockierend, JSON-Zeilen, Rotation)
+
+setup(job) wird im Einstiegspunkt aufgerufen, nie beim Import. Danach hängt am Root-Logger
+nur ein QueueHandler: ein Log-Aufruf legt den Record in eine Queue und kehrt zurück.
+Formatieren und Schreiben übernimmt ein QueueListener-Thread:
+
+  - logs/<job>.jsonl   eine JSON-Zeile je Record, rotiert nach Größe (MAX_BYTES, BACKUPS)
+  - Konsole            wie bisher "zeit - LEVEL - text"
+
+Die Nachricht wird erst im Listener aus msg und args zusammengesetzt; Aufrufer sollten
+deshalb %-Platzhalter statt f-Strings verwenden (logger.info("%s: %d", name, n)).
+Meldungen je Station/Eintrag stehen auf DEBUG (--log-level DEBUG); auf INFO kosten sie
+nur die Level-Prüfung.
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+from typing import Optional
+
+LOG_DIR = os.environ.get('WVHMAP_LOG_DIR', 'logs')
+MAX_BYTES = 5 * 1024 * 1024
+BACKUPS = 3
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Attribute jedes LogRecords; alles andere kam über extra={...} und landet als Feld im JSON
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Ein Record als JSON-Zeile: Zeit, Level, Logger, Nachricht, Zusatzfelder, Ausnahme."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Wie QueueHandler, aber ohne Formatieren im aufrufenden Thread.
+
+    Der Standard-QueueHandler setzt die Nachricht schon beim Einreihen zusammen (für
+    Queues zwischen Prozessen nötig). Hier bleibt alles im Prozess; nur Ausnahmen werden
+    sofort in Text umgewandelt, weil der Traceback sonst Frames festhält.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def add_argument(parser):
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Log-Level (DEBUG zeigt Meldungen je Station)')
+
+
+def setup(job: str, level='INFO', directory: Optional[str] = None,
+          max_bytes: int = MAX_BYTES, backups: int = BACKUPS) -> str:
+    """Konfiguriert den Root-Logger für einen Job; Rückgabe: Pfad der JSON-Logdatei.
+
+    Mehrfacher Aufruf im selben Prozess (wvhmap scrape all) ersetzt die vorherige
+    Konfiguration, nachdem deren Queue abgearbeitet ist.
+    """
+    global _LISTENER
+    stop()
+    directory = directory or LOG_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{job}.jsonl")
+
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                        encoding='utf-8')
+    file_handler.setFormatter(JsonLineFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    root.setLevel(level)
+    _LISTENER = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                               respect_handler_level=True)
+    _LISTENER.start()
+    return path
+
+
+def stop():
+    """Queue leeren, Listener beenden und Dateien schließen (auch automatisch bei Prozessende)."""
+    global _LISTENER
+    if _LISTENER is None:
+        return
+    _LISTENER.stop()
+    for handler in _LISTENER.handlers:
+        handler.close()
+    _LISTENER = None
+
+
+def worker_setup():
+    """Für Kindprozesse (ProcessPoolExecutor-initializer): die geerbte Queue liest dort niemand.
+
+    Worker schreiben direkt auf die Konsole; die JSON-Datei bleibt dem Hauptprozess vorbehalten
+    (sonst rotieren mehrere Prozesse dieselbe Datei).
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        root.addHandler(handler)
+
+
+atexit.register(stop)
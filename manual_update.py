@@ -4,33 +4,45 @@ Einfaches Manual-Update Script für Wildvogelhilfe-Daten
 Führt alle notwendigen Schritte in der richtigen Reihenfolge aus.
 """
 
-import subprocess
+import io
 import sys
 import argparse
+from contextlib import redirect_stdout, redirect_stderr
 from pathlib import Path
 
-def run_command(cmd, description):
-    """Führt einen Befehl aus und zeigt den Status"""
+import wvhmap
+import profiling
+
+def run_command(args, description):
+    """Führt einen wvhmap-Unterbefehl im selben Prozess aus und zeigt den Status"""
     print(f"\n🔄 {description}...")
-    print(f"   Ausführe: {' '.join(cmd)}")
+    print(f"   Ausführe: wvhmap {' '.join(args)}")
     
+    stdout, stderr = io.StringIO(), io.StringIO()
     try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        with redirect_stdout(stdout), redirect_stderr(stderr), profiling.stage(args[0]):
+            exit_code = wvhmap.main(args)
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        exit_code = 1
+        stderr.write(f"{type(e).__name__}: {e}\n")
+    
+    if exit_code == 0:
         print(f"✅ {description} erfolgreich")
-        if result.stdout.strip():
+        if stdout.getvalue().strip():
             print("📋 Ausgabe:")
-            for line in result.stdout.strip().split('\n')[-10:]:  # Nur letzte 10 Zeilen
+            for line in stdout.getvalue().strip().split('\n')[-10:]:  # Nur letzte 10 Zeilen
                 print(f"   {line}")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} fehlgeschlagen")
-        if e.stdout:
-            print("📋 Stdout:")
-            print(f"   {e.stdout}")
-        if e.stderr:
-            print("📋 Stderr:")
-            print(f"   {e.stderr}")
-        return False
+    print(f"❌ {description} fehlgeschlagen")
+    if stdout.getvalue():
+        print("📋 Stdout:")
+        print(f"   {stdout.getvalue()}")
+    if stderr.getvalue():
+        print("📋 Stderr:")
+        print(f"   {stderr.getvalue()}")
+    return False
 
 def main():
     parser = argparse.ArgumentParser(description='Manual Update für Wildvogelhilfe-Daten')
@@ -40,8 +52,11 @@ def main():
                        help='Maximale Anzahl Cache-Updates (Standard: 20)')
     parser.add_argument('--fix-max', type=int, default=10,
                        help='Maximale Anzahl Koordinaten-Korrekturen (Standard: 10)')
+    profiling.add_argument(parser)
     
     args = parser.parse_args()
+    if args.profile:
+        profiling.enable('manual_update')
     
     print("🦅 WILDVOGELHILFE MANUAL UPDATE")
     print("=" * 50)
@@ -54,26 +69,30 @@ def main():
         os.chdir(script_dir)
     
     success_count = 0
-    total_steps = 3 if not args.skip_scraping else 2
+    total_steps = 4  # Übersprungenes Scraping zählt als erfolgreich
     
     # Schritt 1: Scraping (optional)
     if not args.skip_scraping:
-        if run_command([sys.executable, 'scraper.py'], 'Neue Daten scrapen'):
+        if run_command(['scrape', 'all'], 'Neue Daten scrapen'):
             success_count += 1
     else:
         print("⏭️  Scraping übersprungen")
         success_count += 1
     
     # Schritt 2: Cache erweitern
-    cache_cmd = [sys.executable, 'auto_update_cache.py', '--max', str(args.cache_max)]
+    cache_cmd = ['geocode', '--max', str(args.cache_max)]
     if run_command(cache_cmd, f'Cache erweitern (max {args.cache_max} Orte)'):
         success_count += 1
     
     # Schritt 3: Koordinaten korrigieren
-    fix_cmd = [sys.executable, 'fix_coordinates.py', '--only-missing', '--max', str(args.fix_max)]
+    fix_cmd = ['fix', '--only-missing', '--max', str(args.fix_max)]
     if run_command(fix_cmd, f'Koordinaten korrigieren (max {args.fix_max})'):
         success_count += 1
     
+    # Schritt 4: Validierung und Publish-Artefakte
+    if run_command(['publish'], 'Validieren und Artefakte bauen'):
+        success_count += 1
+    
     # Zusammenfassung
     print(f"\n📊 UPDATE ABGESCHLOSSEN")
     print(f"   ✅ {success_count}/{total_steps} Schritte erfolgreich")
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Laufzeit-Metriken für Scraper, Geocoder und den Update-Ablauf
+Ein prozessweites Register (Zähler, Gauges, Histogramme mit Labels), in das die
+Skripte schreiben. Am Ende eines Laufs entstehen zwei Dateien:
+
+  logs/metrics/<job>.prom   Prometheus-Textformat für den node_exporter (textfile collector)
+  logs/metrics/<job>.json   Zusammenfassung (Schrittdauern, HTTP je Host, Parse-Rate, Cache-Trefferquote)
+
+Das Verzeichnis lässt sich mit WVHMAP_METRICS_DIR auf das Textfile-Verzeichnis des
+node_exporters legen. Ohne enable() wird nichts geschrieben (reine Importe bleiben still).
+Das Modul importiert bewusst nur die Standardbibliothek.
+"""
+
+import os
+import json
+import time
+import atexit
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import profiling
+
+METRICS_DIR = os.environ.get('WVHMAP_METRICS_DIR', os.path.join('logs', 'metrics'))
+HTTP_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Name -> (Typ, Hilfetext)
+METRIC_HELP = {
+    'wvhmap_stage_duration_seconds': ('gauge', 'Dauer des letzten Laufs je Schritt'),
+    'wvhmap_stage_success': ('gauge', '1 wenn der Schritt im letzten Lauf erfolgreich war'),
+    'wvhmap_http_request_duration_seconds': ('histogram', 'HTTP-Latenz je Host'),
+    'wvhmap_http_requests_total': ('counter', 'HTTP-Anfragen je Host und Statusklasse'),
+    'wvhmap_http_response_bytes_total': ('counter', 'Heruntergeladene Bytes je Host'),
+    'wvhmap_http_connections_opened_total': ('counter', 'Neu geöffnete HTTP-Verbindungen je Host (Rest: Keep-Alive)'),
+    'wvhmap_stations_parsed_total': ('counter', 'Geparste Stationen je Quelle'),
+    'wvhmap_parse_seconds_total': ('counter', 'Reine Parse-Zeit je Quelle'),
+    'wvhmap_geocode_cache_lookups_total': ('counter', 'Geocode-Cache-Zugriffe (hit/miss)'),
+    'wvhmap_nominatim_errors_total': ('counter', 'Fehler bei Nominatim-Anfragen je Art'),
+    'wvhmap_geocode_backend_seconds': ('histogram', 'Dauer je Geocoding-Backend (auch unterlegene Anfragen)'),
+    'wvhmap_geocode_backend_requests_total': ('counter', 'Geocoding-Anfragen je Backend und Ergebnis'),
+    'wvhmap_geocode_lookups_total': ('counter', 'Abgesicherte Geocoding-Abfragen je Gewinner (none = keine gültige Antwort)'),
+    'wvhmap_geocode_queue_remaining': ('gauge', 'Nach dem Lauf offene Geocoding-Aufgaben je Stufe'),
+    'wvhmap_run_timestamp_seconds': ('gauge', 'Ende des Laufs (Unix-Zeit)'),
+    'wvhmap_run_duration_seconds': ('gauge', 'Gesamtdauer des Laufs'),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_value(value: float) -> str:
+    # repr statt :g, damit Zeitstempel nicht auf 6 Stellen gerundet werden
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(HTTP_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(HTTP_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Obergrenze des Buckets, in dem das Quantil liegt (wie histogram_quantile, ohne Interpolation)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(HTTP_BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class Registry:
+    def __init__(self):
+        self.values: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.job: Optional[str] = None
+        self.started = time.time()
+        # Funktionen, die kurz vor dem Schreiben Werte nachtragen (z.B. http_client: Verbindungs-Pools)
+        self.collectors: List[Callable[[], None]] = []
+
+    @staticmethod
+    def _labels(labels: Optional[Dict[str, str]]) -> Labels:
+        return tuple(sorted((labels or {}).items()))
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        series = self.values.setdefault(name, {})
+        key = self._labels(labels)
+        series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        self.values.setdefault(name, {})[self._labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        series = self.histograms.setdefault(name, {})
+        key = self._labels(labels)
+        if key not in series:
+            series[key] = Histogram()
+        series[key].observe(value)
+
+    def get(self, name: str, **labels) -> float:
+        return self.values.get(name, {}).get(self._labels(labels), 0.0)
+
+    def total(self, name: str, **match) -> float:
+        """Summe über alle Serien, deren Labels match enthalten."""
+        wanted = set(match.items())
+        return sum(v for k, v in self.values.get(name, {}).items() if wanted <= set(k))
+
+    # --- Ausgabe ---
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+
+        def fmt(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = list(labels) + list(extra)
+            if self.job:
+                pairs = [('job_name', self.job)] + pairs
+            if not pairs:
+                return ''
+            escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                       for k, v in pairs)
+            return '{' + ','.join(escaped) + '}'
+
+        for name in sorted(set(self.values) | set(self.histograms)):
+            kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(self.values.get(name, {}).items()):
+                lines.append(f"{name}{fmt(labels)} {_format_value(value)}")
+            for labels, hist in sorted(self.histograms.get(name, {}).items()):
+                cumulative = 0
+                for bound, n in zip(HTTP_BUCKETS, hist.counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{fmt(labels, (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{name}_bucket{fmt(labels, (('le', '+Inf'),))} {hist.count}")
+                lines.append(f"{name}_sum{fmt(labels)} {_format_value(hist.total)}")
+                lines.append(f"{name}_count{fmt(labels)} {hist.count}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> Dict:
+        finished = time.time()
+        http = {}
+        for labels, hist in self.histograms.get('wvhmap_http_request_duration_seconds', {}).items():
+            host = dict(labels).get('host', '')
+            connections = int(self.get('wvhmap_http_connections_opened_total', host=host))
+            http[host] = {
+                'requests': hist.count,
+                'connections': connections,
+                'requests_per_connection': round(hist.count / connections, 2) if connections else None,
+                'avg_ms': round(hist.total / hist.count * 1000, 1) if hist.count else None,
+                'p50_le_s': hist.quantile(0.5),
+                'p95_le_s': hist.quantile(0.95),
+                'bytes': int(self.get('wvhmap_http_response_bytes_total', host=host)),
+                'errors': int(sum(v for k, v in self.values.get('wvhmap_http_requests_total', {}).items()
+                                  if dict(k).get('host') == host and dict(k).get('status') != '2xx')),
+            }
+        parsed = {dict(k).get('source', ''): v for k, v in self.values.get('wvhmap_stations_parsed_total', {}).items()}
+        parse_rate = {}
+        for source, count in parsed.items():
+            seconds = self.get('wvhmap_parse_seconds_total', source=source)
+            parse_rate[source] = {'stations': int(count), 'seconds': round(seconds, 3),
+                                  'per_second': round(count / seconds, 1) if seconds else None}
+        hits = self.total('wvhmap_geocode_cache_lookups_total', result='hit')
+        misses = self.total('wvhmap_geocode_cache_lookups_total', result='miss')
+        return {
+            'job': self.job,
+            'started': self.started,
+            'finished': finished,
+            'duration_s': round(finished - self.started, 3),
+            'stages': {dict(k).get('stage', ''): round(v, 3)
+                       for k, v in self.values.get('wvhmap_stage_duration_seconds', {}).items()},
+            'stage_success': {dict(k).get('stage', ''): bool(v)
+                              for k, v in self.values.get('wvhmap_stage_success', {}).items()},
+            'http': http,
+            'bytes_downloaded': int(self.total('wvhmap_http_response_bytes_total')),
+            'parsing': parse_rate,
+            'geocode_cache': {'hits': int(hits), 'misses': int(misses),
+                              'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None},
+            'nominatim_errors': {dict(k).get('kind', ''): int(v)
+                                 for k, v in self.values.get('wvhmap_nominatim_errors_total', {}).items()},
+            'geocode_backends': self._geocode_backends(),
+        }
+
+    def _geocode_backends(self) -> Dict:
+        backends = {}
+        for labels, hist in self.histograms.get('wvhmap_geocode_backend_seconds', {}).items():
+            name = dict(labels).get('backend', '')
+            backends[name] = {
+                'requests': hist.count,
+                'wins': int(self.total('wvhmap_geocode_lookups_total', winner=name)),
+                'p50_le_s': hist.quantile(0.5),
+                'p95_le_s': hist.quantile(0.95),
+                'outcomes': {dict(k).get('outcome', ''): int(v)
+                             for k, v in self.values.get('wvhmap_geocode_backend_requests_total', {}).items()
+                             if dict(k).get('backend') == name},
+            }
+        if backends:
+            backends['_lookups'] = {
+                'total': int(self.total('wvhmap_geocode_lookups_total')),
+                'hedged': int(self.total('wvhmap_geocode_lookups_total', hedged='1')),
+                'no_answer': int(self.total('wvhmap_geocode_lookups_total', winner='none')),
+            }
+        return backends
+
+    def write(self, directory: str = METRICS_DIR):
+        """Schreibt <job>.prom und <job>.json atomar (der node_exporter liest nie halbe Dateien)."""
+        job = self.job or 'wvhmap'
+        for collect in self.collectors:
+            collect()
+        summary = self.summary()
+        self.set('wvhmap_run_timestamp_seconds', summary['finished'])
+        self.set('wvhmap_run_duration_seconds', summary['duration_s'])
+        os.makedirs(directory, exist_ok=True)
+        for suffix, payload in (('.prom', self.to_prometheus()),
+                                ('.json', json.dumps(summary, ensure_ascii=False, indent=2))):
+            path = os.path.join(directory, job + suffix)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+
+REGISTRY = Registry()
+
+
+def enable(job: str, directory: Optional[str] = None):
+    """Metriken für diesen Prozess aktivieren; geschrieben wird beim Beenden.
+
+    Der erste Aufruf legt den Job-Namen fest (wvhmap.py ruft die Skripte im selben
+    Prozess auf, dann landet alles in einer Datei).
+    """
+    if REGISTRY.job is not None:
+        return
+    REGISTRY.job = job
+    atexit.register(_write_at_exit, directory or METRICS_DIR)
+
+
+def _write_at_exit(directory: str):
+    try:
+        REGISTRY.write(directory)
+    except OSError as e:
+        print(f"⚠️  Metriken konnten nicht geschrieben werden: {e}")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Misst die Dauer eines Schritts; Erfolg = keine Ausnahme.
+
+    Bei --profile zusätzlich tracemalloc-Spitze des Schritts (profiling.stage).
+    """
+    start = time.perf_counter()
+    ok = False
+    try:
+        with profiling.stage(name):
+            yield
+        ok = True
+    finally:
+        record_stage(name, time.perf_counter() - start, ok)
+
+
+def record_stage(name: str, seconds: float, ok: bool):
+    REGISTRY.set('wvhmap_stage_duration_seconds', seconds, stage=name)
+    REGISTRY.set('wvhmap_stage_success', 1.0 if ok else 0.0, stage=name)
+
+
+def record_http(url: str, seconds: float, status: Optional[int], size: int = 0):
+    host = urlsplit(url).hostname or ''
+    status_class = f"{status // 100}xx" if status else 'error'
+    REGISTRY.observe('wvhmap_http_request_duration_seconds', seconds, host=host)
+    REGISTRY.inc('wvhmap_http_requests_total', host=host, status=status_class)
+    if size:
+        REGISTRY.inc('wvhmap_http_response_bytes_total', size, host=host)
+
+
+def _response_hook(response, *args, **kwargs):
+    # Wird von requests nach jeder Antwort aufgerufen; content lesen die Aufrufer ohnehin
+    record_http(response.url, response.elapsed.total_seconds(), response.status_code, len(response.content))
+
+
+def instrument_session(session):
+    """Hängt die Latenz-/Byte-Messung an eine requests.Session."""
+    session.hooks.setdefault('response', []).append(_response_hook)
+    return session
+
+
+def record_geocode_queue(stats: Dict):
+    """Offene Aufgaben je Stufe nach geocode_queue.run_queue (0 = alles erledigt)."""
+    REGISTRY.set('wvhmap_geocode_queue_remaining', sum(stats['remaining'].values()), priority='all')
+    for name, count in stats['remaining'].items():
+        REGISTRY.set('wvhmap_geocode_queue_remaining', count, priority=name)
+
+
+def record_geocode_backend(backend: str, seconds: float, outcome: str):
+    REGISTRY.observe('wvhmap_geocode_backend_seconds', seconds, backend=backend)
+    REGISTRY.inc('wvhmap_geocode_backend_requests_total', backend=backend, outcome=outcome)
+
+
+def record_geocode_lookup(winner: str, hedged: bool):
+    REGISTRY.inc('wvhmap_geocode_lookups_total', winner=winner, hedged='1' if hedged else '0')
+
+
+def record_connections(host: str, count: int):
+    REGISTRY.inc('wvhmap_http_connections_opened_total', count, host=host)
+
+
+def add_collector(fn: Callable[[], None]):
+    """fn wird vor dem Schreiben der Metriken aufgerufen."""
+    REGISTRY.collectors.append(fn)
+
+
+def classify_error(exc: Exception) -> str:
+    """Fehlerart für wvhmap_nominatim_errors_total (ohne requests importieren zu müssen)."""
+    response = getattr(exc, 'response', None)
+    if response is not None:
+        return f"http_{response.status_code}"
+    name = type(exc).__name__
+    if 'Timeout' in name:
+        return 'timeout'
+    if 'Connection' in name:
+        return 'connection'
+    if isinstance(exc, ValueError):
+        return 'invalid_response'
+    return 'other'
+
+
+def record_parsed(source: str, count: int, seconds: float):
+    REGISTRY.inc('wvhmap_stations_parsed_total', count, source=source)
+    REGISTRY.inc('wvhmap_parse_seconds_total', seconds, source=source)
+
+
+def record_cache_lookup(hit: bool, count: int = 1):
+    REGISTRY.inc('wvhmap_geocode_cache_lookups_total', count, result='hit' if hit else 'miss')
+
+
+def record_nominatim_error(kind: str):
+    REGISTRY.inc('wvhmap_nominatim_errors_total', kind=kind)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Inkrementeller Update-Ablauf (Crawlen → Cache → Koordinaten → Validierung → Artefakte)
+Jeder Schritt deklariert seine Eingaben und Ausgaben. Ein Schritt läuft nur, wenn sich
+der Inhalt (SHA-256) einer Eingabe seit dem letzten erfolgreichen Lauf geändert hat
+oder eine Ausgabe fehlt. Hashes werden über (Größe, mtime) zwischengespeichert, ein Lauf ohne
+Änderungen liest daher keine Datei komplett ein.
+
+Zustand: .pipeline/state.json
+Exit-Code: 0 = alles gut, 1 = ein optionaler Schritt schlug fehl, 2 = Pflichtschritt
+(Crawlen/Validierung) fehlgeschlagen, nichts veröffentlichen.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import metrics
+import profiling
+
+STATE_PATH = Path('.pipeline/state.json')
+STATIONS = 'data/wildvogelhilfen.json'
+CACHE = 'data/geocode_cache.json'
+HOUR = 3600
+
+
+class Stage:
+    """Ein Schritt des Ablaufs.
+
+    inputs/outputs: Dateien oder Verzeichnisse (relativ zum Projektverzeichnis)
+    interval:       zusätzlich nach so vielen Sekunden erneut ausführen (für Scraper,
+                    deren eigentliche Eingabe die Webseite ist)
+    pending:        optionale Prüfung auf liegengebliebene Arbeit (z.B. Cache-Limit erreicht)
+    required:       bei Fehlschlag den ganzen Ablauf abbrechen
+    """
+
+    def __init__(self, name: str, command: List[str], inputs: List[str], outputs: List[str],
+                 interval: Optional[int] = None, pending: Optional[Callable[[], bool]] = None,
+                 required: bool = False):
+        self.name = name
+        self.command = command
+        self.inputs = inputs
+        self.outputs = outputs
+        self.interval = interval
+        self.pending = pending
+        self.required = required
+
+
+def _cache_has_missing() -> bool:
+    # Erst beim Aufruf importieren: die Prüfung kostet nur bei vorhandenem Cache-Schritt etwas
+    from auto_update_cache import load_cache, load_stations, find_missing_locations
+    return bool(find_missing_locations(load_stations(), load_cache()))
+
+
+def default_stages() -> List[Stage]:
+    py = sys.executable
+    return [
+        # Alle Quellen in einem Lauf; crawler.py lädt selbst nur Seiten nach, die älter als 24 h sind
+        Stage('crawl', [py, 'crawler.py'],
+              ['crawler.py', 'scraper_wildvogelhilfe_org.py', 'scraper_nabu_wvh.py'], [STATIONS],
+              interval=24 * HOUR, required=True),
+        Stage('cache-fill', [py, 'auto_update_cache.py', '--deadline', '2m', '--delay', '1.1'],
+              ['auto_update_cache.py', STATIONS], [CACHE], pending=_cache_has_missing),
+        Stage('fix-coordinates', [py, 'fix_coordinates.py', '--only-missing', '--max', '10'],
+              ['fix_coordinates.py', STATIONS, CACHE], [STATIONS]),
+        Stage('regions', [py, 'boundaries.py', 'assign'],
+              ['boundaries.py', 'data/boundaries.json', STATIONS], [STATIONS]),
+        Stage('validate', [py, 'validate_stations.py'],
+              ['validate_stations.py', STATIONS], ['logs/validation_report.json'], required=True),
+        Stage('tiles', [py, 'build_tiles.py'],
+              ['build_tiles.py', 'station_utils.py', STATIONS], ['data/tiles']),
+        Stage('clusters', [py, 'build_clusters.py'],
+              ['build_clusters.py', 'station_utils.py', STATIONS], ['data/clusters']),
+        Stage('search-index', [py, 'build_search_index.py'],
+              ['build_search_index.py', 'station_utils.py', STATIONS], ['data/search_index.json']),
+        Stage('nearest-grid', [py, 'spatial_index.py', 'export-grid'],
+              ['spatial_index.py', 'station_utils.py', STATIONS], ['data/nearest_grid.json']),
+        Stage('region-pages', [py, 'build_region_pages.py'],
+              ['build_region_pages.py', 'build_search_index.py', 'station_utils.py', STATIONS], ['regionen']),
+        Stage('binary', [py, 'build_binary.py'],
+              ['build_binary.py', 'station_utils.py', STATIONS], ['data/stations.wvhc']),
+        Stage('manifest', [py, 'build_manifest.py'],
+              ['build_manifest.py', 'station_utils.py', STATIONS], ['data/manifest.json']),
+    ]
+
+
+class ContentHasher:
+    """SHA-256 von Dateien/Verzeichnissen mit (Größe, mtime_ns)-Cache wie der Git-Index."""
+
+    def __init__(self, known: Dict):
+        self.known = known  # Pfad -> [size, mtime_ns, sha]
+        self.seen: Dict[str, list] = {}
+
+    def _file(self, path: str, st: os.stat_result) -> str:
+        entry = self.known.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            sha = entry[2]
+        else:
+            h = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    h.update(block)
+            sha = h.hexdigest()
+        self.seen[path] = [st.st_size, st.st_mtime_ns, sha]
+        return sha
+
+    def digest(self, path: str) -> Optional[str]:
+        """Hash einer Datei oder eines Verzeichnisses (über Namen + Inhalte), None falls nicht vorhanden."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if not os.path.isdir(path):
+            return self._file(path, st)
+        h = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                h.update(os.path.relpath(file_path, path).encode('utf-8'))
+                h.update(self._file(file_path, os.stat(file_path)).encode('ascii'))
+        return h.hexdigest()
+
+
+def load_state(path: Path = STATE_PATH) -> Dict:
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except Exception as e:
+            print(f"⚠️  Pipeline-Zustand nicht lesbar, alle Schritte laufen: {e}")
+    return {'files': {}, 'stages': {}}
+
+
+def save_state(state: Dict, path: Path = STATE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(json.dumps(state, indent=1, sort_keys=True), encoding='utf-8')
+    tmp_path.replace(path)
+
+
+def stage_fingerprint(stage: Stage, hasher: ContentHasher) -> Dict:
+    fingerprint = {f"in:{p}": hasher.digest(p) for p in stage.inputs}
+    # Ausgaben zählen nur über ihr Vorhandensein: spätere Schritte dürfen sie verändern
+    # (fix_coordinates schreibt z.B. in die Stationsdatei der Scraper)
+    fingerprint.update({f"out:{p}": os.path.exists(p) for p in stage.outputs})
+    fingerprint['cmd'] = ' '.join(stage.command[1:])
+    return fingerprint
+
+
+def why_dirty(stage: Stage, record: Optional[Dict], fingerprint: Dict, now: float) -> Optional[str]:
+    """Grund, warum der Schritt laufen muss, oder None wenn er aktuell ist."""
+    if not record:
+        return 'noch nie gelaufen'
+    changed = [k for k, v in fingerprint.items() if record['fingerprint'].get(k) != v]
+    if changed:
+        return 'geändert: ' + ', '.join(k.split(':', 1)[-1] for k in changed[:3])
+    if stage.interval and now - record['finished'] >= stage.interval:
+        return f"Intervall ({stage.interval // HOUR} h) abgelaufen"
+    if stage.pending and stage.pending():
+        return 'offene Arbeit'
+    return None
+
+
+def run_pipeline(stages: List[Stage], force: Optional[List[str]] = None, dry_run: bool = False,
+                 state_path: Path = STATE_PATH, profile: bool = False) -> int:
+    state = load_state(state_path)
+    hasher = ContentHasher(state.get('files', {}))
+    force = set(force or [])
+    exit_code = 0
+
+    for stage in stages:
+        record = state['stages'].get(stage.name)
+        fingerprint = stage_fingerprint(stage, hasher)
+        reason = 'erzwungen' if stage.name in force or 'all' in force else \
+            why_dirty(stage, record, fingerprint, time.time())
+        if reason is None:
+            print(f"⏭️  {stage.name}: aktuell")
+            continue
+        print(f"🔄 {stage.name}: {reason}")
+        if dry_run:
+            continue
+
+        # --profile direkt hinter das Skript (vor evtl. Unterbefehle), nicht Teil des Fingerabdrucks
+        command = stage.command[:2] + ['--profile'] + stage.command[2:] if profile else stage.command
+        sys.stdout.flush()
+        start = time.perf_counter()
+        with profiling.stage(stage.name):
+            result = subprocess.run(command)
+        elapsed = time.perf_counter() - start
+        metrics.record_stage(stage.name, elapsed, result.returncode == 0)
+        if result.returncode != 0:
+            print(f"❌ {stage.name} fehlgeschlagen (Exit {result.returncode}, {elapsed:.1f}s)")
+            exit_code = 1
+            if stage.required:
+                print("⛔ Pflichtschritt fehlgeschlagen – Ablauf abgebrochen")
+                exit_code = 2
+                break
+            continue
+        # Nach dem Lauf neu hashen: Schritte, die ihre eigene Eingabe schreiben, gelten dann als aktuell
+        state['stages'][stage.name] = {'fingerprint': stage_fingerprint(stage, hasher), 'finished': time.time(),
+                                       'seconds': round(elapsed, 3)}
+        print(f"✅ {stage.name} ({elapsed:.1f}s)")
+
+    if not dry_run:
+        state['files'] = {**state.get('files', {}), **hasher.seen}
+        save_state(state, state_path)
+    return exit_code
+
+
+def main():
+    stages = default_stages()
+    names = [s.name for s in stages]
+    parser = argparse.ArgumentParser(description='Inkrementeller Update-Ablauf')
+    parser.add_argument('--force', nargs='*', default=[], metavar='SCHRITT',
+                        help=f"Schritte unabhängig vom Zustand ausführen ('all' oder: {', '.join(names)})")
+    parser.add_argument('--only', nargs='*', default=None, metavar='SCHRITT', help='Nur diese Schritte betrachten')
+    parser.add_argument('--dry-run', action='store_true', help='Nur anzeigen, welche Schritte laufen würden')
+    parser.add_argument('--profile', action='store_true',
+                        help='Jeden Schritt mit --profile starten (Profile je Skript unter logs/profile/)')
+    args = parser.parse_args()
+
+    unknown = [n for n in args.force + (args.only or []) if n not in names and n != 'all']
+    if unknown:
+        parser.error(f"Unbekannte Schritte: {', '.join(unknown)}")
+    if args.only is not None:
+        stages = [s for s in stages if s.name in args.only]
+
+    # Immer relativ zum Projektverzeichnis arbeiten (Cron startet woanders)
+    os.chdir(Path(__file__).resolve().parent)
+    metrics.enable('pipeline')
+    if args.profile:
+        profiling.enable('pipeline')
+    start = time.perf_counter()
+    print("🧭 PIPELINE")
+    print("=" * 50)
+    exit_code = run_pipeline(stages, args.force, args.dry_run, profile=args.profile)
+    print(f"⏱️  {(time.perf_counter() - start) * 1000:.0f} ms gesamt")
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
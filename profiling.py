@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Profiling für alle Einstiegspunkte (Option --profile)
+
+Aktiviert pro Prozess:
+  - cProfile → logs/profile/<job>_<zeit>.pstats (+ .txt mit den teuersten Funktionen)
+  - Stichproben des Haupt-Threads alle 5 ms → .collapsed (Format von flamegraph.pl/speedscope:
+    "modul:funktion;modul:funktion anzahl")
+  - tracemalloc-Spitze und Dauer je Schritt (metrics.stage / profiling.stage)
+  - Parse-Zeiten je Station (record_item), damit Ausreißer auffallen → _summary.json
+
+Ohne --profile kosten die Aufrufe in den Skripten nur eine None-Prüfung.
+"""
+
+import os
+import sys
+import time
+import json
+import atexit
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+PROFILE_DIR = os.environ.get('WVHMAP_PROFILE_DIR', os.path.join('logs', 'profile'))
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 40
+SLOWEST_ITEMS = 25
+
+
+class Profiler:
+    """cProfile + Stack-Stichproben + tracemalloc für einen Job."""
+
+    def __init__(self, job: str, interval: float = SAMPLE_INTERVAL):
+        self.job = job
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.stages: List[Dict] = []
+        self.items: Dict[str, List] = {}  # Art -> [(sekunden, bezeichnung), ...]
+        self.samples: Dict[str, int] = {}
+        # reset_peak() in einem Schritt löscht die Spitze umschließender Schritte → hier nachführen
+        self.max_peak = 0
+        self._open_peaks: List[int] = []
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._profile = None
+
+    def start(self):
+        import cProfile
+        import tracemalloc
+
+        tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample_loop, name='wvhmap-profiler', daemon=True)
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def _sample_loop(self):
+        own_file = __file__
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename != own_file:
+                    module = frame.f_globals.get('__name__') or '?'
+                    if module == '__main__':
+                        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                    stack.append(f"{module}:{code.co_name}".replace(' ', '_'))
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+
+    def summary(self) -> Dict:
+        import tracemalloc
+
+        items = {}
+        for kind, entries in self.items.items():
+            entries.sort(key=lambda e: -e[0])
+            total = sum(e[0] for e in entries)
+            items[kind] = {
+                'count': len(entries),
+                'total_s': round(total, 6),
+                'mean_ms': round(total / len(entries) * 1000, 3),
+                'p50_ms': round(entries[len(entries) // 2][0] * 1000, 3),
+                'slowest': [{'ms': round(s * 1000, 3), 'item': label} for s, label in entries[:SLOWEST_ITEMS]],
+            }
+        peak = max(tracemalloc.get_traced_memory()[1], self.max_peak) if tracemalloc.is_tracing() else None
+        return {
+            'job': self.job,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - self.started, 3),
+            'peak_memory_mb': round(peak / 1e6, 3) if peak is not None else None,
+            'stages': self.stages,
+            'items': items,
+            'samples': sum(self.samples.values()),
+        }
+
+    def write(self, directory: str = PROFILE_DIR) -> str:
+        """Schreibt alle Profil-Dateien und gibt das gemeinsame Präfix zurück."""
+        import io
+        import pstats
+
+        self.stop()
+        os.makedirs(directory, exist_ok=True)
+        prefix = os.path.join(directory, f"{self.job}_{datetime.now():%Y%m%d_%H%M%S}")
+
+        self._profile.dump_stats(prefix + '.pstats')
+        text = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=text)
+        stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        with open(prefix + '.txt', 'w', encoding='utf-8') as f:
+            f.write(text.getvalue())
+
+        with open(prefix + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        with open(prefix + '_summary.json', 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        return prefix
+
+
+_ACTIVE: Optional[Profiler] = None
+
+
+def add_argument(parser):
+    parser.add_argument('--profile', action='store_true',
+                        help=f'cProfile, Flamegraph-Stacks, Speicher je Schritt und Parse-Zeiten nach {PROFILE_DIR}/')
+
+
+def enable(job: str, directory: Optional[str] = None):
+    """Profiling für diesen Prozess starten; geschrieben wird beim Beenden.
+
+    Wie metrics.enable gewinnt der erste Aufruf (wvhmap.py/manual_update.py rufen die
+    Skripte im selben Prozess auf).
+    """
+    global _ACTIVE
+    if _ACTIVE is not None:
+        return
+    _ACTIVE = Profiler(job)
+    _ACTIVE.start()
+    atexit.register(_write_at_exit, directory or PROFILE_DIR)
+
+
+def active() -> bool:
+    return _ACTIVE is not None
+
+
+def _write_at_exit(directory: str):
+    try:
+        prefix = _ACTIVE.write(directory)
+        print(f"🔬 Profil: {prefix}.* (pstats, txt, collapsed, summary.json)", file=sys.stderr)
+    except OSError as e:
+        print(f"⚠️  Profil konnte nicht geschrieben werden: {e}", file=sys.stderr)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Dauer und tracemalloc-Spitze eines Schritts (nur bei aktivem Profiling)."""
+    if _ACTIVE is None:
+        yield
+        return
+    import tracemalloc
+
+    profiler = _ACTIVE
+    peak_so_far = tracemalloc.get_traced_memory()[1]
+    profiler.max_peak = max(profiler.max_peak, peak_so_far)
+    if profiler._open_peaks:
+        profiler._open_peaks[-1] = max(profiler._open_peaks[-1], peak_so_far)
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    profiler._open_peaks.append(0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, profiler._open_peaks.pop())
+        if profiler._open_peaks:
+            profiler._open_peaks[-1] = max(profiler._open_peaks[-1], peak)
+        profiler.max_peak = max(profiler.max_peak, peak)
+        profiler.stages.append({
+            'stage': name,
+            'seconds': round(time.perf_counter() - start, 3),
+            'peak_mb': round(peak / 1e6, 3),
+            'peak_above_start_mb': round((peak - before) / 1e6, 3),
+            'retained_mb': round((current - before) / 1e6, 3),
+        })
+
+
+def record_item(kind: str, label: str, seconds: float):
+    """Parse-Zeit eines einzelnen Eintrags (z.B. Station) festhalten."""
+    if _ACTIVE is not None:
+        _ACTIVE.items.setdefault(kind, []).append((seconds, label))
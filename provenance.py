@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Herkunft der Stationskoordinaten (station['coord_provenance'])
+
+    "coord_provenance": {"source": "nominatim", "precision": "locality", "updated": "2026-10-19T06:30:00"}
+
+Quellen und Genauigkeit:
+  kml            – Punkt aus der NABU-Karte (von Hand gesetzt)       → exact
+  nominatim      – frisch geocodiert (PLZ + Ort)                      → locality
+  cache          – Nominatim-Ergebnis aus data/geocode_cache.json      → locality
+  plz-centroid   – Zentrum des PLZ-Bereichs mit Raster-Versatz (Scraper) → region
+  hash-fallback  – Zentrum des PLZ-Bereichs mit md5-Streuung            → region
+
+Koordinaten werden nur durch gleich gute oder bessere ersetzt; der Zeitstempel ändert sich
+nur, wenn sich Koordinaten oder Quelle wirklich ändern (sonst wandert jede Station bei jedem
+Lauf durch Git und die Manifest-Deltas). Neu geocodiert werden nur ungenaue Einträge, die
+ältesten zuerst.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from station_utils import station_id
+
+FIELD = 'coord_provenance'
+
+PRECISION = {
+    'kml': 'exact',
+    'nominatim': 'locality',
+    'cache': 'locality',
+    'plz-centroid': 'region',
+    'hash-fallback': 'region',
+}
+PRECISION_RANK = {'region': 1, 'locality': 2, 'exact': 3}
+# Darunter gilt eine Koordinate als ungenau (Stationen ohne Herkunft: Rang 0)
+MIN_GOOD_RANK = PRECISION_RANK['locality']
+
+
+def get(station: Dict) -> Optional[Dict]:
+    value = station.get(FIELD)
+    return value if isinstance(value, dict) else None
+
+
+def precision_rank(station: Dict) -> int:
+    """Rang der vorhandenen Koordinaten (0 = keine oder unbekannte Herkunft)."""
+    if not station.get('latitude') or not station.get('longitude'):
+        return 0
+    info = get(station)
+    return PRECISION_RANK.get(info.get('precision'), 0) if info else 0
+
+
+def is_low_precision(station: Dict) -> bool:
+    return precision_rank(station) < MIN_GOOD_RANK
+
+
+def age_key(station: Dict) -> str:
+    """Sortierschlüssel 'älteste zuerst' (ohne Zeitstempel ganz vorne)."""
+    info = get(station)
+    return (info or {}).get('updated') or ''
+
+
+def regeocode_priority(station: Dict):
+    """Reihenfolge für Neu-Geocodierung: ungenaueste zuerst, bei gleicher Genauigkeit die ältesten."""
+    return precision_rank(station), age_key(station)
+
+
+def set_coordinates(station: Dict, lat: float, lon: float, source: str, force: bool = False) -> bool:
+    """Setzt Koordinaten samt Herkunft, wenn sie mindestens so genau sind wie die vorhandenen.
+
+    Rückgabe: True wenn die Station jetzt diese Koordinaten trägt.
+    """
+    precision = PRECISION[source]
+    if not force and PRECISION_RANK[precision] < precision_rank(station):
+        return False
+    info = get(station)
+    if (info and info.get('precision') == precision
+            and station.get('latitude') == lat and station.get('longitude') == lon):
+        # Gleicher Punkt, gleiche Genauigkeit (z.B. Cache-Treffer nach Nominatim): nichts ändern
+        return True
+    station['latitude'] = lat
+    station['longitude'] = lon
+    station[FIELD] = {
+        'source': source,
+        'precision': precision,
+        'updated': datetime.now().isoformat(timespec='seconds'),
+    }
+    return True
+
+
+def clear_coordinates(station: Dict) -> bool:
+    """Entfernt Koordinaten und Herkunft; True wenn etwas entfernt wurde."""
+    removed = False
+    for field in ('latitude', 'longitude', FIELD):
+        if field in station:
+            del station[field]
+            removed = True
+    return removed
+
+
+def carry_over(stations: List[Dict], previous: List[Dict]) -> int:
+    """Übernimmt Koordinaten aus dem letzten Stand, wenn sie mindestens so genau sind.
+
+    Scraper liefern immer nur PLZ-Näherungen; ohne diesen Schritt würde jeder Lauf die
+    geocodierten Koordinaten verwerfen. Zuordnung über station_utils.station_id.
+    Rückgabe: Anzahl übernommener Stationen.
+    """
+    known = {}
+    for old in previous:
+        if get(old) and old.get('latitude') and old.get('longitude'):
+            known.setdefault(station_id(old), old)
+    kept = 0
+    for station in stations:
+        old = known.get(station_id(station))
+        if old is None or precision_rank(old) < precision_rank(station):
+            continue
+        station['latitude'] = old['latitude']
+        station['longitude'] = old['longitude']
+        station[FIELD] = dict(old[FIELD])
+        kept += 1
+    return kept
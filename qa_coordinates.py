@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Qualitätsprüfung der Stations-Koordinaten (vektorisiert mit NumPy)
+Berechnet für jede Station die Entfernung zum Zentrum ihres PLZ-Gebiets und den
+Abstand zum nächsten Nachbarn. Markiert werden:
+  - mehrere Stationen auf (fast) denselben Koordinaten
+  - Koordinaten, die mehr als X km vom PLZ-Zentrum entfernt liegen
+  - reine Hash-Fallback-Koordinaten und Abweichungen vom Geocode-Cache
+  - Koordinaten deutlich außerhalb des angegebenen Landes (Grenzpolygone, boundaries.py)
+Die betroffenen Orte landen in einer Liste, die auto_update_cache.py --from-list
+gezielt neu geocodiert.
+"""
+
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from station_utils import STATIONS_PATH, load_stations, get_station_coords
+from spatial_index import EARTH_RADIUS_KM, to_unit_vectors, km_to_chord
+from fix_coordinates import get_plz_centroid, get_coordinates_for_plz
+from auto_update_cache import load_cache, extract_plz_city_country, create_cache_key
+import boundaries
+import profiling
+
+REPORT_PATH = Path('logs/qa_report.json')
+REGEOCODE_PATH = Path('data/regeocode_list.json')
+
+# Erlaubte Entfernung zum PLZ-Zentrum je nach Genauigkeit des Zentrums (Faktor auf --max-km)
+LEVEL_FACTORS = {'plz': 1.0, 'plz3': 1.6, 'plz2': 3.0, 'region': 6.0}
+# Gründe, die eine erneute Geocodierung auslösen
+REGEOCODE_REASONS = ('far_from_plz', 'shared_coords', 'hash_fallback', 'cache_mismatch', 'wrong_country')
+
+
+def haversine_km_vec(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Haversine für ganze Arrays (gleiche Formel wie calculateDistance in map.js)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(np.clip(1 - a, 0.0, None)))
+
+
+class PlzCentroids:
+    """Empirische PLZ-Zentren aus dem Geocode-Cache (PLZ, 3- und 2-stelliger Präfix).
+
+    Summen und Anzahlen werden je Präfix gehalten, damit der eigene Cache-Eintrag einer
+    Station herausgerechnet werden kann (sonst läge jede Station genau auf "ihrem" Zentrum).
+    Ohne Cache-Daten wird auf die groben Regionszentren aus fix_coordinates.py zurückgegriffen.
+    """
+
+    def __init__(self, cache: Dict):
+        self.sums: Dict[Tuple[str, str], List[float]] = {}
+        for key, value in cache.items():
+            parts = key.split('|')
+            if len(parts) != 3 or not isinstance(value, list) or len(value) != 2 or None in value:
+                continue
+            plz, _, country = parts
+            for prefix in (plz, plz[:3], plz[:2]):
+                entry = self.sums.setdefault((country, prefix), [0.0, 0.0, 0])
+                entry[0] += value[0]
+                entry[1] += value[1]
+                entry[2] += 1
+
+    def lookup(self, plz: str, country: str, own: Optional[List[float]] = None) -> Tuple[Optional[Tuple[float, float]], str]:
+        country = country.lower()
+        for level, prefix in (('plz', plz), ('plz3', plz[:3]), ('plz2', plz[:2])):
+            entry = self.sums.get((country, prefix))
+            if not entry:
+                continue
+            lat_sum, lon_sum, count = entry
+            if own is not None:
+                lat_sum, lon_sum, count = lat_sum - own[0], lon_sum - own[1], count - 1
+            if count > 0:
+                return (lat_sum / count, lon_sum / count), level
+        base = get_plz_centroid(plz, country)
+        return (base, 'region') if base else (None, 'none')
+
+
+def _cell_keys(cells: np.ndarray) -> np.ndarray:
+    # Drei Zellkoordinaten (je < 2^20) in einen int64-Schlüssel packen
+    shifted = cells + (1 << 20)
+    return (shifted[:, 0] << 42) | (shifted[:, 1] << 21) | shifted[:, 2]
+
+
+def neighbour_stats(lat: np.ndarray, lon: np.ndarray, radius_km: float, same_km: float,
+                    groups: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Abstand zum nächsten Nachbarn (bis radius_km, sonst inf) und Anzahl Nachbarn <= same_km.
+
+    Nachbarn mit gleicher Gruppe (gleicher Cache-Schlüssel PLZ|Ort|Land) zählen nicht als
+    "gleiche Koordinaten" – sie haben zwangsläufig denselben Geocode.
+
+    Die Einheitsvektoren werden in ein 3D-Raster mit Kantenlänge = Sehne(radius_km)
+    einsortiert; verglichen werden nur Punktpaare aus benachbarten Zellen. Alle Paare
+    einer Nachbarzellen-Richtung werden auf einmal als Index-Arrays erzeugt.
+    """
+    n = len(lat)
+    nearest = np.full(n, np.inf)
+    same = np.zeros(n, dtype=np.int64)
+    if n < 2:
+        return nearest, same
+    vectors = to_unit_vectors(lat, lon)
+    cell_size = km_to_chord(radius_km)
+    cells = np.floor(vectors / cell_size).astype(np.int64)
+    keys = _cell_keys(cells)
+    order = np.argsort(keys, kind='stable')
+    unique_keys, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    chord_radius = cell_size
+    chord_same = km_to_chord(same_km)
+    point_ids = np.arange(n)
+
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                target = _cell_keys(cells + np.array([dx, dy, dz], dtype=np.int64))
+                pos = np.searchsorted(unique_keys, target)
+                pos = np.minimum(pos, len(unique_keys) - 1)
+                hit = unique_keys[pos] == target
+                sizes = np.where(hit, counts[pos], 0)
+                total = int(sizes.sum())
+                if not total:
+                    continue
+                left = np.repeat(point_ids, sizes)
+                offsets = np.arange(total) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+                right = order[np.repeat(starts[pos], sizes) + offsets]
+                keep = left != right
+                left, right = left[keep], right[keep]
+                dist = np.linalg.norm(vectors[left] - vectors[right], axis=1)
+                close = dist <= chord_radius
+                np.minimum.at(nearest, left[close], dist[close])
+                shared = dist <= chord_same
+                if groups is not None:
+                    shared &= (groups[left] != groups[right]) | (groups[left] < 0)
+                np.add.at(same, left[shared], 1)
+
+    finite = np.isfinite(nearest)
+    nearest[finite] = 2.0 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, nearest[finite] / 2.0))
+    return nearest, same
+
+
+def run_qa(stations: List[Dict], cache: Dict, max_km: float = 25.0, neighbour_km: float = 2.0,
+           same_m: float = 25.0) -> Dict:
+    """Prüft alle Stationen und gibt {'summary', 'stations', 'regeocode'} zurück."""
+    n = len(stations)
+    lat = np.full(n, np.nan)
+    lon = np.full(n, np.nan)
+    c_lat = np.full(n, np.nan)
+    c_lon = np.full(n, np.nan)
+    limit = np.full(n, np.inf)
+    cache_lat = np.full(n, np.nan)
+    cache_lon = np.full(n, np.nan)
+    fallback = np.zeros(n, dtype=bool)
+    groups = np.full(n, -1, dtype=np.int64)
+    group_ids: Dict[str, int] = {}
+    levels: List[str] = ['none'] * n
+    locations: List[Optional[Tuple[str, str, str]]] = [None] * n
+    centroids = PlzCentroids(cache)
+    fallbacks: Dict[Tuple[str, str], Tuple[Optional[float], Optional[float]]] = {}
+
+    # Nachschlagen je Station (Dict-Zugriffe), die Rechnerei danach komplett vektorisiert
+    for i, station in enumerate(stations):
+        coords = get_station_coords(station)
+        if coords:
+            lat[i], lon[i] = coords
+        plz = str(station.get('plz') or '')
+        country = station.get('country') or 'Deutschland'
+        location = extract_plz_city_country(station)
+        locations[i] = location
+        own = None
+        if location:
+            key = create_cache_key(*location)
+            groups[i] = group_ids.setdefault(key, len(group_ids))
+            value = cache.get(key)
+            if isinstance(value, list) and len(value) == 2 and None not in value:
+                own = value
+                cache_lat[i], cache_lon[i] = value
+            plz = plz or location[0]
+        if not plz:
+            continue
+        centre, level = centroids.lookup(plz, country, own)
+        levels[i] = level
+        if centre:
+            c_lat[i], c_lon[i] = centre
+            limit[i] = max_km * LEVEL_FACTORS[level]
+        if coords:
+            fb = fallbacks.get((plz, country))
+            if fb is None:
+                fb = fallbacks[(plz, country)] = get_coordinates_for_plz(plz, country)
+            fb_lat, fb_lon = fb
+            fallback[i] = fb_lat is not None and round(coords[0], 4) == fb_lat and round(coords[1], 4) == fb_lon
+
+    has_coords = ~np.isnan(lat)
+    plz_dist = haversine_km_vec(lat, lon, c_lat, c_lon)
+    cache_dist = haversine_km_vec(lat, lon, cache_lat, cache_lon)
+    nearest = np.full(n, np.inf)
+    same = np.zeros(n, dtype=np.int64)
+    idx = np.flatnonzero(has_coords)
+    nearest[idx], same[idx] = neighbour_stats(lat[idx], lon[idx], neighbour_km, same_m / 1000.0,
+                                              groups[idx])
+
+    wrong_country = np.zeros(n, dtype=bool)
+    index = boundaries.get_index()
+    if index is not None:
+        countries = [s.get('country') or 'Deutschland' for s in stations]
+        wrong_country = index.wrong_country_many(lat, lon, countries)
+
+    flags = {
+        'missing_coords': ~has_coords,
+        'far_from_plz': has_coords & (plz_dist > limit),
+        'shared_coords': same > 0,
+        'hash_fallback': fallback,
+        'cache_mismatch': has_coords & (cache_dist > 1.0),
+        'wrong_country': wrong_country,
+    }
+
+    flagged = []
+    regeocode: Dict[str, Dict] = {}
+    any_flag = np.zeros(n, dtype=bool)
+    for mask in flags.values():
+        any_flag |= mask
+    for i in np.flatnonzero(any_flag):
+        reasons = [name for name, mask in flags.items() if mask[i]]
+        station = stations[i]
+        flagged.append({
+            'name': station.get('name', ''),
+            'plz': station.get('plz', ''),
+            'country': station.get('country', ''),
+            'latitude': None if np.isnan(lat[i]) else float(lat[i]),
+            'longitude': None if np.isnan(lon[i]) else float(lon[i]),
+            'reasons': reasons,
+            'plz_km': None if np.isnan(plz_dist[i]) else round(float(plz_dist[i]), 2),
+            'plz_level': levels[i],
+            'nearest_km': None if not np.isfinite(nearest[i]) else round(float(nearest[i]), 3),
+            'shared_with': int(same[i]),
+        })
+        location = locations[i]
+        if location and any(r in REGEOCODE_REASONS for r in reasons):
+            key = create_cache_key(*location)
+            entry = regeocode.setdefault(key, {'plz': location[0], 'city': location[1], 'country': location[2],
+                                               'key': key, 'reasons': [], 'stations': 0})
+            entry['stations'] += 1
+            entry['reasons'] = sorted(set(entry['reasons']) | set(reasons) & set(REGEOCODE_REASONS))
+
+    summary = {
+        'stations': n,
+        'with_coords': int(has_coords.sum()),
+        'flagged': len(flagged),
+        'counts': {name: int(mask.sum()) for name, mask in flags.items()},
+        'regeocode': len(regeocode),
+        'max_km': max_km,
+        'same_m': same_m,
+        'median_plz_km': round(float(np.nanmedian(plz_dist)), 2) if np.isfinite(plz_dist).any() else None,
+    }
+    return {'summary': summary, 'stations': flagged, 'regeocode': sorted(regeocode.values(), key=lambda e: e['key'])}
+
+
+def synthetic_stations(n: int, seed: int = 42) -> Tuple[List[Dict], Dict]:
+    """Zufällige Stationen in Deutschland inkl. Cache (für Laufzeitmessungen).
+
+    Stationen liegen gestreut um ein Zentrum je 2-stelligem PLZ-Präfix; 1 % sind
+    Ausreißer irgendwo im Land, 2 % teilen sich gerundete Koordinaten.
+    """
+    rng = np.random.default_rng(seed)
+    plz = rng.integers(1000, 99999, n)
+    centre_lat = rng.uniform(47.5, 54.5, 100)
+    centre_lon = rng.uniform(6.5, 14.5, 100)
+    lat = centre_lat[plz // 1000] + rng.normal(0, 0.1, n)
+    lon = centre_lon[plz // 1000] + rng.normal(0, 0.15, n)
+    outlier = rng.random(n) < 0.01
+    lat[outlier] = rng.uniform(47.3, 54.9, int(outlier.sum()))
+    lon[outlier] = rng.uniform(6.0, 15.0, int(outlier.sum()))
+    dup = rng.random(n) < 0.02
+    lat[dup] = np.round(lat[dup], 1)
+    lon[dup] = np.round(lon[dup], 1)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    stations, cache = [], {}
+    for i in range(n):
+        code = f"{plz[i]:05d}"
+        city = 'Ort ' + letters[plz[i] % 26] + letters[plz[i] // 26 % 26] + letters[plz[i] // 676 % 26]
+        # Wie im echten Datenbestand: Stationen mit gleicher PLZ/Ort erhalten den Cache-Wert
+        coords = cache.setdefault(f"{code}|{city.lower()}|deutschland", [float(lat[i]), float(lon[i])])
+        stations.append({'name': f"Station {i}", 'address': f"Weg {i}, {code} {city}", 'plz': code,
+                         'country': 'Deutschland', 'latitude': coords[0], 'longitude': coords[1]})
+    return stations, cache
+
+
+def write_json(path: Path, data: Dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+    tmp_path.replace(path)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Koordinaten-QA: Dubletten und Ausreißer finden')
+    parser.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    parser.add_argument('--max-km', type=float, default=25.0,
+                        help='Erlaubte Entfernung zum PLZ-Zentrum in km (Standard: 25, gröbere Zentren mehr)')
+    parser.add_argument('--same-m', type=float, default=25.0,
+                        help='Abstand in Metern, ab dem Koordinaten als gleich gelten (Standard: 25)')
+    parser.add_argument('--neighbour-km', type=float, default=2.0,
+                        help='Suchradius für den nächsten Nachbarn in km (Standard: 2)')
+    parser.add_argument('--report', type=Path, default=REPORT_PATH, help='Ausgabe des Prüfberichts')
+    parser.add_argument('--list', type=Path, default=REGEOCODE_PATH, help='Ausgabe der Neu-Geocodier-Liste')
+    parser.add_argument('--synthetic', type=int, default=0, help='N zufällige Stationen prüfen (Laufzeittest)')
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('qa_coordinates')
+
+    print("🧪 KOORDINATEN-QA")
+    print("=" * 50)
+    if args.synthetic:
+        stations, cache = synthetic_stations(args.synthetic)
+    else:
+        stations, cache = load_stations(args.input), load_cache()
+    if not stations:
+        return 1
+
+    start = time.perf_counter()
+    result = run_qa(stations, cache, args.max_km, args.neighbour_km, args.same_m)
+    elapsed = time.perf_counter() - start
+    summary = result['summary']
+    counts = summary['counts']
+
+    print(f"✅ {summary['stations']} Stationen geprüft in {elapsed * 1000:.0f} ms "
+          f"({summary['with_coords']} mit Koordinaten)")
+    print(f"   📍 {counts['missing_coords']} ohne Koordinaten")
+    print(f"   🧭 {counts['far_from_plz']} weiter als erlaubt vom PLZ-Zentrum (Median {summary['median_plz_km']} km)")
+    print(f"   👥 {counts['shared_coords']} teilen sich Koordinaten (<= {args.same_m:.0f} m)")
+    print(f"   🎲 {counts['hash_fallback']} Hash-Fallback | ⚠️  {counts['cache_mismatch']} weichen vom Cache ab")
+    print(f"   🌐 {counts['wrong_country']} liegen außerhalb ihres Landes")
+    print(f"   🔁 {summary['regeocode']} Orte zur erneuten Geocodierung")
+
+    if args.synthetic:
+        return 0
+    write_json(args.report, {'generated': datetime.now().isoformat(timespec='seconds'),
+                             'summary': summary, 'stations': result['stations']})
+    write_json(args.list, {'generated': datetime.now().isoformat(timespec='seconds'),
+                           'entries': result['regeocode']})
+    print(f"   💾 {args.report} | {args.list}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Kleiner asyncio-HTTP-Dienst für Abfragen über die Stationsdaten
+Lädt wildvogelhilfen.json in einen räumlichen Index (spatial_index.py) und einen
+Suchindex (build_search_index.py) und beantwortet:
+
+    GET /nearest?lat=52.52&lon=13.40&k=5
+    GET /bbox?south=50&west=9&north=52&east=12
+    GET /search?q=wildvogel+jena&limit=25
+    GET /health
+
+Antworten werden pro Datenversion im Speicher gecacht und tragen ein ETag
+(If-None-Match → 304). Wird die Datendatei ersetzt (z.B. durch die Pipeline), baut
+der Dienst die Indizes im Hintergrund neu und tauscht sie dann in einem Schritt aus –
+laufende Anfragen arbeiten bis zum Ende mit dem alten Stand weiter.
+"""
+
+import sys
+import json
+import asyncio
+import hashlib
+import argparse
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from station_utils import STATIONS_PATH, assign_station_ids
+from spatial_index import SpatialIndex
+from build_search_index import build_search_index, search
+import profiling
+
+MAX_K = 50
+MAX_RESULTS = 500
+CACHE_SIZE = 2048
+MAX_HEADER_BYTES = 16384
+
+STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class DatasetState:
+    """Unveränderlicher Stand: Datenversion + Indizes. Wird bei Updates komplett ersetzt."""
+
+    def __init__(self, raw: bytes, file_key: Tuple):
+        stations = json.loads(raw.decode('utf-8'))
+        self.version = hashlib.sha256(raw).hexdigest()[:16]
+        self.file_key = file_key
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        self.spatial = SpatialIndex(stations)
+        self.search_index = build_search_index(stations)['index']
+        self.by_id = {sid: {'id': sid, **s} for sid, s in zip(assign_station_ids(stations), stations)}
+        self.station_count = len(stations)
+
+    @classmethod
+    def load(cls, path: Path) -> 'DatasetState':
+        st = path.stat()
+        return cls(path.read_bytes(), (st.st_ino, st.st_size, st.st_mtime_ns))
+
+
+class ResponseCache:
+    """LRU-Cache für fertige Antworten (Body + ETag), Schlüssel enthält die Datenversion."""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self.entries: 'OrderedDict[Tuple, Tuple[bytes, str]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Tuple[bytes, str]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Tuple, body: bytes) -> Tuple[bytes, str]:
+        etag = f'"{key[0]}-{hashlib.md5(body).hexdigest()[:12]}"'
+        self.entries[key] = (body, etag)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return body, etag
+
+    def drop_other_versions(self, version: str):
+        for key in [k for k in self.entries if k[0] != version]:
+            del self.entries[key]
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _error_body(message: str) -> bytes:
+    return json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+
+
+def _float_param(params: Dict, name: str, low: float, high: float) -> float:
+    try:
+        value = float(params[name][0])
+    except (KeyError, ValueError, IndexError):
+        raise BadRequest(f"Parameter '{name}' fehlt oder ist keine Zahl")
+    if not (low <= value <= high):
+        raise BadRequest(f"Parameter '{name}' außerhalb von [{low}, {high}]")
+    return value
+
+
+def _int_param(params: Dict, name: str, default: int, low: int, high: int) -> int:
+    if name not in params:
+        return default
+    try:
+        value = int(params[name][0])
+    except ValueError:
+        raise BadRequest(f"Parameter '{name}' ist keine Ganzzahl")
+    return max(low, min(high, value))
+
+
+class QueryService:
+    def __init__(self, data_path: Path = STATIONS_PATH, reload_interval: float = 5.0):
+        self.data_path = data_path
+        self.reload_interval = reload_interval
+        self.state: Optional[DatasetState] = None
+        self.cache = ResponseCache()
+        self.requests_total = 0
+        self.swaps = 0
+
+    # --- Daten laden / austauschen ---
+    async def load_initial(self):
+        self.state = await asyncio.to_thread(DatasetState.load, self.data_path)
+        print(f"✅ {self.state.station_count} Stationen geladen (Version {self.state.version})")
+
+    def _file_key(self) -> Optional[Tuple]:
+        try:
+            st = self.data_path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    async def watch_for_updates(self):
+        """Prüft periodisch, ob die Datendatei ersetzt wurde, und tauscht den Stand aus."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            key = self._file_key()
+            if key is None or (self.state and key == self.state.file_key):
+                continue
+            try:
+                new_state = await asyncio.to_thread(DatasetState.load, self.data_path)
+            except Exception as e:
+                # Halbe/ungültige Datei: alten Stand behalten, beim nächsten Durchlauf erneut versuchen
+                print(f"⚠️  Neuer Datenstand nicht ladbar, behalte {self.state.version if self.state else '-'}: {e}")
+                continue
+            if self.state and new_state.version == self.state.version:
+                self.state.file_key = new_state.file_key
+                continue
+            old_version = self.state.version if self.state else '-'
+            self.state = new_state  # atomarer Austausch der Referenz
+            self.cache.drop_other_versions(new_state.version)
+            self.swaps += 1
+            print(f"🔄 Datenstand gewechselt: {old_version} → {new_state.version} "
+                  f"({new_state.station_count} Stationen)")
+
+    # --- Endpunkte ---
+    def _nearest(self, state: DatasetState, params: Dict) -> Dict:
+        lat = _float_param(params, 'lat', -90, 90)
+        lon = _float_param(params, 'lon', -180, 180)
+        k = _int_param(params, 'k', 5, 1, MAX_K)
+        hits = state.spatial.nearest(lat, lon, k)
+        return {'results': [{'distance_km': round(d, 3), **s} for d, s in hits]}
+
+    def _bbox(self, state: DatasetState, params: Dict) -> Dict:
+        south = _float_param(params, 'south', -90, 90)
+        north = _float_param(params, 'north', -90, 90)
+        west = _float_param(params, 'west', -180, 180)
+        east = _float_param(params, 'east', -180, 180)
+        if south > north or west > east:
+            raise BadRequest('Ungültige Box (south ≤ north und west ≤ east erwartet)')
+        limit = _int_param(params, 'limit', MAX_RESULTS, 1, MAX_RESULTS)
+        stations = state.spatial.bbox(south, west, north, east)
+        return {'total': len(stations), 'results': stations[:limit]}
+
+    def _search(self, state: DatasetState, params: Dict) -> Dict:
+        query = (params.get('q') or [''])[0].strip()
+        if not query:
+            raise BadRequest("Parameter 'q' fehlt")
+        limit = _int_param(params, 'limit', 25, 1, MAX_RESULTS)
+        ids = search(state.search_index, query, limit)
+        return {'results': [state.by_id[sid] for sid in ids if sid in state.by_id]}
+
+    def _health(self, state: DatasetState, _params: Dict) -> Dict:
+        return {'status': 'ok', 'version': state.version, 'stations': state.station_count,
+                'loaded_at': state.loaded_at, 'swaps': self.swaps, 'requests': self.requests_total,
+                'cache': {'entries': len(self.cache.entries), 'hits': self.cache.hits, 'misses': self.cache.misses}}
+
+    ROUTES = {'/nearest': '_nearest', '/bbox': '_bbox', '/search': '_search', '/health': '_health'}
+
+    def handle(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, bytes, Dict[str, str]]:
+        """Beantwortet eine Anfrage synchron (alle Indizes liegen im Speicher)."""
+        self.requests_total += 1
+        state = self.state  # eine Referenz für die gesamte Anfrage
+        if state is None:
+            return 503, _error_body('Daten werden geladen'), {}
+        if method not in ('GET', 'HEAD'):
+            return 405, _error_body('Nur GET'), {'Allow': 'GET, HEAD'}
+
+        parts = urlsplit(target)
+        route = self.ROUTES.get(parts.path.rstrip('/') or '/')
+        if route is None:
+            return 404, _error_body('Unbekannter Pfad'), {}
+        params = parse_qs(parts.query)
+
+        if route == '_health':
+            body = json.dumps(self._health(state, params), ensure_ascii=False).encode('utf-8')
+            return 200, body, {'Cache-Control': 'no-store'}
+
+        cache_key = (state.version, parts.path, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            try:
+                payload = getattr(self, route)(state, params)
+            except BadRequest as e:
+                return 400, _error_body(str(e)), {}
+            payload['version'] = state.version
+            cached = self.cache.put(cache_key, json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        body, etag = cached
+        extra = {'ETag': etag, 'Cache-Control': 'public, max-age=60'}
+        if headers.get('if-none-match') == etag:
+            return 304, b'', extra
+        return 200, body, extra
+
+    # --- HTTP/1.1 ---
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionResetError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 400, _error_body('Header zu groß'), {}, False, 'GET')
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await self._write(writer, 400, _error_body('Ungültige Anfrage'), {}, False, 'GET')
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                length = headers.get('content-length', '0') or '0'
+                if not (length.isascii() and length.isdigit()):
+                    await self._write(writer, 400, _error_body('Ungültige Anfrage'), {}, False, 'GET')
+                    break
+                if int(length):
+                    try:
+                        await reader.readexactly(int(length))
+                    except (asyncio.IncompleteReadError, ConnectionResetError):
+                        break
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                try:
+                    status, body, extra = self.handle(method, target, headers)
+                except Exception as e:
+                    print(f"❌ Fehler bei {target}: {e}")
+                    status, body, extra = 500, _error_body('Interner Fehler'), {}
+                await self._write(writer, status, body, extra, keep_alive, method)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _write(self, writer: asyncio.StreamWriter, status: int, body: bytes, extra: Dict[str, str],
+                     keep_alive: bool, method: str):
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                'Content-Type: application/json; charset=utf-8',
+                f"Content-Length: {len(body)}",
+                'Access-Control-Allow-Origin: *',
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head.extend(f"{k}: {v}" for k, v in extra.items())
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+        if method != 'HEAD':
+            writer.write(body)
+        await writer.drain()
+
+
+async def serve(host: str, port: int, data_path: Path, reload_interval: float):
+    service = QueryService(data_path, reload_interval)
+    await service.load_initial()
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    watcher = asyncio.create_task(service.watch_for_updates())
+    print(f"🌐 Query-Service läuft auf http://{host}:{port} (/nearest, /bbox, /search, /health)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokaler Abfrage-Dienst (nearest / bbox / search)')
+    parser.add_argument('--host', default='127.0.0.1', help='Adresse (Standard: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (Standard: 8765)')
+    parser.add_argument('--data', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    parser.add_argument('--reload-interval', type=float, default=5.0,
+                        help='Sekunden zwischen Prüfungen auf neue Daten (Standard: 5)')
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable('query_service')
+
+    print("🦅 WILDVOGELHILFE QUERY-SERVICE")
+    print("=" * 50)
+    try:
+        asyncio.run(serve(args.host, args.port, args.data, args.reload_interval))
+    except KeyboardInterrupt:
+        print("\n⏹️  Beendet durch Benutzer")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,13 +2,20 @@
 """
 Script zum Entfernen der groben Koordinaten aus wildvogelhilfen.json
 Damit fix_coordinates.py die exakten Koordinaten aus dem Cache einfügen kann.
+
+Entfernt werden nur ungenaue Koordinaten (PLZ-Näherungen oder unbekannte Herkunft, siehe
+provenance.py); KML- und Nominatim-Koordinaten bleiben. --all entfernt alle.
 """
 
 import json
+import argparse
 from pathlib import Path
 
-def remove_rough_coordinates():
-    """Entfernt die groben Koordinaten aus allen Stationen"""
+import profiling
+import provenance
+
+def remove_rough_coordinates(remove_all: bool = False):
+    """Entfernt die groben Koordinaten (mit remove_all: alle Koordinaten)"""
     
     stations_path = Path('data/wildvogelhilfen.json')
     if not stations_path.exists():
@@ -26,19 +33,12 @@ def remove_rough_coordinates():
         
         # Koordinaten entfernen
         removed_count = 0
+        kept_count = 0
         for station in stations:
-            had_coords = False
-            
-            # Latitude und Longitude entfernen falls vorhanden
-            if 'latitude' in station:
-                del station['latitude']
-                had_coords = True
-            
-            if 'longitude' in station:
-                del station['longitude']
-                had_coords = True
-            
-            if had_coords:
+            if not remove_all and not provenance.is_low_precision(station):
+                kept_count += 1
+                continue
+            if provenance.clear_coordinates(station):
                 removed_count += 1
         
         # Zurück speichern
@@ -46,6 +46,8 @@ def remove_rough_coordinates():
             json.dump(stations, f, ensure_ascii=False, indent=2)
         
         print(f"✅ Koordinaten von {removed_count} Stationen entfernt")
+        if kept_count:
+            print(f"📌 {kept_count} genaue Koordinaten behalten (KML/Nominatim)")
         print(f"💾 Datei gespeichert: {stations_path}")
         
         return True
@@ -55,10 +57,17 @@ def remove_rough_coordinates():
         return False
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Grobe Koordinaten entfernen')
+    parser.add_argument('--all', action='store_true', help='Auch genaue Koordinaten entfernen')
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable('remove_coordinates')
+
     print("🗺️  KOORDINATEN-BEREINIGUNG")
     print("=" * 50)
     
-    if remove_rough_coordinates():
+    if remove_rough_coordinates(args.all):
         print("\n🎉 Bereinigung abgeschlossen!")
         print("   Führen Sie jetzt 'python3 fix_coordinates.py --geocode' aus")
         print("   um die exakten Koordinaten aus dem Cache einzufügen.")
@@ -6,42 +6,56 @@ Scannt die NABU Google Maps Karte für Wildvogelhilfen
 Verwendet KML-Export und Google Maps API Aufrufe
 """
 
-import requests
 import json
 import time
 import re
 import logging
+import argparse
 from datetime import datetime
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from bs4 import BeautifulSoup
 import xml.etree.ElementTree as ET
 from urllib.parse import parse_qs, urlparse
 
-# Logging konfigurieren
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper_nabu.log'),
-        logging.StreamHandler()
-    ]
-)
+import boundaries
+import http_client
+import log_setup
+import metrics
+import profiling
+import provenance
+
 logger = logging.getLogger(__name__)
 
+# Google-My-Maps-Karten mit Wildvogelhilfen (weitere Karten-IDs einfach ergänzen)
+NABU_MAP_IDS = ['1FtYeDfRtJF_nUIuBt0WQkRnIRM4']
+
+
+def kml_url(map_id: str) -> str:
+    return f"https://www.google.com/maps/d/kml?mid={map_id}"
+
+
+def parse_kml_point(coordinates: str) -> Optional[Tuple[float, float]]:
+    """'lon,lat[,alt]' (erster Punkt) -> (lat, lon) oder None."""
+    try:
+        lon, lat = (float(v) for v in coordinates.split()[0].split(',')[:2])
+    except (IndexError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0):
+        return None
+    return round(lat, 6), round(lon, 6)
+
+
 class NABUGoogleMapsScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.session = http_client.create_session()
         self.data = []
         self.existing_data = []
         self.json_file = 'data/wildvogelhilfen.json'
         
         # Google Maps URL und KML-Export URLs
-        self.maps_url = "https://www.google.com/maps/d/viewer?mid=1FtYeDfRtJF_nUIuBt0WQkRnIRM4&femb=1&ll=51.099256809569006%2C10.42040625&z=6"
-        self.kml_url = "https://www.google.com/maps/d/kml?mid=1FtYeDfRtJF_nUIuBt0WQkRnIRM4"
+        self.maps_url = f"https://www.google.com/maps/d/viewer?mid={NABU_MAP_IDS[0]}&femb=1&ll=51.099256809569006%2C10.42040625&z=6"
+        self.kml_url = kml_url(NABU_MAP_IDS[0])
         
     def load_existing_data(self):
         """Lädt die bestehenden Daten aus der JSON-Datei"""
@@ -49,11 +63,11 @@ class NABUGoogleMapsScraper:
             if os.path.exists(self.json_file):
                 with open(self.json_file, 'r', encoding='utf-8') as f:
                     self.existing_data = json.load(f)
-                logger.info(f"Bestehende Daten geladen: {len(self.existing_data)} Einträge")
+                logger.info("Bestehende Daten geladen: %s Einträge", len(self.existing_data))
             else:
-                logger.warning(f"JSON-Datei {self.json_file} nicht gefunden")
+                logger.warning("JSON-Datei %s nicht gefunden", self.json_file)
         except Exception as e:
-            logger.error(f"Fehler beim Laden der bestehenden Daten: {e}")
+            logger.error("Fehler beim Laden der bestehenden Daten: %s", e)
             
     def is_duplicate(self, name: str, address: str) -> bool:
         """Prüft ob ein Eintrag bereits existiert"""
@@ -168,7 +182,7 @@ class NABUGoogleMapsScraper:
         """Versucht KML-Daten von der Google Maps Karte zu laden"""
         try:
             logger.info("Versuche KML-Daten zu laden...")
-            response = self.session.get(self.kml_url, timeout=30)
+            response = self.session.get(self.kml_url)
             
             if response.status_code == 200:
                 # Parse KML XML
@@ -176,12 +190,12 @@ class NABUGoogleMapsScraper:
                     root = ET.fromstring(response.content)
                     self.parse_kml_data(root)
                 except ET.ParseError as e:
-                    logger.error(f"Fehler beim Parsen der KML-Daten: {e}")
+                    logger.error("Fehler beim Parsen der KML-Daten: %s", e)
             else:
-                logger.warning(f"KML-URL nicht erreichbar: {response.status_code}")
+                logger.warning("KML-URL nicht erreichbar: %s", response.status_code)
                 
         except Exception as e:
-            logger.error(f"Fehler beim Laden der KML-Daten: {e}")
+            logger.error("Fehler beim Laden der KML-Daten: %s", e)
             
     def parse_kml_data(self, root):
         """Parst KML-XML-Daten und extrahiert Wildvogelhilfe-Informationen"""
@@ -193,7 +207,9 @@ class NABUGoogleMapsScraper:
         
         # Suche nach Placemark-Elementen
         placemarks = root.findall('.//kml:Placemark', namespaces)
-        logger.info(f"Gefunden: {len(placemarks)} Placemarks in KML")
+        logger.info("Gefunden: %s Placemarks in KML", len(placemarks))
+        parse_start = time.perf_counter()
+        parsed = 0
         
         for placemark in placemarks:
             try:
@@ -205,18 +221,30 @@ class NABUGoogleMapsScraper:
                 desc_elem = placemark.find('kml:description', namespaces)
                 description = desc_elem.text if desc_elem is not None else ""
                 
-                # Koordinaten extrahieren (werden später durch fix_coordinates.py ersetzt)
+                # Koordinaten des Kartenpunkts (lon,lat[,alt]); von Hand gesetzt → genauer als Geocoding
                 coordinates_elem = placemark.find('.//kml:coordinates', namespaces)
                 coordinates = coordinates_elem.text if coordinates_elem is not None else ""
                 
                 if name and description:
+                    item_start = time.perf_counter()
                     entry = self.parse_kml_description(name, description)
+                    profiling.record_item('nabu_kml', name, time.perf_counter() - item_start)
+                    if entry:
+                        parsed += 1
+                        point = parse_kml_point(coordinates)
+                        if point:
+                            provenance.set_coordinates(entry, point[0], point[1], 'kml')
+                            # Land/Bundesland aus dem Kartenpunkt statt aus Stichwörtern der Adresse
+                            index = boundaries.get_index()
+                            if index:
+                                boundaries.apply_region(entry, index.locate(point[0], point[1]))
                     if entry and not self.is_duplicate(entry['name'], entry['address']):
                         self.data.append(entry)
-                        logger.info(f"KML-Eintrag hinzugefügt: {entry['name']}")
+                        logger.debug("KML-Eintrag hinzugefügt: %s", entry['name'])
                         
             except Exception as e:
-                logger.warning(f"Fehler beim Parsen eines Placemarks: {e}")
+                logger.warning("Fehler beim Parsen eines Placemarks: %s", e)
+        metrics.record_parsed('nabu_kml', parsed, time.perf_counter() - parse_start)
                 
     def parse_kml_description(self, name: str, description: str) -> Optional[Dict]:
         """Parst die KML-Beschreibung und erstellt einen JSON-Eintrag"""
@@ -338,7 +366,7 @@ class NABUGoogleMapsScraper:
         """Versucht Daten direkt von der Google Maps Seite zu extrahieren"""
         try:
             logger.info("Versuche direkte Extraktion von der Maps-Seite...")
-            response = self.session.get(self.maps_url, timeout=30)
+            response = self.session.get(self.maps_url)
             
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')
@@ -351,10 +379,10 @@ class NABUGoogleMapsScraper:
                         break
                         
             else:
-                logger.warning(f"Maps-Seite nicht erreichbar: {response.status_code}")
+                logger.warning("Maps-Seite nicht erreichbar: %s", response.status_code)
                 
         except Exception as e:
-            logger.error(f"Fehler beim Scrapen der Maps-Seite: {e}")
+            logger.error("Fehler beim Scrapen der Maps-Seite: %s", e)
             
     def extract_from_page_data(self, script_content: str):
         """Extrahiert Daten aus JavaScript _pageData Variable"""
@@ -370,11 +398,11 @@ class NABUGoogleMapsScraper:
             for pattern in patterns:
                 matches = re.findall(pattern, script_content, re.IGNORECASE | re.DOTALL)
                 all_matches.extend(matches)
-                logger.info(f"Pattern {pattern[:30]}... fand {len(matches)} Treffer")
+                logger.debug("Pattern %s... fand %s Treffer", pattern[:30], len(matches))
             
             # Entferne Duplikate
             unique_matches = list(set(all_matches))
-            logger.info(f"Gefunden: {len(unique_matches)} eindeutige Einträge in den Kartendaten")
+            logger.info("Gefunden: %s eindeutige Einträge in den Kartendaten", len(unique_matches))
             
             # Zusätzliche Suche nach JavaScript-Arrays mit Wildvogel-Daten
             if not unique_matches:
@@ -386,7 +414,7 @@ class NABUGoogleMapsScraper:
                     if len(match) > 50:  # Nur längere Beschreibungen
                         unique_matches.append(match)
                         
-                logger.info(f"Zusätzlich gefunden: {len(wildvogel_matches)} Wildvogel-bezogene Strings")
+                logger.info("Zusätzlich gefunden: %s Wildvogel-bezogene Strings", len(wildvogel_matches))
             
             for match in unique_matches:
                 # Escape-Sequenzen richtig auflösen
@@ -398,10 +426,10 @@ class NABUGoogleMapsScraper:
                     entry = self.parse_description_text(description)
                     if entry and not self.is_duplicate(entry['name'], entry['address']):
                         self.data.append(entry)
-                        logger.info(f"Neuer Eintrag aus Kartendaten: {entry['name']}")
+                        logger.debug("Neuer Eintrag aus Kartendaten: %s", entry['name'])
                         
         except Exception as e:
-            logger.warning(f"Fehler beim Extrahieren von PageData: {e}")
+            logger.warning("Fehler beim Extrahieren von PageData: %s", e)
             
         # Debug: Zeige auch rohe Daten an
         if not self.data:
@@ -409,9 +437,9 @@ class NABUGoogleMapsScraper:
             # Suche nach allen Arrays die Adressen oder Telefonnummern enthalten könnten
             debug_pattern = r'\[([^\[\]]*(?:\d{4,5}|Tel|Fon|Mobile)[^\[\]]*)\]'
             debug_matches = re.findall(debug_pattern, script_content)
-            logger.info(f"Debug: Gefunden {len(debug_matches)} Arrays mit Adressen/Telefon")
+            logger.info("Debug: Gefunden %s Arrays mit Adressen/Telefon", len(debug_matches))
             for i, match in enumerate(debug_matches[:5]):  # Zeige nur erste 5
-                logger.info(f"Debug {i+1}: {match[:100]}...")
+                logger.debug("Debug %s: %s...", i+1, match[:100])
             
     def parse_description_text(self, description: str) -> Optional[Dict]:
         """Parst Beschreibungstext und erstellt JSON-Eintrag"""
@@ -617,15 +645,15 @@ class NABUGoogleMapsScraper:
         if os.path.exists(self.json_file):
             backup_file = f"{self.json_file}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             os.rename(self.json_file, backup_file)
-            logger.info(f"Backup erstellt: {backup_file}")
+            logger.info("Backup erstellt: %s", backup_file)
             
         # Speichere kombinierte Daten
         try:
             with open(self.json_file, 'w', encoding='utf-8') as f:
                 json.dump(combined_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Daten gespeichert: {len(self.data)} neue Einträge, {len(combined_data)} total")
+            logger.info("Daten gespeichert: %s neue Einträge, %s total", len(self.data), len(combined_data))
         except Exception as e:
-            logger.error(f"Fehler beim Speichern: {e}")
+            logger.error("Fehler beim Speichern: %s", e)
             
     def run(self):
         """Hauptmethode zum Ausführen des Scrapers"""
@@ -642,14 +670,23 @@ class NABUGoogleMapsScraper:
         
         if self.data:
             self.save_data()
-            logger.info(f"Scraping abgeschlossen. {len(self.data)} neue Einträge hinzugefügt.")
+            logger.info("Scraping abgeschlossen. %s neue Einträge hinzugefügt.", len(self.data))
         else:
             logger.info("Keine neuen Einträge gefunden")
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='NABU-Wildvogelhilfen (Google My Maps) scrapen')
+    profiling.add_argument(parser)
+    log_setup.add_argument(parser)
+    args = parser.parse_args(argv)
+    log_setup.setup('scrape_nabu', args.log_level)
+    if args.profile:
+        profiling.enable('scrape_nabu')
+    metrics.enable('scrape_nabu')
     scraper = NABUGoogleMapsScraper()
-    scraper.run()
+    with metrics.stage('scrape-nabu'):
+        scraper.run()
 
 
 if __name__ == "__main__":
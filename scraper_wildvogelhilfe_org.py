@@ -14,26 +14,31 @@ import logging
 from datetime import datetime
 import os
 import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import List, Optional, Tuple
 
-# Logging konfigurieren
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler()
-    ]
-)
+import http_client
+import log_setup
+import metrics
+import profiling
+import provenance
+
 logger = logging.getLogger(__name__)
 
+# Ab so vielen Stationsblöcken pro Seite lohnt sich der Prozess-Pool (Start + Pickling)
+PARALLEL_MIN_BLOCKS = 200
+# Blöcke je Auftrag an einen Worker (wird bei großen Seiten größer, max. ~4 Aufträge je Worker)
+MIN_CHUNK = 50
+
 class SimpleWildvogelhilfeScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.session = http_client.create_session()
         self.data = []
+        self.previous: List[dict] = []
         
         # URLs aller zu scrapenden Seiten
         self.urls = [
@@ -204,7 +209,7 @@ class SimpleWildvogelhilfeScraper:
                         break
 
             if not plz:
-                logger.warning(f"⚠️  Keine PLZ gefunden für {name}")
+                logger.warning("⚠️  Keine PLZ gefunden für %s", name)
                 return None
 
             if not specialization:
@@ -235,71 +240,72 @@ class SimpleWildvogelhilfeScraper:
                 'region': region,
                 'country': country
             }
+            if lat and lon:
+                provenance.set_coordinates(station, lat, lon, 'plz-centroid')
             return {k: v for k, v in station.items() if v}
         except Exception as e:
-            logger.error(f"❌ Fehler beim Parsen der Station: {e}")
+            logger.error("❌ Fehler beim Parsen der Station: %s", e)
             return None
     
-    def _fetch_with_retries(self, url: str, retries: int = 3, backoff: float = 2.0) -> Optional[requests.Response]:
-        for attempt in range(1, retries + 1):
-            try:
-                resp = self.session.get(url, timeout=30)
-                resp.raise_for_status()
-                return resp
-            except Exception as e:
-                logger.warning(f"⚠️  Request fehlgeschlagen (Versuch {attempt}/{retries}) {e}")
-                if attempt < retries:
-                    time.sleep(backoff * attempt)
-        return None
+    def _fetch_with_retries(self, url: str) -> Optional[requests.Response]:
+        """Wiederholungen mit Backoff übernimmt die Session (http_client.RETRIES)."""
+        try:
+            resp = self.session.get(url)
+            resp.raise_for_status()
+            return resp
+        except requests.RequestException as e:
+            logger.warning("⚠️  Request fehlgeschlagen %s", e)
+            return None
+
+    def parse_blocks(self, blocks: List[str], region: str) -> List[dict]:
+        """Parst rohe HTML-Stationsblöcke; große Seiten parallel im Prozess-Pool.
+
+        Die Reihenfolge der Ergebnisse entspricht immer der Reihenfolge der Blöcke.
+        """
+        if self.workers > 1 and len(blocks) >= PARALLEL_MIN_BLOCKS:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            size = max(MIN_CHUNK, -(-len(blocks) // (self.workers * 4)))
+            chunks = [blocks[i:i + size] for i in range(0, len(blocks), size)]
+            results = [r for chunk in self._pool.map(_parse_chunk, chunks, repeat(region)) for r in chunk]
+        else:
+            results = _parse_chunk(blocks, region, self)
+
+        stations = []
+        for st, seconds, label in results:
+            profiling.record_item('wildvogelhilfe', f"{region}: {label}", seconds)
+            if st:
+                stations.append(st)
+                logger.debug("✅ %s", st['name'])
+        return stations
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
 
     def scrape_page(self, region, url):
         """Scrapt eine einzelne Seite mit robustem Block-Paser."""
         try:
-            logger.info(f"🔍 Scraping {region}: {url}")
+            logger.info("🔍 Scraping %s: %s", region, url)
             response = self._fetch_with_retries(url)
             if response is None:
-                logger.error(f"❌ Abbruch {region}: Seite nicht erreichbar")
+                logger.error("❌ Abbruch %s: Seite nicht erreichbar", region)
                 return []
 
+            parse_start = time.perf_counter()
             soup = BeautifulSoup(response.content, 'html.parser')
             content = soup.find('div', class_='entry-content') or soup.find('main')
             if not content:
-                logger.warning(f"⚠️  Kein Hauptinhalt gefunden für {region}")
+                logger.warning("⚠️  Kein Hauptinhalt gefunden für %s", region)
                 return []
 
-            stations = []
-            current_station = []
-            elements = content.find_all(['h3', 'p', 'hr', 'div'])
-            for el in elements:
-                if el.name == 'h3':
-                    if current_station:
-                        station_soup = BeautifulSoup(''.join(str(e) for e in current_station), 'html.parser')
-                        st = self.extract_station_info(station_soup, region)
-                        if st:
-                            stations.append(st)
-                            logger.info(f"✅ {st['name']}")
-                    current_station = [el]
-                elif el.name in ('p', 'div'):
-                    if current_station:
-                        current_station.append(el)
-                elif el.name == 'hr':
-                    if current_station:
-                        station_soup = BeautifulSoup(''.join(str(e) for e in current_station), 'html.parser')
-                        st = self.extract_station_info(station_soup, region)
-                        if st:
-                            stations.append(st)
-                            logger.info(f"✅ {st['name']}")
-                        current_station = []
-            if current_station:
-                station_soup = BeautifulSoup(''.join(str(e) for e in current_station), 'html.parser')
-                st = self.extract_station_info(station_soup, region)
-                if st:
-                    stations.append(st)
-                    logger.info(f"✅ {st['name']}")
-            logger.info(f"📊 {region}: {len(stations)} Stationen gefunden")
+            stations = self.parse_blocks(split_station_blocks(content), region)
+            metrics.record_parsed('wildvogelhilfe', len(stations), time.perf_counter() - parse_start)
+            logger.info("📊 %s: %s Stationen gefunden", region, len(stations))
             return stations
         except Exception as e:
-            logger.error(f"❌ Fehler beim Scraping von {region}: {e}")
+            logger.error("❌ Fehler beim Scraping von %s: %s", region, e)
             return []
     
     def run(self, test_mode=False):
@@ -307,11 +313,14 @@ class SimpleWildvogelhilfeScraper:
         logger.info("🚀 Starte Simple Wildvogelhilfe-Scraper")
         start_time = datetime.now()
         
+        # Genauere Koordinaten aus dem letzten Stand übernehmen (siehe save_progress)
+        self.previous = load_existing_stations()
+
         # Im Testmodus nur erste 2 Seiten
         urls_to_process = self.urls[:2] if test_mode else self.urls
         
         for i, (region, url) in enumerate(urls_to_process, 1):
-            logger.info(f"📑 Bearbeite Seite {i}/{len(urls_to_process)}: {region}")
+            logger.info("📑 Bearbeite Seite %s/%s: %s", i, len(urls_to_process), region)
             
             stations = self.scrape_page(region, url)
             self.data.extend(stations)
@@ -319,7 +328,7 @@ class SimpleWildvogelhilfeScraper:
             # Fortschritt speichern nach jeder Seite
             self.save_progress()
             
-            logger.info(f"🎯 Fortschritt: {i}/{len(urls_to_process)} Seiten | {len(self.data)} Stationen total")
+            logger.info("🎯 Fortschritt: %s/%s Seiten | %s Stationen total", i, len(urls_to_process), len(self.data))
             
             # Kurze Pause zwischen Seiten
             if i < len(urls_to_process):
@@ -332,8 +341,8 @@ class SimpleWildvogelhilfeScraper:
         
         logger.info("=" * 50)
         logger.info("🎉 SCRAPING ABGESCHLOSSEN!")
-        logger.info(f"⏱️  Dauer: {duration}")
-        logger.info(f"📊 Gesamtanzahl Stationen: {len(self.data)}")
+        logger.info("⏱️  Dauer: %s", duration)
+        logger.info("📊 Gesamtanzahl Stationen: %s", len(self.data))
         
         # Statistiken nach Regionen
         region_stats = {}
@@ -345,10 +354,10 @@ class SimpleWildvogelhilfeScraper:
             if station.get('latitude') and station.get('longitude'):
                 coord_count += 1
         
-        logger.info(f"🌍 Stationen mit Koordinaten: {coord_count}/{len(self.data)} ({coord_count/len(self.data)*100:.1f}%)")
+        logger.info("🌍 Stationen mit Koordinaten: %s/%s (%.1f%%)", coord_count, len(self.data), coord_count/len(self.data)*100)
         logger.info("\n📍 Verteilung nach Regionen:")
         for region, count in sorted(region_stats.items()):
-            logger.info(f"  {region}: {count} Stationen")
+            logger.info("  %s: %s Stationen", region, count)
         
         self.save_progress()
         logger.info("💾 Finale Daten gespeichert in data/wildvogelhilfen.json")
@@ -357,35 +366,102 @@ class SimpleWildvogelhilfeScraper:
 
     def save_progress(self):
         """Speichert aktuellen Zwischenstand in JSON."""
+        provenance.carry_over(self.data, self.previous)
         try:
             with open('data/wildvogelhilfen.json', 'w', encoding='utf-8') as f:
                 json.dump(self.data, f, ensure_ascii=False, indent=2)
         except Exception as e:
-            logger.error(f"❌ Fehler beim Speichern: {e}")
+            logger.error("❌ Fehler beim Speichern: %s", e)
 
-def main():
+def load_existing_stations(path: str = 'data/wildvogelhilfen.json') -> List[dict]:
+    """Bisheriger Stand (leer, wenn die Datei fehlt oder kaputt ist)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def split_station_blocks(content) -> List[str]:
+    """Zerlegt den Seiteninhalt in rohe HTML-Blöcke je Station (h3 bis zum nächsten h3/hr)."""
+    blocks = []
+    current_station = []
+    for el in content.find_all(['h3', 'p', 'hr', 'div']):
+        if el.name == 'h3':
+            if current_station:
+                blocks.append(''.join(str(e) for e in current_station))
+            current_station = [el]
+        elif el.name in ('p', 'div'):
+            if current_station:
+                current_station.append(el)
+        elif el.name == 'hr':
+            if current_station:
+                blocks.append(''.join(str(e) for e in current_station))
+                current_station = []
+    if current_station:
+        blocks.append(''.join(str(e) for e in current_station))
+    return blocks
+
+
+_WORKER_SCRAPER: Optional[SimpleWildvogelhilfeScraper] = None
+
+
+def _init_worker():
+    global _WORKER_SCRAPER
+    log_setup.worker_setup()
+    _WORKER_SCRAPER = SimpleWildvogelhilfeScraper(workers=1)
+
+
+def _parse_chunk(blocks: List[str], region: str,
+                 scraper: Optional[SimpleWildvogelhilfeScraper] = None) -> List[Tuple[Optional[dict], float, str]]:
+    """Parst Blöcke nacheinander → [(station|None, sekunden, überschrift), ...] (läuft auch im Worker)."""
+    scraper = scraper or _WORKER_SCRAPER
+    results = []
+    for block in blocks:
+        start = time.perf_counter()
+        station_soup = BeautifulSoup(block, 'html.parser')
+        st = scraper.extract_station_info(station_soup, region)
+        name_elem = station_soup.find('h3')
+        label = name_elem.get_text(strip=True)[:60] if name_elem else ''
+        results.append((st, time.perf_counter() - start, label))
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
     """Hauptfunktion"""
-    import sys
-    
-    scraper = SimpleWildvogelhilfeScraper()
-    
-    # Prüfe Kommandozeilen-Argumente
-    test_mode = '--test' in sys.argv
+    parser = argparse.ArgumentParser(description='Auffangstationen von wildvogelhilfe.org scrapen')
+    parser.add_argument('--test', action='store_true', help='Nur die ersten 2 Seiten')
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f'Prozesse zum Parsen großer Seiten (ab {PARALLEL_MIN_BLOCKS} Stationen, Standard: CPU-Kerne)')
+    profiling.add_argument(parser)
+    log_setup.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    log_setup.setup('scrape_wildvogelhilfe', args.log_level)
+    metrics.enable('scrape_wildvogelhilfe')
+    if args.profile:
+        profiling.enable('scrape_wildvogelhilfe')
+    scraper = SimpleWildvogelhilfeScraper(workers=args.workers)
+    test_mode = args.test
     
     if test_mode:
         logger.info("🧪 TESTMODUS: Nur erste 2 Seiten werden gescrapt")
     
     try:
-        total_stations = scraper.run(test_mode=test_mode)
-        logger.info(f"✅ Erfolgreich abgeschlossen! {total_stations} Stationen gesammelt.")
+        with metrics.stage('scrape-wildvogelhilfe'):
+            total_stations = scraper.run(test_mode=test_mode)
+        logger.info("✅ Erfolgreich abgeschlossen! %s Stationen gesammelt.", total_stations)
         
     except KeyboardInterrupt:
         logger.info("\n⏹️  Scraping durch Benutzer unterbrochen")
         scraper.save_progress()
         
     except Exception as e:
-        logger.error(f"❌ Unerwarteter Fehler: {e}")
+        logger.error("❌ Unerwarteter Fehler: %s", e)
         scraper.save_progress()
 
+    finally:
+        scraper.close()
+
 if __name__ == "__main__":
     main()
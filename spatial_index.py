@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Räumlicher Index für "nächste Wildvogelhilfen" (k-nächste Nachbarn und Umkreissuche)
+KD-Baum über Einheitsvektoren auf der Kugel: Die euklidische Sehnenlänge ist streng
+monoton zur Großkreisdistanz, dadurch gibt es keine Probleme an Datumsgrenze/Polen
+und die Suche kann mit einfachen Ebenen-Abständen abschneiden.
+
+Zusätzlich wird ein kompaktes Raster-Artefakt (data/nearest_grid.json) für das Frontend
+erzeugt: pro Rasterzelle die Kandidaten, unter denen garantiert die k nächsten Stationen
+jedes Punktes der Zelle liegen.
+"""
+
+import sys
+import json
+import math
+import time
+import heapq
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from station_utils import STATIONS_PATH, load_stations, get_station_coords, assign_station_ids, dump_compact
+import profiling
+
+EARTH_RADIUS_KM = 6371.0
+GRID_PATH = Path('data/nearest_grid.json')
+LEAF_SIZE = 16
+
+
+def to_unit_vectors(lat, lon) -> np.ndarray:
+    lat_r = np.radians(np.asarray(lat, dtype=np.float64))
+    lon_r = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat_r)
+    return np.column_stack((cos_lat * np.cos(lon_r), cos_lat * np.sin(lon_r), np.sin(lat_r)))
+
+
+def chord_to_km(chord: float) -> float:
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2.0))
+
+
+def km_to_chord(km: float) -> float:
+    return 2.0 * math.sin(min(math.pi, km / EARTH_RADIUS_KM) / 2.0)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine-Formel (gleiche Rechnung wie calculateDistance in map.js)."""
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = math.sin(d_lat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+class KDTree:
+    """Statischer KD-Baum (3D) mit Blättern aus bis zu LEAF_SIZE Punkten.
+
+    Der Baum wird mit NumPy gebaut (argpartition je Knoten) und für die Abfragen in
+    flache Python-Listen umgewandelt, weil Einzelzugriffe auf Listen deutlich
+    schneller sind als auf NumPy-Arrays.
+    """
+
+    def __init__(self, vectors: np.ndarray, leaf_size: int = LEAF_SIZE):
+        n = len(vectors)
+        order = np.arange(n)
+        # Knoten: dim (-1 = Blatt), split, left, right, start, end
+        dims, splits, lefts, rights, starts, ends = [], [], [], [], [], []
+
+        def new_node():
+            dims.append(-1)
+            splits.append(0.0)
+            lefts.append(-1)
+            rights.append(-1)
+            starts.append(0)
+            ends.append(0)
+            return len(dims) - 1
+
+        root = new_node() if n else -1
+        stack = [(root, 0, n)] if n else []
+        while stack:
+            node, start, end = stack.pop()
+            starts[node], ends[node] = start, end
+            if end - start <= leaf_size:
+                continue
+            pts = vectors[order[start:end]]
+            dim = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+            mid = (end - start) // 2
+            part = np.argpartition(pts[:, dim], mid)
+            order[start:end] = order[start:end][part]
+            dims[node] = dim
+            splits[node] = float(vectors[order[start + mid], dim])
+            left, right = new_node(), new_node()
+            lefts[node], rights[node] = left, right
+            stack.append((left, start, start + mid))
+            stack.append((right, start + mid, end))
+
+        self.order = order.tolist()
+        permuted = vectors[order]
+        self.xs = permuted[:, 0].tolist()
+        self.ys = permuted[:, 1].tolist()
+        self.zs = permuted[:, 2].tolist()
+        self.dims, self.splits, self.lefts, self.rights = dims, splits, lefts, rights
+        self.starts, self.ends = starts, ends
+        self.root = root
+
+    def query(self, qx: float, qy: float, qz: float, k: int) -> List[Tuple[float, int]]:
+        """k nächste Punkte als Liste (Sehne², Originalindex), aufsteigend sortiert."""
+        if self.root < 0 or k <= 0:
+            return []
+        heap = []  # Max-Heap über (-d2, idx)
+        q = (qx, qy, qz)
+        worst = float('inf')
+        stack = [(self.root, 0.0)]
+        xs, ys, zs, order = self.xs, self.ys, self.zs, self.order
+        dims, splits, lefts, rights = self.dims, self.splits, self.lefts, self.rights
+        while stack:
+            node, bound = stack.pop()
+            if bound > worst:
+                continue
+            while dims[node] >= 0:
+                diff = q[dims[node]] - splits[node]
+                if diff < 0:
+                    near, far = lefts[node], rights[node]
+                else:
+                    near, far = rights[node], lefts[node]
+                d2_plane = diff * diff
+                if d2_plane <= worst:
+                    stack.append((far, d2_plane))
+                node = near
+            for i in range(self.starts[node], self.ends[node]):
+                dx, dy, dz = xs[i] - qx, ys[i] - qy, zs[i] - qz
+                d2 = dx * dx + dy * dy + dz * dz
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d2, order[i]))
+                    if len(heap) == k:
+                        worst = -heap[0][0]
+                elif d2 < worst:
+                    heapq.heapreplace(heap, (-d2, order[i]))
+                    worst = -heap[0][0]
+        return sorted((-d, i) for d, i in heap)
+
+    def query_radius(self, qx: float, qy: float, qz: float, chord: float) -> List[Tuple[float, int]]:
+        """Alle Punkte mit Sehnenlänge ≤ chord, aufsteigend sortiert."""
+        if self.root < 0:
+            return []
+        r2 = chord * chord
+        q = (qx, qy, qz)
+        result = []
+        stack = [self.root]
+        xs, ys, zs, order = self.xs, self.ys, self.zs, self.order
+        while stack:
+            node = stack.pop()
+            dim = self.dims[node]
+            if dim >= 0:
+                diff = q[dim] - self.splits[node]
+                near, far = (self.lefts[node], self.rights[node]) if diff < 0 else (self.rights[node], self.lefts[node])
+                stack.append(near)
+                if diff * diff <= r2:
+                    stack.append(far)
+                continue
+            for i in range(self.starts[node], self.ends[node]):
+                dx, dy, dz = xs[i] - qx, ys[i] - qy, zs[i] - qz
+                d2 = dx * dx + dy * dy + dz * dz
+                if d2 <= r2:
+                    result.append((d2, order[i]))
+        result.sort()
+        return result
+
+
+class SpatialIndex:
+    """Stationen + KD-Baum. Abfragen liefern (Entfernung in km, Station mit 'id')."""
+
+    def __init__(self, stations: List[Dict]):
+        self.stations = []
+        lats, lons = [], []
+        for station, sid in zip(stations, assign_station_ids(stations)):
+            coords = get_station_coords(station)
+            if coords:
+                self.stations.append({'id': sid, **station})
+                lats.append(coords[0])
+                lons.append(coords[1])
+        self.lats, self.lons = lats, lons
+        self.tree = KDTree(to_unit_vectors(lats, lons))
+
+    @classmethod
+    def from_file(cls, path: Path = STATIONS_PATH) -> 'SpatialIndex':
+        return cls(load_stations(path))
+
+    def nearest(self, lat: float, lon: float, k: int = 5) -> List[Tuple[float, Dict]]:
+        q = to_unit_vectors([lat], [lon])[0]
+        hits = self.tree.query(float(q[0]), float(q[1]), float(q[2]), k)
+        return [(chord_to_km(math.sqrt(d2)), self.stations[i]) for d2, i in hits]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[float, Dict]]:
+        q = to_unit_vectors([lat], [lon])[0]
+        hits = self.tree.query_radius(float(q[0]), float(q[1]), float(q[2]), km_to_chord(radius_km))
+        return [(chord_to_km(math.sqrt(d2)), self.stations[i]) for d2, i in hits]
+
+    def bbox(self, south: float, west: float, north: float, east: float) -> List[Dict]:
+        """Stationen im Rechteck (über den Umkreis der Box vorgefiltert)."""
+        center_lat, center_lon = (south + north) / 2, (west + east) / 2
+        radius = max(haversine_km(center_lat, center_lon, la, lo)
+                     for la, lo in ((south, west), (south, east), (north, west), (north, east)))
+        result = []
+        for _dist, station in self.within(center_lat, center_lon, radius + 0.01):
+            la, lo = get_station_coords(station)
+            if south <= la <= north and west <= lo <= east:
+                result.append(station)
+        return result
+
+    def export_grid(self, k: int = 5, step: float = 0.5, pad: float = 1.0) -> Dict:
+        """Raster-Artefakt für das Frontend.
+
+        Für jede Zelle (Mittelpunkt c, halbe Diagonale h) liegen die k nächsten Stationen
+        jedes Punktes p der Zelle innerhalb von D_k(c) + 2h um c: p hat mindestens k
+        Stationen im Abstand ≤ D_k(c) + h, und jede davon ist höchstens h weiter von c.
+        Der Client rechnet also nur noch Haversine über die Kandidaten seiner Zelle.
+        """
+        if not self.stations:
+            return {}
+        lat0 = math.floor((min(self.lats) - pad) / step) * step
+        lon0 = math.floor((min(self.lons) - pad) / step) * step
+        rows = int(math.ceil((max(self.lats) + pad - lat0) / step))
+        cols = int(math.ceil((max(self.lons) + pad - lon0) / step))
+        cells = []
+        for r in range(rows):
+            for c in range(cols):
+                c_lat, c_lon = lat0 + (r + 0.5) * step, lon0 + (c + 0.5) * step
+                half_diag = haversine_km(c_lat, c_lon, c_lat + step / 2, c_lon + step / 2)
+                half_diag = max(half_diag, haversine_km(c_lat, c_lon, c_lat - step / 2, c_lon + step / 2))
+                near = self.nearest(c_lat, c_lon, k)
+                limit = near[-1][0] + 2 * half_diag
+                cells.append(sorted(self._indices_within(c_lat, c_lon, limit)))
+        return {
+            'k': k,
+            'lat0': lat0, 'lon0': lon0, 'step': step, 'rows': rows, 'cols': cols,
+            'points': [[round(la, 6), round(lo, 6), s['id']] for la, lo, s in zip(self.lats, self.lons, self.stations)],
+            'cells': cells,
+        }
+
+    def _indices_within(self, lat: float, lon: float, radius_km: float) -> List[int]:
+        q = to_unit_vectors([lat], [lon])[0]
+        return [i for _d2, i in self.tree.query_radius(float(q[0]), float(q[1]), float(q[2]), km_to_chord(radius_km))]
+
+
+def brute_force_nearest(lat_arr: np.ndarray, lon_arr: np.ndarray, lat: float, lon: float, k: int) -> np.ndarray:
+    """Vergleichsbasis: Haversine zu allen Punkten (vektorisiert) + Teilsortierung."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lat_arr), np.radians(lon_arr)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    k = min(k, len(dist))
+    idx = np.argpartition(dist, k - 1)[:k]
+    return idx[np.argsort(dist[idx])]
+
+
+def run_benchmark(sizes: List[int], queries: int = 200, k: int = 5) -> List[Dict]:
+    rnd = np.random.default_rng(42)
+    results = []
+    for n in sizes:
+        lat = rnd.uniform(36.0, 56.0, n)
+        lon = rnd.uniform(5.0, 19.0, n)
+        q_lat = rnd.uniform(45.0, 55.0, queries)
+        q_lon = rnd.uniform(6.0, 15.0, queries)
+
+        t0 = time.perf_counter()
+        tree = KDTree(to_unit_vectors(lat, lon))
+        build_s = time.perf_counter() - t0
+
+        qv = to_unit_vectors(q_lat, q_lon).tolist()
+        t0 = time.perf_counter()
+        kd_hits = [tree.query(v[0], v[1], v[2], k) for v in qv]
+        kd_s = (time.perf_counter() - t0) / queries
+
+        brute_queries = queries if n <= 100000 else max(20, queries // 10)
+        t0 = time.perf_counter()
+        brute_hits = [brute_force_nearest(lat, lon, float(q_lat[i]), float(q_lon[i]), k) for i in range(brute_queries)]
+        brute_s = (time.perf_counter() - t0) / brute_queries
+
+        mismatches = sum(1 for i in range(brute_queries)
+                         if [h[1] for h in kd_hits[i]] != brute_hits[i].tolist())
+        results.append({'points': n, 'build_s': round(build_s, 4), 'kdtree_query_ms': round(kd_s * 1000, 4),
+                        'brute_query_ms': round(brute_s * 1000, 4), 'speedup': round(brute_s / kd_s, 1),
+                        'mismatches': mismatches})
+    return results
+
+
+def _print_hits(hits: List[Tuple[float, Dict]]):
+    for i, (dist, station) in enumerate(hits, 1):
+        print(f"  {i:2d}. {dist:7.1f} km  {station['name'][:50]:<50} {station.get('address', '')}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Nächste Wildvogelhilfen finden (KD-Baum)')
+    parser.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_near = sub.add_parser('nearest', help='k nächste Stationen zu einer Koordinate')
+    p_near.add_argument('lat', type=float)
+    p_near.add_argument('lon', type=float)
+    p_near.add_argument('-k', type=int, default=5, help='Anzahl Stationen (Standard: 5)')
+    p_near.add_argument('--json', action='store_true', help='Ausgabe als JSON')
+
+    p_rad = sub.add_parser('radius', help='Alle Stationen im Umkreis')
+    p_rad.add_argument('lat', type=float)
+    p_rad.add_argument('lon', type=float)
+    p_rad.add_argument('--km', type=float, default=50.0, help='Radius in km (Standard: 50)')
+    p_rad.add_argument('--json', action='store_true', help='Ausgabe als JSON')
+
+    p_grid = sub.add_parser('export-grid', help='Raster-Artefakt für das Frontend schreiben')
+    p_grid.add_argument('-k', type=int, default=5)
+    p_grid.add_argument('--step', type=float, default=0.5, help='Zellgröße in Grad (Standard: 0.5)')
+    p_grid.add_argument('--out', type=Path, default=GRID_PATH)
+
+    p_bench = sub.add_parser('bench', help='KD-Baum vs. Brute Force')
+    p_bench.add_argument('--sizes', type=str, default='1000,100000,1000000')
+    p_bench.add_argument('--queries', type=int, default=200)
+
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('spatial_index')
+
+    if args.command == 'bench':
+        sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+        print("⏱️  BENCHMARK KD-BAUM vs. BRUTE FORCE (k=5)")
+        print("=" * 50)
+        print(f"   {'Punkte':>9} {'Build s':>9} {'KD ms':>9} {'Brute ms':>10} {'Faktor':>8} {'Abw.':>5}")
+        for r in run_benchmark(sizes, args.queries):
+            print(f"   {r['points']:>9} {r['build_s']:>9.3f} {r['kdtree_query_ms']:>9.3f} "
+                  f"{r['brute_query_ms']:>10.3f} {r['speedup']:>7.1f}x {r['mismatches']:>5}")
+        return 0
+
+    index = SpatialIndex.from_file(args.input)
+
+    if args.command == 'export-grid':
+        grid = index.export_grid(k=args.k, step=args.step)
+        if not grid:
+            print("❌ Keine Stationen mit Koordinaten gefunden!")
+            return 1
+        payload = dump_compact(grid)
+        args.out.write_text(payload, encoding='utf-8')
+        sizes = [len(c) for c in grid['cells']]
+        print(f"💾 {args.out}: {grid['rows']}x{grid['cols']} Zellen, "
+              f"Ø {sum(sizes) / len(sizes):.1f} Kandidaten/Zelle (max {max(sizes)}), "
+              f"{len(payload.encode('utf-8')) / 1024:.1f} KB")
+        return 0
+
+    if args.command == 'nearest':
+        hits = index.nearest(args.lat, args.lon, args.k)
+    else:
+        hits = index.within(args.lat, args.lon, args.km)
+
+    if args.json:
+        print(json.dumps([{'distance_km': round(d, 2), **s} for d, s in hits], ensure_ascii=False, indent=2))
+    else:
+        print(f"📍 {len(hits)} Stationen für ({args.lat}, {args.lon}):")
+        _print_hits(hits)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Gemeinsame Hilfsfunktionen für die Build-Skripte (Tiles, Cluster, Suche, ...)
+Laden der Stationen, stabile Stations-IDs und kompaktes JSON-Schreiben.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+STATIONS_PATH = Path('data/wildvogelhilfen.json')
+
+
+def load_stations(path: Path = STATIONS_PATH) -> List[Dict]:
+    """Lädt die Stationsliste (leere Liste falls Datei fehlt)."""
+    if not path.exists():
+        print(f"❌ {path} nicht gefunden!")
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_station_coords(station: Dict) -> Optional[Tuple[float, float]]:
+    """Gibt (lat, lon) als float zurück oder None bei fehlenden/ungültigen Werten."""
+    try:
+        lat = float(station.get('latitude'))
+        lon = float(station.get('longitude'))
+    except (TypeError, ValueError):
+        return None
+    # Gleiche Regel wie map.js: 0 gilt als "nicht gesetzt"
+    if lat == 0 or lon == 0 or not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def station_id(station: Dict) -> str:
+    """Stabile Kurz-ID aus Name und PLZ (unabhängig von der Reihenfolge in der Datei)."""
+    key = f"{station.get('name', '').strip().lower()}|{station.get('plz', '')}"
+    return hashlib.md5(key.encode('utf-8')).hexdigest()[:10]
+
+
+def assign_station_ids(stations: List[Dict]) -> List[str]:
+    """Vergibt eindeutige IDs für alle Stationen (Kollisionen werden deterministisch aufgelöst)."""
+    ids = []
+    seen = set()
+    for station in stations:
+        sid = station_id(station)
+        if sid in seen:
+            # Gleicher Name + PLZ: Adresse und Telefon mit einbeziehen
+            key = f"{sid}|{station.get('address', '')}|{station.get('phone', '')}"
+            sid = hashlib.md5(key.encode('utf-8')).hexdigest()[:10]
+            n = 2
+            base = sid
+            while sid in seen:
+                sid = f"{base}-{n}"
+                n += 1
+        seen.add(sid)
+        ids.append(sid)
+    return ids
+
+
+def dump_compact(data) -> str:
+    """JSON ohne Leerraum (für ausgelieferte Artefakte)."""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
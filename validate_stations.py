@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Validierung der Stationsdaten vor dem Veröffentlichen
+Prüft in einem einzigen Durchlauf Pflichtfelder, Datentypen, PLZ-Format je Land und ob
+die Koordinaten innerhalb von Deutschland/Österreich/Schweiz/Italien liegen. Die Regeln
+werden einmal in eine Prüffunktion übersetzt (vorkompilierte Regex, gebundene Grenzen),
+damit auch 1 Mio. Einträge in wenigen Sekunden geprüft sind.
+
+Exit-Code 1, wenn der Anteil fehlerhafter Einträge über --max-error-rate liegt –
+auto_update.sh veröffentlicht dann nicht.
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from station_utils import STATIONS_PATH, load_stations
+import profiling
+import provenance
+
+REPORT_PATH = Path('logs/validation_report.json')
+DEFAULT_MAX_ERROR_RATE = 0.10
+MAX_REPORTED_ERRORS = 500
+
+# PLZ-Format und grobe Landesgrenzen (Süd, Nord, West, Ost) je Land
+COUNTRY_RULES = {
+    'Deutschland': {'plz': r'\d{5}', 'bounds': (47.2, 55.1, 5.8, 15.1)},
+    'Österreich': {'plz': r'\d{4}', 'bounds': (46.3, 49.1, 9.5, 17.2)},
+    'Schweiz': {'plz': r'\d{4}', 'bounds': (45.8, 47.9, 5.9, 10.5)},
+    'Italien': {'plz': r'\d{5}', 'bounds': (35.4, 47.1, 6.6, 18.6)},
+}
+REQUIRED_TEXT = ('name', 'address', 'plz', 'country')
+OPTIONAL_TEXT = ('specialization', 'phone', 'email', 'website', 'note', 'region', 'plz_prefix', 'state', 'status')
+# Diese Befunde sind nur Warnungen (fix_coordinates.py füllt fehlende Koordinaten nach)
+WARNING_CODES = {'coords_missing'}
+
+
+def compile_validator(rules: Dict = COUNTRY_RULES) -> Callable[[Dict], List[Tuple[str, str]]]:
+    """Übersetzt die Regeln in eine Prüffunktion record -> [(feld, code), ...]."""
+    plz_patterns = {country: re.compile(rule['plz']).fullmatch for country, rule in rules.items()}
+    bounds = {country: rule['bounds'] for country, rule in rules.items()}
+    required = REQUIRED_TEXT
+    optional = OPTIONAL_TEXT
+    provenance_field, provenance_sources = provenance.FIELD, frozenset(provenance.PRECISION)
+    str_type, dict_type, number_types = str, dict, (int, float)
+
+    def validate(record) -> List[Tuple[str, str]]:
+        if type(record) is not dict_type:
+            return [('', 'not_object')]
+        problems = []
+        get = record.get
+        for field in required:
+            value = get(field)
+            if value is None:
+                problems.append((field, 'missing'))
+            elif type(value) is not str_type:
+                problems.append((field, 'type'))
+            elif not value.strip():
+                problems.append((field, 'empty'))
+        for field in optional:
+            value = get(field)
+            if value is not None and type(value) is not str_type:
+                problems.append((field, 'type'))
+        info = get(provenance_field)
+        if info is not None and (type(info) is not dict_type or info.get('source') not in provenance_sources):
+            problems.append((provenance_field, 'provenance_unknown'))
+
+        country = get('country')
+        box = bounds.get(country)
+        if box is None:
+            if type(country) is str_type and country:
+                problems.append(('country', 'country_unknown'))
+        else:
+            plz = get('plz')
+            if type(plz) is str_type and plz and not plz_patterns[country](plz):
+                problems.append(('plz', 'plz_format'))
+
+        lat, lon = get('latitude'), get('longitude')
+        if lat is None and lon is None:
+            problems.append(('latitude', 'coords_missing'))
+            return problems
+        if lat is None or lon is None:
+            problems.append(('latitude' if lat is None else 'longitude', 'coords_partial'))
+            return problems
+        lat_ok = type(lat) in number_types and type(lat) is not bool
+        lon_ok = type(lon) in number_types and type(lon) is not bool
+        if not lat_ok:
+            problems.append(('latitude', 'type'))
+        if not lon_ok:
+            problems.append(('longitude', 'type'))
+        if lat_ok and lon_ok and box is not None:
+            south, north, west, east = box
+            if not south <= lat <= north:
+                problems.append(('latitude', 'out_of_bounds'))
+            if not west <= lon <= east:
+                problems.append(('longitude', 'out_of_bounds'))
+        return problems
+
+    return validate
+
+
+def validate_stations(stations: List, max_error_rate: float = DEFAULT_MAX_ERROR_RATE) -> Dict:
+    """Prüft alle Einträge in einem Durchlauf und gibt den Bericht zurück."""
+    validate = compile_validator()
+    counts: Dict[str, int] = {}
+    errors = []
+    invalid = 0
+    warnings = 0
+    for index, record in enumerate(stations):
+        problems = validate(record)
+        if not problems:
+            continue
+        has_error = False
+        for field, code in problems:
+            key = f"{field}:{code}" if field else code
+            counts[key] = counts.get(key, 0) + 1
+            if code in WARNING_CODES:
+                warnings += 1
+                continue
+            has_error = True
+            if len(errors) < MAX_REPORTED_ERRORS:
+                value = record.get(field) if field and isinstance(record, dict) else None
+                errors.append({'index': index, 'name': record.get('name') if isinstance(record, dict) else None,
+                               'field': field, 'code': code, 'value': value})
+        invalid += has_error
+
+    total = len(stations)
+    error_rate = invalid / total if total else 1.0
+    return {
+        'total': total,
+        'invalid': invalid,
+        'warnings': warnings,
+        'error_rate': round(error_rate, 6),
+        'max_error_rate': max_error_rate,
+        'passed': total > 0 and error_rate <= max_error_rate,
+        'counts': dict(sorted(counts.items())),
+        'errors': errors,
+    }
+
+
+def synthetic_records(stations: List[Dict], n: int) -> List[Dict]:
+    """Vervielfältigt die echten Einträge auf n Datensätze (für den Durchsatztest)."""
+    if not stations:
+        stations = [{'name': 'Station', 'address': 'Weg 1, 10115 Berlin', 'plz': '10115', 'country': 'Deutschland',
+                     'latitude': 52.53, 'longitude': 13.38}]
+    return [dict(stations[i % len(stations)]) for i in range(n)]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Stationsdaten vor dem Veröffentlichen validieren')
+    parser.add_argument('--input', type=Path, default=STATIONS_PATH, help='Stationsdatei')
+    parser.add_argument('--report', type=Path, default=REPORT_PATH, help='Ausgabe des Prüfberichts (JSON)')
+    parser.add_argument('--max-error-rate', type=float, default=DEFAULT_MAX_ERROR_RATE,
+                        help=f'Höchster Anteil fehlerhafter Einträge (Standard: {DEFAULT_MAX_ERROR_RATE})')
+    parser.add_argument('--bench', type=int, default=0, help='Durchsatztest mit N Einträgen (z.B. 1000000)')
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable('validate_stations')
+
+    print("🛡️  DATENVALIDIERUNG")
+    print("=" * 50)
+    stations = load_stations(args.input)
+
+    if args.bench:
+        records = synthetic_records(stations, args.bench)
+        start = time.perf_counter()
+        report = validate_stations(records, args.max_error_rate)
+        elapsed = time.perf_counter() - start
+        print(f"⚡ {report['total']} Einträge in {elapsed:.2f}s ({report['total'] / elapsed:,.0f} Einträge/s)")
+        return 0
+
+    report = validate_stations(stations, args.max_error_rate)
+    report['generated'] = datetime.now().isoformat(timespec='seconds')
+    report['input'] = str(args.input)
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    print(f"📋 {report['total']} Einträge geprüft: {report['invalid']} fehlerhaft "
+          f"({report['error_rate']:.1%}), {report['warnings']} Warnungen")
+    for key, count in report['counts'].items():
+        print(f"   - {key}: {count}")
+    print(f"💾 Bericht: {args.report}")
+    if not report['passed']:
+        print(f"❌ Fehlerquote über {args.max_error_rate:.1%} – Veröffentlichung gestoppt")
+        return 1
+    print("✅ Validierung bestanden")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
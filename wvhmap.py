@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+wvhmap – gemeinsamer Einstiegspunkt für alle Daten-Werkzeuge
+
+    python3 wvhmap.py scrape [wildvogelhilfe|nabu|all] [--test]   (all → crawler.py)
+    python3 wvhmap.py geocode [--max N] [--deadline 10m|06:30] [--delay S] [--dry-run] [--from-list DATEI]
+                              [--hedge photon=URL|table=PFAD|centroid] [--hedge-after S] [--budget S]
+                              [--backend photon=URL|…] [--shard I/N]   (Shards: geocode_shards.py merge)
+    python3 wvhmap.py fix [--geocode] [--only-missing] [--max N] [--deadline 10m|06:30]
+    python3 wvhmap.py stats [--json]
+    python3 wvhmap.py publish [--skip-validate]   (Kacheln, Cluster, Suchindex, Raster, Manifest)
+
+Alle Befehle verstehen --profile (cProfile, Flamegraph-Stacks, Speicher je Schritt → logs/profile/).
+
+Schwere Module (requests, bs4, numpy, ...) werden erst im jeweiligen Unterbefehl
+importiert, Logging wird erst beim Start eines Scrapers eingerichtet. `stats` kommt
+dadurch mit json und argparse aus (Start < 100 ms, messbar mit
+`python3 -X importtime wvhmap.py stats`).
+"""
+
+import os
+import sys
+import json
+import argparse
+from typing import Callable, Dict, List, Optional
+
+# Bewusst ohne pathlib (kostet beim Start ~10 ms)
+STATIONS_PATH = os.path.join('data', 'wildvogelhilfen.json')
+CACHE_PATH = os.path.join('data', 'geocode_cache.json')
+
+
+def cmd_scrape(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='wvhmap scrape', description='Stationen von den Quellen scrapen')
+    parser.add_argument('source', nargs='?', default='all', choices=['wildvogelhilfe', 'nabu', 'all'])
+    parser.add_argument('--test', action='store_true', help='Nur die ersten Seiten')
+    args = parser.parse_args(argv)
+
+    if args.source == 'all':
+        # Alle Quellen gemeinsam über den Crawl-Scheduler (robots.txt, Frontier, Domain-Limits)
+        import crawler
+        return crawler.main(['--max-pages', '4'] if args.test else [])
+    if args.source == 'wildvogelhilfe':
+        import scraper_wildvogelhilfe_org
+        scraper_wildvogelhilfe_org.main(['--test'] if args.test else [])
+    if args.source == 'nabu':
+        import scraper_nabu_wvh
+        scraper_nabu_wvh.main([])
+    return 0
+
+
+def cmd_geocode(argv: List[str]) -> int:
+    import auto_update_cache
+    return auto_update_cache.main(argv)
+
+
+def cmd_fix(argv: List[str]) -> int:
+    import fix_coordinates
+    import boundaries
+    code = fix_coordinates.main(argv)
+    if code:
+        return code
+    # Bundesland passt zu den neuen Koordinaten (wie der Schritt 'regions' in pipeline.py)
+    return boundaries.main(['assign'])
+
+
+def _load_json(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def collect_stats() -> Dict:
+    """Kennzahlen aus Stationsdatei und Cache (nur json, keine weiteren Importe)."""
+    stations = _load_json(STATIONS_PATH) or []
+    cache = _load_json(CACHE_PATH) or {}
+    by_country: Dict[str, int] = {}
+    by_status: Dict[str, int] = {}
+    with_coords = 0
+    for station in stations:
+        country = station.get('country') or 'Unbekannt'
+        by_country[country] = by_country.get(country, 0) + 1
+        status = station.get('status') or 'unbekannt'
+        by_status[status] = by_status.get(status, 0) + 1
+        if station.get('latitude') and station.get('longitude'):
+            with_coords += 1
+    failed = sum(1 for v in cache.values() if not v or v[0] is None)
+    return {
+        'stations': len(stations),
+        'with_coords': with_coords,
+        'without_coords': len(stations) - with_coords,
+        'by_country': dict(sorted(by_country.items(), key=lambda kv: -kv[1])),
+        'by_status': dict(sorted(by_status.items(), key=lambda kv: -kv[1])),
+        'cache_entries': len(cache),
+        'cache_failed': failed,
+    }
+
+
+def cmd_stats(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='wvhmap stats', description='Kennzahlen der Stationsdaten')
+    parser.add_argument('--json', action='store_true', help='Ausgabe als JSON')
+    args = parser.parse_args(argv)
+
+    stats = collect_stats()
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+        return 0
+    print("📊 WILDVOGELHILFE-STATISTIK")
+    print("=" * 50)
+    print(f"   📍 {stats['stations']} Stationen ({stats['with_coords']} mit Koordinaten, "
+          f"{stats['without_coords']} ohne)")
+    for country, count in stats['by_country'].items():
+        print(f"      {country}: {count}")
+    print(f"   🏷️  Status: {', '.join(f'{k}: {v}' for k, v in stats['by_status'].items())}")
+    print(f"   🗺️  {stats['cache_entries']} Geocode-Cache-Einträge ({stats['cache_failed']} ohne Treffer)")
+    return 0
+
+
+def cmd_publish(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='wvhmap publish', description='Validieren und Publish-Artefakte bauen')
+    parser.add_argument('--skip-validate', action='store_true', help='Validierung überspringen')
+    args = parser.parse_args(argv)
+
+    if not args.skip_validate:
+        import validate_stations
+        if validate_stations.main([]):
+            return 1
+    import build_tiles
+    import build_clusters
+    import build_search_index
+    import spatial_index
+    import build_binary
+    import build_region_pages
+    import build_manifest
+    import profiling
+    steps = [
+        ('tiles', build_tiles.main, []),
+        ('clusters', build_clusters.main, []),
+        ('search-index', build_search_index.main, []),
+        ('nearest-grid', spatial_index.main, ['export-grid']),
+        ('region-pages', build_region_pages.main, []),
+        ('binary', build_binary.main, []),
+        ('manifest', build_manifest.main, []),
+    ]
+    for name, step, step_argv in steps:
+        print()
+        with profiling.stage(name):
+            failed = step(step_argv)
+        if failed:
+            return 1
+    return 0
+
+
+COMMANDS: Dict[str, Callable[[List[str]], int]] = {
+    'scrape': cmd_scrape,
+    'geocode': cmd_geocode,
+    'fix': cmd_fix,
+    'stats': cmd_stats,
+    'publish': cmd_publish,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    profile = '--profile' in argv
+    argv = [a for a in argv if a != '--profile']
+    if not argv or argv[0] in ('-h', '--help') or argv[0] not in COMMANDS:
+        print(__doc__.strip())
+        return 0 if not argv or argv[0] in ('-h', '--help') else 2
+    if argv[0] != 'stats':
+        # stats bleibt ohne Metriken (Startzeit); alle anderen schreiben logs/metrics/wvhmap_<befehl>.*
+        import metrics
+        metrics.enable(f"wvhmap_{argv[0]}")
+    if profile:
+        import profiling
+        profiling.enable(f"wvhmap_{argv[0]}")
+    return COMMANDS[argv[0]](argv[1:]) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())